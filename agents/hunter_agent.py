@@ -1,8 +1,15 @@
 """Agent Hunter spécialisé dans la traque d'opportunités sur les APIs."""
 import asyncio
+import functools
 from typing import List, Dict, Any
 from loguru import logger
 from core.agent_base import BaseAgent
+from core.job_cache import get_job_offer_cache
+from core.gazetteer import cities_in, get_gazetteer, resolve_location
+from core.job_dedup import JobDedupIndex
+from core.job_record import JobRecord
+from core.search_stream import emit_event
+from core.source_health import get_source_health
 from config.settings import settings
 
 class HunterAgent(BaseAgent):
@@ -12,31 +19,39 @@ class HunterAgent(BaseAgent):
         kwargs.setdefault("agent_type", "hunter")
         kwargs.setdefault("name", "Hunter")
         super().__init__(**kwargs)
+        self._searchers: Dict[str, Any] = {}
+
+    @staticmethod
+    def route_sources(location: str) -> List[str]:
+        """Sources pertinentes pour une localisation (zone géographique du gazetteer)."""
+        place = resolve_location(location)
+        zone = place.zone if place else "other"
 
-    async def think(self, task: Dict[str, Any]) -> Dict[str, Any]:
-        """Prépare la stratégie de recherche (APIs à utiliser, mots-clés)."""
-        criteria = task.get("criteria", {})
-        keywords_list = criteria.get("keywords_list", [])
-        exclude_list = criteria.get("exclude_list", [])
-        location = criteria.get("location", "Paris, France")
-        loc_lower = location.lower()
-        loc_lower = loc_lower.replace("califormie", "california").replace("californie", "california")
-        
         # Sources de base (disponibles partout)
         apis_to_use = ["jooble", "jsearch", "google_jobs", "findwork"]
         
         # Sources spécifiques France / Europe
-        if any(w in loc_lower for w in ["france", "paris", "lyon", "marseille", "bordeaux", "nantes", "lille", "europe", "suisse", "belgique", "uk", "london", "allemagne", "berlin", "espagne", "madrid", "italie", "rome"]):
+        if zone == "europe":
             apis_to_use += ["linkedin", "indeed_fr", "glassdoor", "gov"]
         # Sources spécifiques Amériques
-        elif any(w in loc_lower for w in ["usa", "united states", "california", "new york", "texas", "canada", "montreal", "toronto", "vancouver", "chicago", "seattle", "boston", "silicon valley", "florida"]):
+        elif zone == "americas":
             apis_to_use += ["linkedin", "indeed"]
         # Cameroun : scraper Emploi.cm
-        elif any(w in loc_lower for w in ["cameroun", "cameroon", "yaoundé", "yaounde", "douala", "garoua", "bafoussam"]):
+        elif zone == "cameroon":
             apis_to_use += ["emploi_cm", "linkedin", "indeed_fr"]
         # Reste du monde
         else:
             apis_to_use += ["linkedin", "indeed_fr"]
+        return apis_to_use
+
+    async def think(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Prépare la stratégie de recherche (APIs à utiliser, mots-clés)."""
+        criteria = task.get("criteria", {})
+        keywords_list = criteria.get("keywords_list", [])
+        exclude_list = criteria.get("exclude_list", [])
+        location = criteria.get("location", "Paris, France")
+        # Sources imposées par l'appelant (vagues du JobSearchAgent), sinon routage par zone
+        apis_to_use = criteria["apis"] if "apis" in criteria else self.route_sources(location)
             
         return {
             "keywords": keywords_list,
@@ -44,7 +59,9 @@ class HunterAgent(BaseAgent):
             "location": location,
             "apis": apis_to_use,
             "limit": task.get("limit", 10),
-            "job_type": criteria.get("job_type", "emploi")
+            "job_type": criteria.get("job_type", "emploi"),
+            "on_event": task.get("on_event"),
+            "dedup_index": task.get("dedup_index")
         }
 
     async def act(self, plan: Dict[str, Any]) -> Dict[str, Any]:
@@ -58,8 +75,16 @@ class HunterAgent(BaseAgent):
         api_limit = 100 
         job_type = plan.get("job_type", "emploi")
         exclude = [e.lower().strip() for e in plan.get("exclude", [])]
+        on_event = plan.get("on_event")
         
         all_jobs = []
+
+        # Sources au circuit ouvert (échecs répétés) : ignorées jusqu'à l'appel d'essai
+        health = get_source_health()
+        cut = [api for api in apis if not health.is_available(api)]
+        if cut:
+            logger.warning(f"🔌 Sources coupées ignorées: {cut}")
+            apis = [api for api in apis if api not in cut]
         
         # Stratégie de Swarm : On découpe les mots-clés par petits groupes pour paralléliser l'appel aux APIs
         logger.info(f"🚀 SWARM ACTIVÉ: Traque massive sur {len(apis)} sources | Localisation: {location}")
@@ -68,6 +93,8 @@ class HunterAgent(BaseAgent):
         # Sémaphore élevé pour traiter plus d'APIs en parallèle (vitesse)
         semaphore = asyncio.Semaphore(25)
 
+        offer_cache = get_job_offer_cache()
+
         async def _swarm_search(kw: str, api: str):
             async with semaphore:
                 if job_type in ["alternance", "stage"]:
@@ -77,26 +104,16 @@ class HunterAgent(BaseAgent):
                 
                 tasks = []
                 for sq in search_queries:
-                    if api == "jooble" and settings.jooble_api_key:
-                        tasks.append(self._search_jooble(sq, location, api_limit))
-                    elif api == "jsearch" and settings.rapidapi_key:
-                        tasks.append(self._search_jsearch(sq, location, api_limit))
-                    elif api == "glassdoor" and settings.rapidapi_key:
-                        tasks.append(self._search_glassdoor(sq, location, api_limit))
-                    elif api == "indeed":
-                        tasks.append(self._search_indeed(sq, location, api_limit))
-                    elif api == "gov":
-                        tasks.append(self._search_gov(kw, location, api_limit))
-                    elif api == "findwork":
-                        tasks.append(self._search_findwork(sq, location, api_limit))
-                    elif api == "linkedin":
-                        tasks.append(self._search_linkedin(kw, location, api_limit))
-                    elif api == "indeed_fr":
-                        tasks.append(self._search_indeed_fr(kw, location, api_limit))
-                    elif api == "google_jobs":
-                        tasks.append(self._search_google_jobs(kw, location, api_limit))
-                    elif api == "emploi_cm":
-                        tasks.append(self._search_emploi_cm(kw, location, api_limit))
+                    fetcher = self._build_fetcher(api, kw, sq, location, api_limit)
+                    if fetcher is None:
+                        continue
+                    # Timeout par source, télémétrie et circuit breaker (core.source_health)
+                    fetcher = functools.partial(health.call, api, fetcher)
+                    if offer_cache:
+                        # Cache partagé entre requêtes : même source + mot-clé + lieu + type = mêmes offres
+                        tasks.append(offer_cache.get_or_fetch(api, sq, location, job_type, fetcher))
+                    else:
+                        tasks.append(fetcher())
                 
                 if not tasks:
                     return []
@@ -105,7 +122,12 @@ class HunterAgent(BaseAgent):
                 jobs = []
                 for res in results:
                     if isinstance(res, list):
-                        jobs.extend(res)
+                        # Ingestion : dicts des sources → JobRecord (champs normalisés calculés une seule fois)
+                        jobs.extend(JobRecord.coerce_all(res))
+                for job in jobs:
+                    job.origin = api
+                # Progression par source (flux SSE) : le client voit les scrapers répondre un à un
+                emit_event(on_event, "source", source=api, keyword=kw, count=len(jobs))
                 return jobs
 
         # Déclenchement du Swarm
@@ -137,33 +159,56 @@ class HunterAgent(BaseAgent):
         # 1.b Filtrage par localisation
         all_jobs = self._filter_strict_precision(all_jobs, location, job_type)
 
-        # 2. Dédoublonnage par titre+company
-        unique_jobs = []
-        seen = set()
-        for job in all_jobs:
-            key = f"{job.get('title', '')}-{job.get('company', '')}".lower()
-            if key not in seen:
-                seen.add(key)
-                unique_jobs.append(job)
+        # 2. Dédoublonnage inter-sources (URL canonique, titre+entreprise normalisés, similarité des titres d'une même entreprise) ;
+        # l'index est partagé entre les vagues d'une même recherche quand le plan en fournit un
+        dedup_index = plan.get("dedup_index") or JobDedupIndex()
+        unique_jobs = dedup_index.add_all(all_jobs)
 
         logger.info(f"🎯 Swarm a ramené {len(unique_jobs)} offres brutes uniques.")
         return {"success": True, "jobs": unique_jobs}
 
 
+    def _get_searcher(self, name: str, factory):
+        """Instance de searcher réutilisée d'une recherche à l'autre (les connexions sont dans le pool partagé)."""
+        searcher = self._searchers.get(name)
+        if searcher is None:
+            searcher = factory()
+            self._searchers[name] = searcher
+        return searcher
+
+    def _build_fetcher(self, api: str, kw: str, sq: str, location: str, api_limit: int):
+        """Retourne une fabrique de coroutine pour interroger une source, ou None si elle n'est pas configurée."""
+        if api == "jooble" and settings.jooble_api_key:
+            return lambda: self._search_jooble(sq, location, api_limit)
+        if api == "jsearch" and settings.rapidapi_key:
+            return lambda: self._search_jsearch(sq, location, api_limit)
+        if api == "glassdoor" and settings.rapidapi_key:
+            return lambda: self._search_glassdoor(sq, location, api_limit)
+        if api == "indeed":
+            return lambda: self._search_indeed(sq, location, api_limit)
+        if api == "gov":
+            return lambda: self._search_gov(kw, location, api_limit)
+        if api == "findwork":
+            return lambda: self._search_findwork(sq, location, api_limit)
+        if api == "linkedin":
+            return lambda: self._search_linkedin(kw, location, api_limit)
+        if api == "indeed_fr":
+            return lambda: self._search_indeed_fr(kw, location, api_limit)
+        if api == "google_jobs":
+            return lambda: self._search_google_jobs(kw, location, api_limit)
+        if api == "emploi_cm":
+            return lambda: self._search_emploi_cm(kw, location, api_limit)
+        return None
+
     def _filter_by_exclusions(self, jobs: list, exclude: list) -> list:
         """Filtre les offres dont le titre ou la description contient un terme exclu."""
-        result = []
-        for job in jobs:
-            text = f"{job.get('title', '')} {job.get('description', '')}".lower()
-            # Un job est rejeté si son titre/description contient un terme exclu
-            if not any(ex in text for ex in exclude):
-                result.append(job)
-        return result
+        from core.job_filters import filter_excluded
+        return filter_excluded(jobs, exclude)
 
     async def _search_jooble(self, kw, loc, limit):
         try:
             from tools.jooble_searcher import JoobleSearcher
-            searcher = JoobleSearcher(api_key=settings.jooble_api_key)
+            searcher = self._get_searcher("jooble", lambda: JoobleSearcher(api_key=settings.jooble_api_key))
             return await searcher.search_jobs(keywords=kw, location=loc, limit=limit)
         except Exception as e:
             logger.error(f"Jooble Error: {e}")
@@ -173,7 +218,7 @@ class HunterAgent(BaseAgent):
         """Recherche via FindWork.dev API."""
         try:
             from tools.findwork_searcher import FindWorkSearcher
-            searcher = FindWorkSearcher(api_key=settings.findwork_api_key)
+            searcher = self._get_searcher("findwork", lambda: FindWorkSearcher(api_key=settings.findwork_api_key))
             return await searcher.search_jobs(keywords=kw, location=loc, limit=limit)
         except Exception as e:
             logger.error(f"FindWork Error: {e}")
@@ -182,38 +227,25 @@ class HunterAgent(BaseAgent):
     def _filter_strict_precision(self, jobs: list, expected_location: str, expected_job_type: str) -> list:
         """
         Filtre localisation léger : on n'exclut que les offres qui mentionnent explicitement
-        une AUTRE grande ville que la cible. Pas de filtrage sur type de contrat ni sur
-        localisation vide (le Judge score et dégrade les imprécis).
+        une ville connue du gazetteer hors de la zone cible (autre agglomération, région ou pays).
+        Pas de filtrage sur type de contrat ni sur localisation vide (le Judge score et dégrade les imprécis).
         """
         if not expected_location or expected_location.strip().lower() == "non spécifié":
             return jobs
+        target = resolve_location(expected_location)
+        if target is None:
+            return jobs
+        gazetteer = get_gazetteer()
         result = []
-        loc_target = expected_location.lower().split(",")[0].strip()
-        major_cities = [
-            "paris", "lyon", "marseille", "bordeaux", "nantes", "lille", "toulouse",
-            "montreal", "quebec", "toronto", "vancouver", "ottawa", "calgary",
-            "london", "manchester", "birmingham",
-            "new york", "san francisco", "los angeles", "chicago", "boston", "seattle"
-        ]
-        other_cities = [c for c in major_cities if c != loc_target]
-
         for job in jobs:
-            job_loc = job.get("location", "").lower()
-            job_title = job.get("title", "").lower()
-            # Pour le filtre uniquement : si location vide, on peut inférer la ville depuis le titre
-            # mais on ne modifie pas job["location"] pour l'affichage (garder la localisation précise de la source)
-            if "non spécifié" in job_loc or not job_loc.strip():
-                for city in major_cities:
-                    if city in job_title:
-                        job_loc = city
-                        break
-            if loc_target in job_loc:
-                result.append(job)
-                continue
-            if any(other in job_loc for other in other_cities):
-                continue
-            if "remote" in job_loc or "télétravail" in job_loc or "anywhere" in job_loc:
-                result.append(job)
+            job_loc = job.location_lc
+            if job_loc.strip() and "non spécifié" not in job_loc:
+                cities = cities_in(job_loc)
+            else:
+                # Pour le filtre uniquement : si location vide, on peut inférer la ville depuis le titre
+                # mais on ne modifie pas job["location"] pour l'affichage (garder la localisation précise de la source)
+                cities = gazetteer.cities(job.title_lc)[:1]
+            if cities and not any(target.covers(city) for city in cities):
                 continue
             result.append(job)
         return result
@@ -223,7 +255,7 @@ class HunterAgent(BaseAgent):
     async def _search_jsearch(self, kw, loc, limit):
         try:
             from tools.jsearch_searcher import JSearchSearcher
-            searcher = JSearchSearcher(api_key=settings.rapidapi_key)
+            searcher = self._get_searcher("jsearch", lambda: JSearchSearcher(api_key=settings.rapidapi_key))
             return await searcher.search_jobs(query=f"{kw} in {loc}", limit=limit)
         except Exception as e:
             logger.error(f"JSearch Error: {e}")
@@ -232,7 +264,7 @@ class HunterAgent(BaseAgent):
     async def _search_glassdoor(self, kw, loc, limit):
         try:
             from tools.glassdoor_searcher import GlassdoorSearcher
-            searcher = GlassdoorSearcher(api_key=settings.rapidapi_key)
+            searcher = self._get_searcher("glassdoor", lambda: GlassdoorSearcher(api_key=settings.rapidapi_key))
             return await searcher.search_jobs(query=kw, location=loc, limit=limit)
         except Exception as e:
             logger.error(f"Glassdoor Error: {e}")
@@ -241,7 +273,7 @@ class HunterAgent(BaseAgent):
     async def _search_gov(self, kw, loc, limit):
         try:
             from tools.gov_searcher import GovSearcher
-            searcher = GovSearcher()
+            searcher = self._get_searcher("gov", GovSearcher)
             return await searcher.search_jobs(keywords=kw, location=loc, limit=limit)
         except Exception as e:
             logger.error(f"GovSearcher Error: {e}")
@@ -251,7 +283,7 @@ class HunterAgent(BaseAgent):
         """Recherche LinkedIn Jobs (priorité élevée pour France et Amériques)."""
         try:
             from tools.linkedin_jobs_searcher import LinkedInJobsSearcher
-            searcher = LinkedInJobsSearcher()
+            searcher = self._get_searcher("linkedin", LinkedInJobsSearcher)
             results = await searcher.search_jobs(keywords=kw, location=loc, limit=limit)
             logger.info(f"💼 LinkedIn: {len(results)} offres pour '{kw}'")
             return results
@@ -261,10 +293,9 @@ class HunterAgent(BaseAgent):
 
     async def _search_indeed(self, kw, loc, limit):
         """Recherche Indeed (principalement USA/Canada, liens directs d'offres)."""
-        import aiohttp
         import urllib.parse
-        import ssl
-        import re
+        from tools.http_client import http_session
+        from tools.html_parsing import run_parse
         try:
             kw_enc = urllib.parse.quote_plus(kw.replace('"', ''))
             loc_enc = urllib.parse.quote_plus(loc)
@@ -273,50 +304,55 @@ class HunterAgent(BaseAgent):
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36",
                 "Accept-Language": "en-US,en;q=0.9",
             }
-            ssl_ctx = ssl._create_unverified_context()
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=8), ssl=ssl_ctx) as resp:
+            async with http_session(headers=headers, verify_ssl=False) as session:
+                async with session.get(url, timeout=8) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
 
-            
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
-            jobs = []
-            cards = soup.find_all("div", class_=re.compile("job_seen_beacon|resultContent"))
-            for i, card in enumerate(cards[:limit]):
-                title_tag = card.find("h2", class_=re.compile("jobTitle")) or card.find("h2")
-                company_tag = card.find(class_=re.compile("companyName|company"))
-                loc_tag = card.find(class_=re.compile("companyLocation"))
-                link = card.find("a", href=True)
-                href = link.get("href", "") if link else ""
-                if href and not href.startswith("http"):
-                    href = f"https://www.indeed.com{href}"
-                title = title_tag.get_text(strip=True) if title_tag else ""
-                if not title:
-                    continue
-                jobs.append({
-                    "id": f"indeed-{i}",
-                    "title": title,
-                    "company": company_tag.get_text(strip=True) if company_tag else "Confidentiel",
-                    "location": loc_tag.get_text(strip=True) if loc_tag else "Non spécifié",
-                    "url": href or f"https://www.indeed.com/jobs?q={kw_enc}",
-                    "description": "",
-                    "source": "Indeed",
-                    "match_score": 0,
-                })
+            jobs = await run_parse(self._parse_indeed_cards, html, kw_enc, limit)
             logger.info(f"🔍 Indeed: {len(jobs)} offres pour '{kw}'")
             return jobs
         except Exception as e:
             logger.debug(f"Indeed Error: {e}")
             return []
 
+    @staticmethod
+    def _parse_indeed_cards(html, kw_enc, limit):
+        """Cartes d'offres de www.indeed.com (sélecteurs partagés avec IndeedMultiSearcher)."""
+        from tools.html_parsing import make_soup, compiled
+        from tools.indeed_searcher import SELECTORS
+        soup = make_soup(html)
+        jobs = []
+        cards = compiled("div[class*='job_seen_beacon'], div[class*='resultContent']").select(soup, limit)
+        for i, card in enumerate(cards):
+            title_tag = SELECTORS.title.select_one(card) or SELECTORS.title_h2.select_one(card)
+            company_tag = compiled("[class*='companyName'], [class*='company']").select_one(card)
+            loc_tag = SELECTORS.location.select_one(card)
+            link = SELECTORS.link.select_one(card)
+            href = link.get("href", "") if link else ""
+            if href and not href.startswith("http"):
+                href = f"https://www.indeed.com{href}"
+            title = title_tag.get_text(strip=True) if title_tag else ""
+            if not title:
+                continue
+            jobs.append({
+                "id": f"indeed-{i}",
+                "title": title,
+                "company": company_tag.get_text(strip=True) if company_tag else "Confidentiel",
+                "location": loc_tag.get_text(strip=True) if loc_tag else "Non spécifié",
+                "url": href or f"https://www.indeed.com/jobs?q={kw_enc}",
+                "description": "",
+                "source": "Indeed",
+                "match_score": 0,
+            })
+        return jobs
+
     async def _search_indeed_fr(self, kw, loc, limit):
         """Recherche Indeed France/Europe (fr.indeed.com, be.indeed.com, etc.)."""
         try:
             from tools.indeed_searcher import IndeedMultiSearcher
-            searcher = IndeedMultiSearcher()
+            searcher = self._get_searcher("indeed_fr", IndeedMultiSearcher)
             results = await searcher.search_jobs(keywords=kw, location=loc, limit=limit)
             logger.info(f"🔍 Indeed FR/EU: {len(results)} offres pour '{kw}'")
             return results
@@ -328,7 +364,7 @@ class HunterAgent(BaseAgent):
         """Recherche Google Jobs (offres structurées avec descriptions)."""
         try:
             from tools.google_jobs_searcher import GoogleJobsSearcher
-            searcher = GoogleJobsSearcher()
+            searcher = self._get_searcher("google_jobs", GoogleJobsSearcher)
             results = await searcher.search_jobs(keywords=kw, location=loc, limit=limit)
             logger.info(f"🌐 Google Jobs: {len(results)} offres pour '{kw}'")
             return results
@@ -340,7 +376,7 @@ class HunterAgent(BaseAgent):
         """Scrape Emploi.cm (recherche-jobs-cameroun) pour les offres au Cameroun."""
         try:
             from tools.emploi_cm_searcher import EmploiCmSearcher
-            searcher = EmploiCmSearcher()
+            searcher = self._get_searcher("emploi_cm", EmploiCmSearcher)
             results = await searcher.search_jobs(keywords=kw, location=loc, limit=limit)
             logger.info(f"📄 Emploi.cm: {len(results)} offres pour '{kw}'")
             return results
@@ -360,7 +396,7 @@ class HunterAgent(BaseAgent):
         logger.info(f"✨ Enrichment: Récupération des descriptions pour {len(to_enrich)} offres...")
         from tools.linkedin_jobs_searcher import LinkedInJobsSearcher
         from tools.job_description_fetcher import fetch_description_from_url
-        lk_searcher = LinkedInJobsSearcher()
+        lk_searcher = self._get_searcher("linkedin", LinkedInJobsSearcher)
         semaphore = asyncio.Semaphore(6)
 
         async def _enrich_one(job):
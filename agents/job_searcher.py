@@ -3,15 +3,24 @@ Coordonne un essaim (swarm) d'agents spécialisés pour le profiling, la traque
 """
 from typing import Any, Dict, List
 import asyncio
+import time
 from loguru import logger
 
 from core.agent_base import BaseAgent
+from core.gazetteer import get_gazetteer
+from core.job_dedup import JobDedupIndex
+from core.job_record import job_dedupe_key, to_dicts
+from core.search_stream import emit_event
+from core.source_health import get_source_health
 from config.settings import settings
 
 
 class JobSearchAgent(BaseAgent):
     """Orchestrateur central du Swarm Sniper."""
-    
+
+    # Sources de la vague 1 tant que leur santé récente n'est pas connue
+    WAVE_1_SOURCES = ("jooble", "jsearch", "findwork", "gov", "emploi_cm")
+
     def __init__(self, **kwargs):
         """Initialise l'orchestrateur."""
         kwargs.setdefault("agent_type", "job_searcher")
@@ -19,97 +28,12 @@ class JobSearchAgent(BaseAgent):
         kwargs.setdefault("temperature", 0.1)
         super().__init__(**kwargs)
     
-    # Villes/regions connues -> string precis pour les APIs (support mondial)
-    LOCATION_MAP = {
-        # Canada
-        "qc": "Quebec, QC, Canada",
-        "quebec": "Quebec, QC, Canada",
-        "montreal": "Montreal, QC, Canada",
-        "laval": "Laval, QC, Canada",
-        "longueuil": "Longueuil, QC, Canada",
-        "gatineau": "Gatineau, QC, Canada",
-        "sherbrooke": "Sherbrooke, QC, Canada",
-        "saguenay": "Saguenay, QC, Canada",
-        "ontario": "Ontario, Canada",
-        "toronto": "Toronto, ON, Canada",
-        "ottawa": "Ottawa, ON, Canada",
-        "vancouver": "Vancouver, BC, Canada",
-        "calgary": "Calgary, AB, Canada",
-        # France
-        "france": "France",
-        "paris": "Paris, France",
-        "lyon": "Lyon, France",
-        "marseille": "Marseille, France",
-        "toulouse": "Toulouse, France",
-        "bordeaux": "Bordeaux, France",
-        "nantes": "Nantes, France",
-        "lille": "Lille, France",
-        "nice": "Nice, France",
-        "rennes": "Rennes, France",
-        "strasbourg": "Strasbourg, France",
-        "grenoble": "Grenoble, France",
-        "montpellier": "Montpellier, France",
-        # USA  
-        "usa": "United States",
-        "us": "United States",
-        "america": "United States",
-        "etats-unis": "United States",
-        "california": "California, USA",
-        "californie": "California, USA",
-        "califormie": "California, USA",  # typo courant
-        "califormia": "California, USA",  # typo courant
-        "new york": "New York, USA",
-        "new-york": "New York, USA",
-        "texas": "Texas, USA",
-        "florida": "Florida, USA",
-        "washington": "Washington, USA",
-        "seattle": "Seattle, WA, USA",
-        "boston": "Boston, MA, USA",
-        "chicago": "Chicago, IL, USA",
-        "los angeles": "Los Angeles, CA, USA",
-        "san francisco": "San Francisco, CA, USA",
-        "silicon valley": "Silicon Valley, CA, USA",
-        # Autres pays
-        "belgique": "Belgique",
-        "bruxelles": "Bruxelles, Belgique",
-        "suisse": "Suisse",
-        "zurich": "Zurich, Suisse",
-        "geneve": "Genève, Suisse",
-        "uk": "United Kingdom",
-        "london": "London, UK",
-        "maroc": "Maroc",
-        "luxembourg": "Luxembourg",
-        "espagne": "Spain",
-        "madrid": "Madrid, Spain",
-        "barcelona": "Barcelona, Spain",
-        "allemagne": "Germany",
-        "berlin": "Berlin, Germany",
-        # Cameroun
-        "cameroun": "Cameroun",
-        "cameroon": "Cameroun",
-        "yaoundé": "Yaoundé, Cameroun",
-        "yaounde": "Yaoundé, Cameroun",
-        "douala": "Douala, Cameroun",
-        "garoua": "Garoua, Cameroun",
-        "bafoussam": "Bafoussam, Cameroun",
-    }
-
     def _normalize_location(self, loc: str) -> str:
-        """Normalise une localisation avec correction de fautes courantes."""
+        """Normalise une localisation connue du gazetteer (alias, fautes courantes) en forme précise pour les APIs."""
         if not loc:
             return "Montreal, QC, Canada"
-        # Nettoyage et correction de fautes
-        clean = loc.lower().strip()
-        clean = clean.replace("califormie", "california").replace("californie", "california")
-        clean = clean.replace("etats-unis", "usa").replace("united-states", "usa")
-        normalized = self.LOCATION_MAP.get(clean)
-        if normalized:
-            return normalized
-        # Si le terme original (sans corrections) est dans la map
-        original = self.LOCATION_MAP.get(loc.lower().strip())
-        if original:
-            return original
-        return loc
+        place = get_gazetteer().lookup(loc)
+        return place.name if place else loc
 
     async def think(self, task: Dict[str, Any], cv_text: str = None) -> Dict[str, Any]:
         """
@@ -117,6 +41,7 @@ class JobSearchAgent(BaseAgent):
         """
         logger.info("🧠 Orchestrateur: Phase de planification...")
         from agents.profile_agent import ProfileAgent
+        started = time.perf_counter()
         profiler = ProfileAgent()
         await profiler.initialize()
         
@@ -143,10 +68,14 @@ class JobSearchAgent(BaseAgent):
                 "job_type": profile_data.get("job_type", "emploi")
             },
             "cv_profile": profile_data.get("cv_profile", {}),
-            "limit": task.get("nb_results") or task.get("limit") or 10
+            "limit": task.get("nb_results") or task.get("limit") or 10,
+            "on_event": task.get("on_event"),
+            # Durées par étape (ms), complétées par act() et renvoyées dans le résultat
+            "timings": {"profile": round((time.perf_counter() - started) * 1000, 1)}
         }
         
         logger.info(f"✅ Orchestration prête: {len(action_plan['criteria']['keywords_list'])} variations pour {base_location}")
+        emit_event(action_plan["on_event"], "plan", keywords=action_plan["criteria"]["keywords_list"], location=base_location)
         return action_plan
 
     async def act(self, action_plan: Dict[str, Any]) -> Dict[str, Any]:
@@ -155,27 +84,40 @@ class JobSearchAgent(BaseAgent):
         """
         logger.info("🎬 Orchestrateur: Phase d'exécution du Swarm (Waves Strategy)...")
         
-        all_apis = action_plan.get("criteria", {}).get("apis", [])
-        # Vague 1 : APIs Ultra-Rapides (Jooble, JSearch, Findwork, Emploi.cm, etc.)
-        wave_1_apis = [api for api in all_apis if api in ["jooble", "jsearch", "findwork", "gov", "emploi_cm"]]
-        # Vague 2 : APIs Profondes ou plus lentes
-        wave_2_apis = [api for api in all_apis if api not in wave_1_apis]
-
+        on_event = action_plan.get("on_event")
+        timings = action_plan.setdefault("timings", {})
+        act_started = time.perf_counter()
         from agents.hunter_agent import HunterAgent
         from agents.judge_agent import JudgeAgent
+
+        criteria = action_plan.get("criteria", {})
+        all_apis = criteria.get("apis") or HunterAgent.route_sources(criteria.get("location", "Paris, France"))
+        # Vague 1 : APIs Ultra-Rapides (Jooble, JSearch, Findwork, Emploi.cm, etc.), vague 2 : APIs Profondes ou plus lentes.
+        # Répartition corrigée par la santé récente des sources (lentes ou peu productives → vague 2, circuit ouvert → ignorées)
+        health = get_source_health()
+        wave_1_apis, wave_2_apis, skipped_apis = health.plan_waves(all_apis, self.WAVE_1_SOURCES)
+        if skipped_apis:
+            logger.warning(f"🔌 Sources coupées (échecs répétés) : {skipped_apis}")
+
         hunter = HunterAgent()
         judge = JudgeAgent()
         await asyncio.gather(hunter.initialize(), judge.initialize())
 
         # --- VAGUE 1 : TRAQUE RAPIDE ---
         logger.info(f"🌊 VAGUE 1 : {wave_1_apis}")
+        emit_event(on_event, "stage", stage="hunt_v1")
         plan_v1 = action_plan.copy()
         plan_v1["criteria"] = action_plan["criteria"].copy()
         plan_v1["criteria"]["apis"] = wave_1_apis
+        # Index commun aux deux vagues : un doublon de la vague 2 enrichit l'offre de la vague 1 au lieu d'être rejugé
+        dedup_index = JobDedupIndex()
+        plan_v1["dedup_index"] = dedup_index
         
         # On attend la vague 1 car elle est la base du premier feedback rapide
+        stage_started = time.perf_counter()
         hunt_v1 = await hunter.act(await hunter.think(plan_v1))
         jobs_v1 = hunt_v1.get("jobs", [])
+        timings["hunt_v1"] = _elapsed_ms(stage_started)
         
         cv_profile = action_plan.get("cv_profile", {})
         criteria_loc = action_plan.get("criteria", {})
@@ -185,18 +127,25 @@ class JobSearchAgent(BaseAgent):
         
         # --- PARALLÉLISME MASSIF : JUDGE 1 + HUNTER 2 ---
         logger.info("⚡ Lancement concurrent du Jugement Vague 1 et de la Traque Vague 2...")
+        emit_event(on_event, "stage", stage="judge_v1_hunt_v2", count=len(jobs_v1))
         
         async def run_judge_v1():
             if not jobs_v1: return []
-            res = await judge.act({"jobs": jobs_v1, "cv_profile": cv_profile})
+            started = time.perf_counter()
+            res = await judge.act({"jobs": jobs_v1, "cv_profile": cv_profile, "on_event": on_event})
+            timings["judge_v1"] = _elapsed_ms(started)
+            health.record_judged(jobs_v1, res.get("evaluated_jobs", []))
             return res.get("evaluated_jobs", [])
 
         async def run_hunt_v2():
             if not wave_2_apis: return []
+            started = time.perf_counter()
             plan_v2 = action_plan.copy()
             plan_v2["criteria"] = action_plan["criteria"].copy()
             plan_v2["criteria"]["apis"] = wave_2_apis
+            plan_v2["dedup_index"] = dedup_index
             hunt = await hunter.act(await hunter.think(plan_v2))
+            timings["hunt_v2"] = _elapsed_ms(started)
             return hunt.get("jobs", [])
 
         # On lance les deux en même temps
@@ -210,8 +159,12 @@ class JobSearchAgent(BaseAgent):
         judged_v2 = []
         if jobs_v2:
             logger.info("⚖️ Jugement Vague 2 en cours...")
-            res_v2 = await judge.act({"jobs": jobs_v2, "cv_profile": cv_profile})
+            emit_event(on_event, "stage", stage="judge_v2", count=len(jobs_v2))
+            stage_started = time.perf_counter()
+            res_v2 = await judge.act({"jobs": jobs_v2, "cv_profile": cv_profile, "on_event": on_event})
             judged_v2 = res_v2.get("evaluated_jobs", [])
+            timings["judge_v2"] = _elapsed_ms(stage_started)
+            health.record_judged(jobs_v2, judged_v2)
 
         # Fusion et Dédoublonnage final (pas de post-filtre type contrat : le Judge a déjà scoré)
         all_results = judged_v1 + judged_v2
@@ -220,7 +173,7 @@ class JobSearchAgent(BaseAgent):
         for j in all_results:
             if j.get("match_score", 0) <= 0:
                 continue
-            key = f"{j.get('title')}-{j.get('company')}".lower()
+            key = job_dedupe_key(j)
             if key not in seen:
                 seen.add(key)
                 unique_final.append(j)
@@ -235,17 +188,28 @@ class JobSearchAgent(BaseAgent):
         # --- ENRICHISSEMENT FINAL (Détails pour les meilleurs matchs) ---
         if top_jobs:
             logger.info(f"✨ Enrichissement des descriptions pour les {min(25, len(top_jobs))} meilleurs résultats...")
+            emit_event(on_event, "stage", stage="enrich", count=min(25, len(top_jobs)))
+            stage_started = time.perf_counter()
             top_jobs = await hunter.enrich_jobs(top_jobs, limit=25)
+            timings["enrich"] = _elapsed_ms(stage_started)
         
+        timings["act"] = _elapsed_ms(act_started)
+        timings["total"] = round(timings["act"] + timings.get("profile", 0.0), 1)
         logger.success(f"💎 Sniper Swarm terminé : {len(top_jobs)} offres pertinentes sur {len(unique_final)} trouvées.")
+        logger.info("⏱️ Étapes (ms) : " + ", ".join(f"{k}={v}" for k, v in timings.items()))
 
         
         return {
             "success": True,
             "total_jobs_found": len(top_jobs),
-            "matched_jobs": top_jobs,
+            "matched_jobs": to_dicts(top_jobs),
             "cv_profile": cv_profile,
-            "search_criteria": action_plan.get("criteria")
+            "search_criteria": action_plan.get("criteria"),
+            "timings": timings
         }
 
 
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
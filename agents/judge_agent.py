@@ -2,12 +2,28 @@
 import asyncio
 import json
 import re
+import time
 from typing import List, Dict, Any
 from loguru import logger
+from config.settings import settings
 from core.agent_base import BaseAgent
+from core.batch_planner import get_judge_concurrency, pack_batches
+from core.job_filters import JobPreScorer
+from core.judge_scores import get_judge_score_store
+from core.search_stream import emit_event
+from llm.gemini_client import GeminiRateLimitError
+from llm.rate_limiter import estimate_tokens
 
 class JudgeAgent(BaseAgent):
     """Agent chargé de noter les offres d'emploi par rapport au profil."""
+
+    # À incrémenter à chaque modification du prompt de notation (invalide les scores mémoïsés)
+    PROMPT_VERSION = "v1"
+    # Tokens fixes du prompt (règles + profil) hors liste d'offres
+    PROMPT_OVERHEAD_TOKENS = 900
+    # Tentatives d'un lot refusé pour rate limit, et profondeur max de re-découpage d'un lot incomplet
+    MAX_RATE_LIMIT_ATTEMPTS = 4
+    MAX_SPLIT_DEPTH = 3
     
     def __init__(self, **kwargs):
         kwargs.setdefault("agent_type", "judge")
@@ -20,41 +36,95 @@ class JudgeAgent(BaseAgent):
         return {
             "jobs": task.get("jobs", []),
             "cv_profile": task.get("cv_profile", {}),
-            "chunk_size": 50
+            "on_event": task.get("on_event")
         }
 
     async def act(self, plan: Dict[str, Any]) -> Dict[str, Any]:
         """Évalue les offres en lots avec Gemini 2.0 Flash (Mode Hyper-Vitesse)."""
         jobs = plan.get("jobs", [])
         cv_profile = plan.get("cv_profile", {})
-        
-        # Lots plus grands + parallélisme massif : 50 offres/lot, jusqu'à 30 lots en parallèle
-        chunk_size = 50
+        on_event = plan.get("on_event")
         
         if not jobs:
             return {"success": True, "evaluated_jobs": []}
-            
-        logger.info(f"⚖️ Judge analyse {len(jobs)} offres (Gemini Flash, lots de {chunk_size} en parallèle)...")
-        
-        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
-        
-        # Traitement simultané : jusqu'à 30 appels Gemini en parallèle pour la vitesse
-        semaphore = asyncio.Semaphore(30)
-
 
-        async def _evaluate_with_semaphore(chunk, profile):
-            async with semaphore:
-                try:
-                    # On force l'usage de flash pour la vitesse
-                    return await self._evaluate_batch(chunk, profile, model="gemini-2.0-flash")
-                except Exception as e:
-                    logger.error(f"🔴 Erreur Judge lot: {e}")
-                    return chunk
+        # Pré-filtre déterministe : les offres certainement hors cible ne consomment aucun token LLM
+        jobs, rejected = JobPreScorer(cv_profile).partition(jobs)
+        if rejected:
+            logger.info(f"🧹 Pré-filtre Judge: {len(rejected)} offres éliminées sans LLM, {len(jobs)} à évaluer")
+        if not jobs:
+            return {"success": True, "evaluated_jobs": []}
 
-        tasks = [_evaluate_with_semaphore(chunk, cv_profile) for chunk in chunks]
+        # Scores déjà connus (même offre, profil équivalent) : aucun appel LLM
+        known_jobs = []
+        score_store = get_judge_score_store()
+        if score_store:
+            known_jobs, jobs = await score_store.lookup(jobs, cv_profile, self.PROMPT_VERSION)
+            if known_jobs:
+                logger.info(f"🗃️ Judge: {len(known_jobs)} offres déjà notées réutilisées, {len(jobs)} à évaluer")
+                if on_event:
+                    validated = sorted(
+                        [j for j in known_jobs if j.get("match_score", 0) >= 30],
+                        key=lambda x: x.get("match_score", 0), reverse=True,
+                    )
+                    emit_event(on_event, "jobs", jobs=validated, batch_size=len(known_jobs))
+            
+        # Lots remplis jusqu'au budget de tokens cible (descriptions longues = lots plus petits)
+        target_tokens = max(1000, settings.judge_batch_target_tokens - self.PROMPT_OVERHEAD_TOKENS)
+        batches = pack_batches(
+            jobs,
+            cost=lambda j: estimate_tokens(self._render_job(0, j)),
+            target_tokens=target_tokens,
+            max_items=settings.judge_batch_max_jobs,
+        )
+        # Concurrence adaptative partagée par toutes les recherches (AIMD sur latence et 429)
+        concurrency = get_judge_concurrency()
+        logger.info(f"⚖️ Judge analyse {len(jobs)} offres en {len(batches)} lots (concurrence {concurrency.limit})...")
+
+        async def _score_batch(batch, profile, depth=0):
+            for attempt in range(self.MAX_RATE_LIMIT_ATTEMPTS):
+                async with concurrency.slot():
+                    started = time.monotonic()
+                    try:
+                        # On force l'usage de flash pour la vitesse ; les 429 remontent immédiatement (max_retries=1)
+                        await self._evaluate_batch(batch, profile, model="gemini-2.0-flash", max_retries=1, priority="batch")
+                        concurrency.record_success(time.monotonic() - started)
+                        break
+                    except GeminiRateLimitError:
+                        concurrency.record_rate_limit()
+                    except Exception as e:
+                        logger.error(f"🔴 Erreur Judge lot: {e}")
+                        return batch
+                # Hors slot : on laisse les autres lots avancer pendant l'attente
+                await asyncio.sleep(1.0 * (attempt + 1))
+            else:
+                logger.error(f"🔴 Judge: lot de {len(batch)} offres abandonné (rate limit persistant)")
+                return batch
+
+            # Le modèle a oublié des offres : on re-découpe les manquantes en lots plus petits
+            missing = [j for j in batch if "match_score" not in j]
+            if missing and depth < self.MAX_SPLIT_DEPTH and (len(missing) > 1 or len(batch) > 1):
+                logger.debug(f"✂️ Judge: {len(missing)}/{len(batch)} scores manquants, re-découpage")
+                half = max(1, len(missing) // 2)
+                halves = [missing[:half], missing[half:]] if len(missing) > 1 else [missing]
+                await asyncio.gather(*[_score_batch(h, profile, depth + 1) for h in halves if h])
+            return batch
+
+        async def _evaluate_and_publish(batch, profile):
+            evaluated = await _score_batch(batch, profile)
+            if score_store:
+                await score_store.store(evaluated, profile, self.PROMPT_VERSION)
+            # Diffusion immédiate des offres validées de ce lot (flux SSE), sans attendre les autres lots
+            if on_event:
+                validated = [j for j in evaluated if j.get("match_score", 0) >= 30]
+                validated.sort(key=lambda x: x.get("match_score", 0), reverse=True)
+                emit_event(on_event, "jobs", jobs=validated, batch_size=len(batch))
+            return evaluated
+
+        tasks = [_evaluate_and_publish(batch, cv_profile) for batch in batches]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        evaluated_jobs = []
+        evaluated_jobs = list(known_jobs)
         for res in results:
             if isinstance(res, list):
                 evaluated_jobs.extend(res)
@@ -71,17 +141,18 @@ class JudgeAgent(BaseAgent):
 
 
 
-    async def _evaluate_batch(self, jobs: List[Dict[str, Any]], profile: Dict[str, Any], model: str = None) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _render_job(idx: int, job: Dict[str, Any]) -> str:
+        """Bloc texte d'une offre dans le prompt (sert aussi à estimer son coût en tokens)."""
+        desc = (job.get("description") or "")[:settings.judge_description_chars]
+        return f"ID: {idx}\nTITRE: {job.get('title')}\nENTREPRISE: {job.get('company')}\nLOC: {job.get('location')}\nDESC: {desc}...\n---\n"
+
+    async def _evaluate_batch(self, jobs: List[Dict[str, Any]], profile: Dict[str, Any], model: str = None, **kwargs) -> List[Dict[str, Any]]:
         """Appelle le LLM pour noter un lot d'offres."""
-        job_list_text = ""
-        for i, job in enumerate(jobs):
-            job_list_text += f"ID: {i}\nTITRE: {job.get('title')}\nENTREPRISE: {job.get('company')}\nLOC: {job.get('location')}\nDESC: {job.get('description')[:500]}...\n---\n"
+        job_list_text = "".join(self._render_job(i, job) for i, job in enumerate(jobs))
 
         target_job_type = profile.get("target_job_type") or profile.get("target_level") or "emploi"
         search_query = (profile.get("search_query") or "").strip().lower()
-        target_loc = (profile.get("target_location") or "").lower()
-        is_quebec = "quebec" in target_loc or "québec" in target_loc or "montreal" in target_loc or "qc" in target_loc
-        is_dev_search = any(w in search_query for w in ["dev", "developpeur", "developer", "logiciel", "software", "programmation", "programming", "informatique", "web", "frontend", "backend"])
 
         prompt = f"""Tu es un Judge recrutement. Note chaque offre sur 100. APPLIQUE D'ABORD LES 3 RÈGLES ÉLIMINATOIRES (score 0 obligatoire), puis score le reste.
 
@@ -111,7 +182,7 @@ C) TYPE CONTRAT (PRIORITAIRE) :
 Exactement un objet par offre. Pas d'oubli."""
         
         try:
-            resp = await self.generate_response(prompt, json_mode=True, model=model)
+            resp = await self.generate_response(prompt, json_mode=True, model=model, **kwargs)
 
             # Nettoyage JSON
             match = re.search(r'\[.*\]', resp.replace('\n', ''), re.S)
@@ -128,35 +199,8 @@ Exactement un objet par offre. Pas d'oubli."""
                     jobs[idx]["match_score"] = s.get("score", 0)
                     jobs[idx]["match_justification"] = s.get("reason", "")
 
-            # Filet de sécurité : forcer 0 si le LLM a laissé passer des offres non conformes
-            target_loc = (profile.get("target_location") or "").lower()
-            search_q = (profile.get("search_query") or "").lower()
-            job_type = (profile.get("target_job_type") or profile.get("target_level") or "emploi").lower()
-            user_wants_stage = job_type == "stage" or any(w in search_q for w in ["stage", "intern", "stagiaire", "internship"])
-            is_quebec_target = any(x in target_loc for x in ["quebec", "québec", "montreal", ", qc"])
-            is_dev_search = any(w in search_q for w in ["dev", "developpeur", "developer", "logiciel", "software", "programmation", "programming"])
-            non_dev_keywords = ["mécanique", "mechanic", "formation", "rh", "relations industrielles", "manufacturing engineering", "controls engineering", "ordnance", "maintenance "]
-            stage_intern_keywords = ["stage", "intern", "stagiaire", "internship"]
-
-            for job in jobs:
-                loc = (job.get("location") or "").strip().lower()
-                title = (job.get("title") or "").lower()
-                desc = (job.get("description") or "")[:400].lower()
-                job_type_field = (job.get("job_type") or "").lower()
-                text = f"{title} {desc} {job_type_field}"
-
-                if is_quebec_target and loc == "canada" and "quebec" not in loc and "qc" not in loc and "montreal" not in loc:
-                    job["match_score"] = 0
-                    job["match_justification"] = "Localisation « Canada » seule : hors Québec."
-                if is_dev_search and any(kw in title or kw in desc for kw in non_dev_keywords):
-                    job["match_score"] = 0
-                    job["match_justification"] = (job.get("match_justification") or "") + " [Hors dev: mécanique/formation/manufacturing.]"
-                # Utilisateur veut un STAGE : l'offre doit être clairement un stage/intern, sinon 0
-                if user_wants_stage and job.get("match_score", 0) > 0:
-                    if not any(kw in text for kw in stage_intern_keywords):
-                        job["match_score"] = 0
-                        job["match_justification"] = "Recherche stage : l'offre n'est pas un stage/intern."
-
+        except GeminiRateLimitError:
+            raise
         except Exception as e:
             logger.error(f"🔴 Judge AI Error: {e}")
 
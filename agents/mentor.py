@@ -351,7 +351,8 @@ IMPORTANT: Réponds UNIQUEMENT avec le JSON, sans texte avant ni après, sans ba
             "\n[JS_CODE]\n"
             "(Logique d'animation et interactions réelles. Pas de commentaire vide !)\n"
         )
-        response = await self.generate_response(prompt, max_tokens=8192, image_data=image_data)
+        # Génération créative : chaque demande doit produire un nouveau design (pas de cache)
+        response = await self.generate_response(prompt, max_tokens=8192, image_data=image_data, use_cache=False)
         
         # Extraction par Regex unifiée et insensible à la casse
         def extract_section(tag, text):
@@ -2,8 +2,9 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from loguru import logger
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import time
 import jwt
 import bcrypt
 import os
@@ -69,7 +70,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Cache process des utilisateurs authentifiés : user_id -> (champs, expiration monotonic).
+# Seuls les champs des contrôles d'accès et de quota y sont gardés (pas le CV : voir load_saved_cv).
+# Invalidé par invalidate_user() après toute écriture sur ces champs (profil, tier, Stripe).
+_USER_FIELDS = {"_id": 0, "id": 1, "email": 1, "subscription_tier": 1}
+_user_cache: Dict[str, Tuple[dict, float]] = {}
+
+
+async def load_user(user_id: str, max_age: Optional[float] = None) -> Optional[dict]:
+    """Utilisateur (id, email, tier) depuis le cache ou MongoDB ; copie propre à l'appelant."""
+    now = time.monotonic()
+    cached = _user_cache.get(user_id)
+    if cached and cached[1] > now:
+        return dict(cached[0])
+    user = await get_db().users.find_one({"id": user_id}, _USER_FIELDS)
+    if user is None:
+        _user_cache.pop(user_id, None)
+        return None
+    if len(_user_cache) >= settings.auth_user_cache_max:
+        # Éviction grossière : les entrées expirées d'abord, sinon la plus ancienne insérée
+        for key in [k for k, (_, exp) in _user_cache.items() if exp <= now] or [next(iter(_user_cache))]:
+            _user_cache.pop(key, None)
+    ttl = settings.auth_user_cache_ttl if max_age is None else min(max_age, settings.auth_user_cache_ttl)
+    _user_cache[user_id] = (user, now + ttl)
+    return dict(user)
+
+
+async def load_saved_cv(user_id: str) -> Optional[str]:
+    """CV sauvegardé de l'utilisateur (lu à la demande, jamais mis en cache)."""
+    profile = await get_db().users.find_one({"id": user_id}, {"cv_text": 1, "_id": 0})
+    return (profile or {}).get("cv_text") or None
+
+
+def invalidate_user(user_id: Optional[str] = None):
+    """À appeler après une mise à jour de l'utilisateur ; sans argument, vide tout le cache."""
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(user_id, None)
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Utilisateur du jeton : le dict retourné sert de contexte à la requête (id, email, tier),
+    les endpoints n'ont pas à relire users pour ces champs.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -82,9 +127,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
     except jwt.PyJWTError:
         raise credentials_exception
-        
-    db = get_db()
-    user = await db.users.find_one({"id": user_id}, {"_id": 0, "id": 1, "email": 1, "subscription_tier": 1})
+
+    # Jamais servi depuis le cache au-delà de l'expiration du jeton
+    max_age = max(0.0, payload["exp"] - time.time()) if payload.get("exp") else None
+    user = await load_user(user_id, max_age=max_age)
     if user is None:
         raise credentials_exception
     return user
@@ -110,6 +156,8 @@ async def register(user_data: UserCreate):
             "created_at": datetime.utcnow()
         }
         await db.users.insert_one(new_user)
+        from core.dashboard_stats import dashboard_stats
+        await dashboard_stats.user_created("FREE")
         
         # Create token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -217,6 +265,8 @@ async def google_login(payload: GoogleTokenRequest):
             }
             await db.users.insert_one(new_user)
             tier = "FREE"
+            from core.dashboard_stats import dashboard_stats
+            await dashboard_stats.user_created(tier)
         else:
             user_id = user["id"]
             tier = user.get("subscription_tier", "FREE")
@@ -269,8 +269,8 @@ async def websocket_interview(websocket: WebSocket, token: str):
             await websocket.close(code=1008)
             return
             
-        db = get_db()
-        user = await db.users.find_one({"id": user_id})
+        from api.auth import load_user
+        user = await load_user(user_id)
         if not user:
             logger.error(f"WS Auth: User {user_id} not found")
             await websocket.close(code=1008)
@@ -321,6 +321,8 @@ async def websocket_interview(websocket: WebSocket, token: str):
         selected_voice  = voice_map.get(recruiter_id, "fr-FR-DeniseNeural")
         recruiter_names = {"tech": "Sophie", "hr": "Marc", "ceo": "Alice"}
         recruiter_name  = recruiter_names.get(recruiter_id, "Sophie")
+        # "binary" : audio poussé phrase par phrase en trames binaires ; sinon un message base64 par réponse
+        binary_audio    = cfg.get("audioMode") == "binary"
 
     except Exception as e:
         logger.error(f"WS Setup Error: {e}")
@@ -384,25 +386,15 @@ ENTRETIEN COMPLET : Mène l'entretien de bout en bout. Après avoir couvert les
         "recruiter_name": recruiter_name
     })
 
-    async def _speak(text):
-        try:
-            communicate = edge_tts.Communicate(text, selected_voice)
-            chunks = []
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    chunks.append(chunk["data"])
-            if chunks:
-                full_audio_b64 = base64.b64encode(b"".join(chunks)).decode("utf-8")
-                await websocket.send_json({"type": "voice", "audio": full_audio_b64})
-        except Exception as ve:
-            logger.error(f"TTS Error: {ve}")
-
-    asyncio.create_task(_speak(greeting))
+    from core.voice_stream import VoiceStreamer, get_tts_engine
+    voice = VoiceStreamer(websocket.send_json, websocket.send_bytes, get_tts_engine(selected_voice), binary=binary_audio)
+    greeting_task = asyncio.create_task(voice.speak(greeting))
     
-    conversation_history = [
-        {"role": "system",    "content": system_prompt},
-        {"role": "assistant", "content": greeting}
-    ]
+    # Contexte borné : prompt système (en cache Gemini si possible) + résumé glissant + derniers échanges
+    from core.interview_context import InterviewContext
+    context = InterviewContext(system_prompt, llm_client, INTERVIEW_LLM_MODEL)
+    await context.prepare()
+    context.add("assistant", greeting)
 
     # 6. Main loop
     try:
@@ -414,14 +406,21 @@ ENTRETIEN COMPLET : Mène l'entretien de bout en bout. Après avoir couvert les
                 continue
             
             await websocket.send_json({"type": "thinking"})
-            conversation_history.append({"role": "user", "content": user_msg})
-            
-            full_prompt = "\n".join([f"{m['role']}: {m['content']}" for m in conversation_history])
+            context.add("user", user_msg)
+            # L'accueil doit être entièrement parti avant la réponse suivante (ordre des segments audio)
+            await greeting_task
             
             try:
-                response_text = await llm_client.generate(full_prompt, model=INTERVIEW_LLM_MODEL)
+                # Réponse LLM en flux : chaque phrase est affichée et synthétisée dès qu'elle est complète
+                deltas = llm_client.stream_chat(
+                    context.messages(), model=INTERVIEW_LLM_MODEL, priority="interactive", **context.request_kwargs()
+                )
+                response_text = await voice.speak_stream(deltas)
                 if not response_text:
                     response_text = "Je vous prie de m'excuser, pouvez-vous reformuler ?"
+                    await voice.speak(response_text)
+            except WebSocketDisconnect:
+                raise
             except Exception as llm_err:
                 logger.error(f"LLM Error in interview: {llm_err}")
                 response_text = "⚠️ Désolé, j'ai rencontré un problème technique pour générer ma réponse. Pouvons-nous reprendre ?"
@@ -430,15 +429,18 @@ ENTRETIEN COMPLET : Mène l'entretien de bout en bout. Après avoir couvert les
                     "message": "Erreur technique LLM. L'entretien peut être instable.",
                     "recruiter_name": recruiter_name
                 })
+                await voice.speak(response_text)
 
-            conversation_history.append({"role": "assistant", "content": response_text})
+            context.add("assistant", response_text)
+            # Résumé des échanges anciens en tâche de fond, pendant que le candidat répond
+            context.maybe_compact()
             
+            # Texte complet (remplace les fragments "chunk" côté client)
             await websocket.send_json({
                 "type": "recruiter_response",
                 "text": response_text,
                 "recruiter_name": recruiter_name
             })
-            asyncio.create_task(_speak(response_text))
             
     except WebSocketDisconnect:
         logger.info("WS Interview Disconnected")
@@ -449,3 +451,5 @@ ENTRETIEN COMPLET : Mène l'entretien de bout en bout. Après avoir couvert les
             await websocket.close()
         except:
             pass
+    finally:
+        await context.close()
@@ -1,5 +1,5 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from loguru import logger
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -12,15 +12,14 @@ import os
 import sys
 import socket
 import time
-import zipfile
 
 from agents.orchestrator import OrchestratorAgent
 
 app = FastAPI(title="GoldArmy Agent V2 API", version="2.0.0")
 
-from api.auth import get_current_user, router as auth_router
+from api.auth import get_current_user, invalidate_user, load_saved_cv, router as auth_router
 from api.interview import router as interview_router
-from api.subscription import check_subscription_limit, log_usage
+from api.subscription import reserve_quota, release_quota, log_usage
 from api.stripe_service import create_checkout_session, handle_webhook_payload
 from core.database import get_db
 
@@ -43,6 +42,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # ETag et URL GET du document lisibles par le front (revalidation If-None-Match via /api/cv-artifacts)
+    expose_headers=["ETag", "Content-Location", "X-CV-Theme", "X-CV-Cache"],
 )
 
 @app.middleware("http")
@@ -68,6 +69,19 @@ async def startup_event():
         logger.info("🤖 Étape 2: Initialisation de l'orchestrateur d'agents...")
         await orchestrator.initialize()
         
+        logger.info("🔌 Étape 3: Ouverture du pool HTTP Gemini partagé...")
+        from llm.gemini_client import get_shared_session
+        await get_shared_session()
+        
+        logger.info("🖨️ Étape 4: Démarrage du pool de rendu des documents...")
+        from core.render_pool import get_render_service
+        await get_render_service().warmup()
+        
+        from core.dashboard_stats import dashboard_stats
+        dashboard_stats.start_reconciler()
+        from core.source_health import get_source_health
+        get_source_health().start_flusher()
+        
         logger.success("✨ Initialisation du backend terminée avec succès!")
     except Exception as e:
         logger.error(f"💥 Erreur critique lors de l'initialisation: {e}")
@@ -76,6 +90,24 @@ async def startup_event():
     # --- Démarrage Automatique du Frontend (Désactivé en Production) ---
     logger.info("ℹ️ Skip frontend auto-start (Production Mode)")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    from llm.gemini_client import close_shared_session
+    from tools.http_client import close_http_clients
+    from tools.html_parsing import shutdown_parse_pool
+    from core.render_pool import get_render_service
+    from core.pdf_extraction import get_pdf_extraction_service
+    logger.info("🛑 Arrêt du backend : fermeture des pools de connexions...")
+    await close_shared_session()
+    await close_http_clients()
+    shutdown_parse_pool()
+    get_render_service().shutdown()
+    get_pdf_extraction_service().pool.shutdown()
+    from core.dashboard_stats import dashboard_stats
+    dashboard_stats.stop_reconciler()
+    from core.source_health import get_source_health
+    await get_source_health().stop_flusher()
+
 class ChatRequest(BaseModel):
     message: str
     cv_text: Optional[str] = None
@@ -135,28 +167,20 @@ def read_root():
 @app.post("/api/parse-pdf")
 async def parse_pdf(file: UploadFile = File(...)):
     """
-    Receives a PDF CV from the frontend, extracts text using PyMuPDF (fitz), 
-    and returns the raw text. Wait for PyMuPDF to be installed.
+    Receives a PDF CV from the frontend, extracts text using PyMuPDF (fitz) in the extraction
+    pool, and returns the raw text plus per-page text blocks.
     """
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Seuls les fichiers PDF sont acceptés.")
     
-    try:
-        import fitz # PyMuPDF
-        
-        content = await file.read()
-        pdf_document = fitz.open(stream=content, filetype="pdf")
-        text = ""
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            text += page.get_text()
-            
-        return {"status": "success", "text": text.strip()}
-    except ImportError:
-         raise HTTPException(status_code=500, detail="PyMuPDF (fitz) n'est pas installé sur le serveur.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors de la lecture du PDF: {str(e)}")
-
+    extraction = await _extract_pdf_upload(file)
+    return {
+        "status": "success",
+        "text": extraction["text"],
+        "pages": extraction["pages"],
+        "page_count": extraction["page_count"],
+        "truncated": extraction["truncated"],
+    }
 
 class CvRewriteRequest(BaseModel):
     cv_json: str  # JSON string du CV structuré
@@ -164,6 +188,111 @@ class CvRewriteRequest(BaseModel):
     theme_id: Optional[str] = "midnight"  # midnight, emerald, modern, minimal, bold, banker, tech, classic, vibrant, luxury
 
 
+async def _render_document(func, *args) -> bytes:
+    """Rendu CPU-bound dans le pool de processus ; 503 + Retry-After si la file est pleine."""
+    from core.render_pool import get_render_service, RenderSaturatedError, RenderTimeoutError
+    try:
+        return await get_render_service().run(func, *args)
+    except RenderSaturatedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Génération de documents saturée, réessayez dans quelques secondes.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+async def _extract_pdf_upload(file: UploadFile, max_pages: Optional[int] = None) -> dict:
+    """Extraction PDF partagée (fichier temporaire, pool de processus, cache par empreinte)."""
+    from core.pdf_extraction import get_pdf_extraction_service, PdfTooLargeError, PdfExtractionError
+    from core.render_pool import RenderSaturatedError, RenderTimeoutError
+    try:
+        return await get_pdf_extraction_service().extract_upload(file, max_pages=max_pages)
+    except PdfTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except PdfExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RenderSaturatedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Analyse des PDF saturée, réessayez dans quelques secondes.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except RenderTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ImportError:
+        raise HTTPException(status_code=500, detail="PyMuPDF (fitz) n'est pas installé sur le serveur.")
+
+
+# Thèmes de core/cv_ats_generator.py (ordre d'affichage du sélecteur)
+CV_THEMES = ("midnight", "emerald", "modern", "minimal", "bold", "banker", "tech", "classic", "vibrant", "luxury")
+
+
+async def _get_or_render(cache, key: str, kind: str, func, *args):
+    """Document depuis le cache des CV rendus, sinon rendu dans le pool puis mis en cache ; retourne (octets, hit)."""
+    data = await cache.get(key, kind) if cache else None
+    if data is not None:
+        return data, True
+    data = await _render_document(func, *args)
+    if cache:
+        await cache.put(key, kind, data)
+    return data, False
+
+
+async def _cached_document(kind: str, cv_data: Dict[str, Any], theme_id: str, func, *args):
+    """
+    Document CV depuis le cache adressé par contenu, rendu seulement si absent ; retourne (octets, en-têtes).
+    Les POST ne sont jamais revalidés par le navigateur : Content-Location donne l'URL GET
+    (/api/cv-artifacts/...) qui, elle, répond 304 à If-None-Match.
+    """
+    from core.artifact_cache import artifact_key, artifact_url, etag_for, get_artifact_cache
+    key = artifact_key(cv_data, kind, theme_id)
+    headers = {"ETag": etag_for(key), "Cache-Control": "no-store"}
+    cache = get_artifact_cache()
+    data, hit = await _get_or_render(cache, key, kind, func, *args)
+    headers["X-CV-Cache"] = "HIT" if hit else "MISS"
+    if cache:
+        headers["Content-Location"] = artifact_url(key, kind)
+    return data, headers
+
+
+def _parse_cv_json_input(cv_data_input: Any) -> Dict[str, Any]:
+    """cv_json reçu du frontend (dict ou chaîne JSON, éventuellement dans un bloc ```json) → dict normalisé."""
+    if cv_data_input is None:
+        raise HTTPException(status_code=400, detail="cv_json manquant")
+
+    if isinstance(cv_data_input, str):
+        cv_data_input = cv_data_input.strip()
+        if cv_data_input.startswith("```json"):
+            cv_data_input = cv_data_input[7:].strip()
+        if cv_data_input.endswith("```"):
+            cv_data_input = cv_data_input[:-3].strip()
+            
+        try:
+            cv_data = json.loads(cv_data_input)
+        except json.JSONDecodeError as e:
+            import re
+            import logging
+            logging.warning(f"Initial JSON decode failed: {e}. Attempting regex extraction.")
+            match = re.search(r'\{.*\}', cv_data_input, re.DOTALL)
+            if match:
+                try:
+                    cv_data = json.loads(match.group(0))
+                except json.JSONDecodeError as e2:
+                    logging.error(f"Regex JSON decode failed: {e2}")
+                    raise e2
+            else:
+                raise e
+    elif isinstance(cv_data_input, dict):
+        cv_data = cv_data_input
+    else:
+        cv_data = {}
+
+    from core.cv_generator import normalize_cv_json
+    return normalize_cv_json(cv_data)
+
+
 @app.post("/api/generate-cv-pdf")
 async def generate_cv_pdf_endpoint(raw_request: Request):
     """
@@ -171,69 +300,38 @@ async def generate_cv_pdf_endpoint(raw_request: Request):
     Génère un PDF avec le design du thème choisi (midnight, emerald, modern, etc.).
     """
     try:
-        from core.cv_ats_generator import generate_ats_cv_pdf
+        from core.render_pool import render_cv_pdf
 
         body = await raw_request.json()
-        cv_data_input = body.get("cv_json")
         filename = (body.get("filename") or "CV_ATS_Optimise").replace(" ", "_").strip()
         # Accepter theme_id ou themeId (camelCase) pour compatibilité
         theme_id = body.get("theme_id") or body.get("themeId")
         if not isinstance(theme_id, str) or not theme_id.strip():
             theme_id = "midnight"
         theme_id = theme_id.strip().lower()
-        valid_themes = {"midnight", "emerald", "modern", "minimal", "bold", "banker", "tech", "classic", "vibrant", "luxury"}
-        if theme_id not in valid_themes:
+        if theme_id not in CV_THEMES:
             theme_id = "midnight"
 
-        if cv_data_input is None:
-            raise HTTPException(status_code=400, detail="cv_json manquant")
-
-        if isinstance(cv_data_input, str):
-            cv_data_input = cv_data_input.strip()
-            if cv_data_input.startswith("```json"):
-                cv_data_input = cv_data_input[7:].strip()
-            if cv_data_input.endswith("```"):
-                cv_data_input = cv_data_input[:-3].strip()
-                
-            try:
-                cv_data = json.loads(cv_data_input)
-            except json.JSONDecodeError as e:
-                import re
-                import logging
-                logging.warning(f"Initial JSON decode failed: {e}. Attempting regex extraction.")
-                match = re.search(r'\{.*\}', cv_data_input, re.DOTALL)
-                if match:
-                    try:
-                        cv_data = json.loads(match.group(0))
-                    except json.JSONDecodeError as e2:
-                        logging.error(f"Regex JSON decode failed: {e2}")
-                        raise e2
-                else:
-                    raise e
-        elif isinstance(cv_data_input, dict):
-            cv_data = cv_data_input
-        else:
-            cv_data = {}
-
-        from core.cv_generator import normalize_cv_json
-        cv_data = normalize_cv_json(cv_data)
+        cv_data = _parse_cv_json_input(body.get("cv_json"))
         import logging
         logging.info(f"Generating PDF for theme {theme_id} with data keys: {list(cv_data.keys())}")
         
-        pdf_bytes = generate_ats_cv_pdf(cv_data, theme_id=theme_id)
+        pdf_bytes, cache_headers = await _cached_document("pdf", cv_data, theme_id, render_cv_pdf, cv_data, theme_id)
         if not filename.endswith(".pdf"):
             filename += ".pdf"
 
         headers = {
             "Content-Disposition": f'attachment; filename="{filename}"',
             "X-CV-Theme": theme_id,
-            "Cache-Control": "no-store, no-cache, must-revalidate",
+            **cache_headers,
         }
         return StreamingResponse(
             io.BytesIO(pdf_bytes),
             media_type="application/pdf",
             headers=headers
         )
+    except HTTPException:
+        raise
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"JSON CV invalide: {str(e)}")
     except Exception as e:
@@ -241,6 +339,162 @@ async def generate_cv_pdf_endpoint(raw_request: Request):
         logging.exception("Erreur generation PDF")
         raise HTTPException(status_code=500, detail=f"Erreur génération PDF: {str(e)}")
 
+@app.post("/api/generate-cv-docx")
+async def generate_cv_docx_endpoint(raw_request: Request):
+    """
+    Reçoit cv_json + filename dans le body JSON.
+    Génère un DOCX ATS (core/cv_generator.py), éditable dans Word.
+    """
+    try:
+        from core.render_pool import render_cv_docx
+
+        body = await raw_request.json()
+        filename = (body.get("filename") or "CV_ATS_Optimise").replace(" ", "_").strip()
+        cv_data = _parse_cv_json_input(body.get("cv_json"))
+
+        docx_bytes, cache_headers = await _cached_document("docx", cv_data, "", render_cv_docx, cv_data)
+        if not filename.endswith(".docx"):
+            filename += ".docx"
+
+        return StreamingResponse(
+            io.BytesIO(docx_bytes),
+            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                **cache_headers,
+            },
+        )
+    except HTTPException:
+        raise
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"JSON CV invalide: {str(e)}")
+    except Exception as e:
+        logger.exception("Erreur generation DOCX")
+        raise HTTPException(status_code=500, detail=f"Erreur génération DOCX: {str(e)}")
+
+@app.post("/api/generate-cv-batch")
+async def generate_cv_batch_endpoint(raw_request: Request):
+    """
+    Reçoit cv_json + theme_ids (défaut : tous) + include_docx + thumbnails + format ("zip" ou "urls").
+    Rend toutes les variantes en parallèle dans le pool (cv_json parsé et normalisé une seule fois).
+    - zip  : archive CV_<thème>.pdf (+ CV.docx, + thumbnails/<thème>.png)
+    - urls : JSON avec un lien /api/cv-artifacts/... par variante (nécessite le cache des CV rendus)
+    """
+    try:
+        from core.artifact_cache import artifact_key, artifact_url, get_artifact_cache
+        from core.render_pool import render_cv_pdf, render_cv_docx, render_thumbnail, build_zip
+        from config.settings import settings
+
+        body = await raw_request.json()
+        cv_data = _parse_cv_json_input(body.get("cv_json"))
+        requested = body.get("theme_ids") or body.get("themeIds") or list(CV_THEMES)
+        theme_ids = list(dict.fromkeys(str(t).strip().lower() for t in requested if str(t).strip().lower() in CV_THEMES))
+        if not theme_ids:
+            raise HTTPException(status_code=400, detail=f"Aucun thème valide (disponibles : {', '.join(CV_THEMES)})")
+        include_docx = bool(body.get("include_docx"))
+        with_thumbnails = bool(body.get("thumbnails", True))
+        output = (body.get("format") or "zip").lower()
+        if output not in ("zip", "urls"):
+            raise HTTPException(status_code=400, detail=f"format inconnu : {output} (zip ou urls)")
+
+        cache = get_artifact_cache()
+        if output == "urls" and cache is None:
+            raise HTTPException(status_code=400, detail="format=urls indisponible : cache des CV rendus désactivé")
+
+        # Variantes rendues par petits groupes : un lot ne remplit jamais seul la file du pool
+        # (render_max_pending), sinon un second lot simultané échouerait en 503 après un rendu partiel
+        slots = asyncio.Semaphore(max(1, min(settings.render_workers, settings.render_max_pending // 2)))
+
+        async def _theme(theme_id: str) -> Dict[str, Any]:
+            key = artifact_key(cv_data, "pdf", theme_id)
+            async with slots:
+                pdf_bytes, _ = await _get_or_render(cache, key, "pdf", render_cv_pdf, cv_data, theme_id)
+                png_bytes = None
+                if with_thumbnails:
+                    try:
+                        # Même clé que le PDF : la miniature suit la version du générateur PDF
+                        png_bytes, _ = await _get_or_render(
+                            cache, key, "png", render_thumbnail, pdf_bytes, settings.cv_thumbnail_width
+                        )
+                    except ImportError:
+                        logger.warning("PyMuPDF (fitz) absent : miniatures de CV ignorées")
+            return {"theme_id": theme_id, "key": key, "pdf": pdf_bytes, "png": png_bytes}
+
+        tasks = [_theme(t) for t in theme_ids]
+        if include_docx:
+            async def _docx() -> Dict[str, Any]:
+                key = artifact_key(cv_data, "docx")
+                async with slots:
+                    docx_bytes, _ = await _get_or_render(cache, key, "docx", render_cv_docx, cv_data)
+                return {"theme_id": None, "key": key, "docx": docx_bytes}
+            tasks.append(_docx())
+        variants = await asyncio.gather(*tasks)
+
+        if output == "urls":
+            items = []
+            for v in variants:
+                if v["theme_id"] is None:
+                    items.append({"type": "docx", "url": artifact_url(v["key"], "docx")})
+                    continue
+                items.append({
+                    "type": "pdf",
+                    "theme_id": v["theme_id"],
+                    "url": artifact_url(v["key"], "pdf"),
+                    "thumbnail_url": artifact_url(v["key"], "png") if v["png"] else None,
+                })
+            return {"status": "success", "variants": items}
+
+        files = {}
+        for v in variants:
+            if v["theme_id"] is None:
+                files["CV.docx"] = v["docx"]
+                continue
+            files[f"CV_{v['theme_id']}.pdf"] = v["pdf"]
+            if v["png"]:
+                files[f"thumbnails/{v['theme_id']}.png"] = v["png"]
+        zip_bytes = await _render_document(build_zip, files)
+        filename = (body.get("filename") or "CV_themes").replace(" ", "_").strip()
+        if not filename.endswith(".zip"):
+            filename += ".zip"
+        return StreamingResponse(
+            io.BytesIO(zip_bytes),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+        )
+    except HTTPException:
+        raise
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"JSON CV invalide: {str(e)}")
+    except Exception as e:
+        logger.exception("Erreur generation CV (lot)")
+        raise HTTPException(status_code=500, detail=f"Erreur génération des CV: {str(e)}")
+
+_ARTIFACT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "png": "image/png",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+@app.get("/api/cv-artifacts/{name}")
+async def get_cv_artifact(name: str, raw_request: Request):
+    """Sert un document rendu (Content-Location des générations, format=urls du lot) depuis le cache adressé par contenu."""
+    import re
+    from core.artifact_cache import etag_for, etag_matches, get_artifact_cache
+    match = re.fullmatch(r"([0-9a-f]{64})\.(pdf|png|docx)", name)
+    cache = get_artifact_cache()
+    if not match or cache is None:
+        raise HTTPException(status_code=404, detail="Document introuvable")
+    key, kind = match.groups()
+    # Contenu immuable pour une clé donnée
+    headers = {"ETag": etag_for(key), "Cache-Control": "private, max-age=86400, immutable"}
+    if etag_matches(raw_request.headers.get("if-none-match"), key):
+        cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    data = await cache.get(key, kind)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Document expiré, relancez la génération")
+    return Response(content=data, media_type=_ARTIFACT_MEDIA_TYPES[kind], headers=headers)
+
 @app.post("/api/network/enrich")
 async def enrich_company(request: CompanyEnrichRequest):
     """Cherche les profils RH LinkedIn pour une entreprise."""
@@ -255,7 +509,7 @@ async def enrich_company(request: CompanyEnrichRequest):
 async def find_decision_makers_api(req: HeadhunterRequest, current_user: dict = Depends(get_current_user)):
     """Trouve les décideurs clés via l'Agent Headhunter."""
     # Check limit
-    check = await check_subscription_limit(current_user["id"], "headhunter")
+    check = await reserve_quota(current_user["id"], "headhunter")
     if not check["allowed"]:
         raise HTTPException(status_code=403, detail=check["message"])
 
@@ -268,9 +522,9 @@ async def find_decision_makers_api(req: HeadhunterRequest, current_user: dict =
             "target_roles": req.target_roles
         })
         
-        await log_usage(current_user["id"], "headhunter")
         return {"status": "success", "data": profiles}
     except Exception as e:
+        await release_quota(current_user["id"], "headhunter")
         import logging
         logging.error(f"Erreur API Headhunter: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -354,6 +608,7 @@ async def update_profile(request: ProfileUpdateRequest, current_user: dict = Dep
             {"id": current_user["id"]},
             {"$set": fields}
         )
+        invalidate_user(current_user["id"])
         return {"status": "success", "message": "Profil mis à jour avec succès"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -364,17 +619,9 @@ async def upload_cv_endpoint(file: UploadFile = File(...), current_user: dict =
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Seuls les PDF sont acceptés")
     
+    extraction = await _extract_pdf_upload(file)
+    extracted_text = extraction["text"]
     try:
-        import fitz
-        content = await file.read()
-        pdf_document = fitz.open(stream=content, filetype="pdf")
-        text = ""
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            text += page.get_text()
-        
-        extracted_text = text.strip()
-        
         from core.database import get_db
         db = get_db()
         await db.users.update_one(
@@ -382,7 +629,13 @@ async def upload_cv_endpoint(file: UploadFile = File(...), current_user: dict =
             {"$set": {"cv_text": extracted_text}}
         )
         
-        return {"status": "success", "text": extracted_text}
+        return {
+            "status": "success",
+            "text": extracted_text,
+            "pages": extraction["pages"],
+            "page_count": extraction["page_count"],
+            "truncated": extraction["truncated"],
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -445,10 +698,14 @@ async def update_crm_status(app_id: str, request: CRMStatusUpdateRequest, curren
         if request.status == "APPLIED":
             update_fields["applied_at"] = datetime.utcnow()
             
-        await db.applications.update_one(
+        previous = await db.applications.find_one_and_update(
             {"id": app_id, "user_id": current_user["id"]},
-            {"$set": update_fields}
+            {"$set": update_fields},
+            projection={"status": 1},
         )
+        if previous:
+            from core.dashboard_stats import dashboard_stats
+            await dashboard_stats.status_changed(current_user["id"], previous.get("status"), request.status)
         
         return {"status": "success"}
     except Exception as e:
@@ -458,6 +715,7 @@ async def update_crm_status(app_id: str, request: CRMStatusUpdateRequest, curren
 @app.post("/api/crm/applications/{app_id}/followup")
 async def generate_followup_email(app_id: str, current_user: dict = Depends(get_current_user)):
     """Génère un email de relance personnalisé et incrémente le compteur MongoDB."""
+    reserved = False
     try:
         from core.database import get_db
         db = get_db()
@@ -472,9 +730,10 @@ async def generate_followup_email(app_id: str, current_user: dict = Depends(get_
         notes = app_data.get("notes", "")
 
         # Check limit
-        check = await check_subscription_limit(current_user["id"], "follow_up")
+        check = await reserve_quota(current_user["id"], "follow_up")
         if not check["allowed"]:
             raise HTTPException(status_code=403, detail=check["message"])
+        reserved = True
 
         # Increment follow-up counter (scoped by user_id for security)
         updated = await db.applications.find_one_and_update(
@@ -512,16 +771,18 @@ async def generate_followup_email(app_id: str, current_user: dict = Depends(get_
         if not email_text or not email_text.strip():
             raise HTTPException(status_code=503, detail="Réponse vide du modèle. Réessayez.")
 
-        await log_usage(current_user["id"], "follow_up")
-
         return {
             "status": "success",
             "email": email_text,
             "followUpCount": follow_up_count
         }
     except HTTPException:
+        if reserved:
+            await release_quota(current_user["id"], "follow_up")
         raise
     except Exception as e:
+        if reserved:
+            await release_quota(current_user["id"], "follow_up")
         import logging
         logging.error(f"Followup generation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -540,17 +801,15 @@ async def download_portfolio_zip(current_user: dict = Depends(get_current_user))
         raise HTTPException(status_code=404, detail="Aucun portfolio trouvé. Générez-en un d'abord !")
     
     project = user["last_portfolio"]
-    zip_buffer = io.BytesIO()
-    
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.writestr("index.html", project.get("html", ""))
-        zip_file.writestr("style.css", project.get("css", "/* Extra CSS */"))
-        zip_file.writestr("script.js", project.get("js", "// Extra JS"))
-        
-    zip_buffer.seek(0)
+    from core.render_pool import build_zip
+    zip_bytes = await _render_document(build_zip, {
+        "index.html": project.get("html", ""),
+        "style.css": project.get("css", "/* Extra CSS */"),
+        "script.js": project.get("js", "// Extra JS"),
+    })
     
     return StreamingResponse(
-        zip_buffer,
+        io.BytesIO(zip_bytes),
         media_type="application/x-zip-compressed",
         headers={"Content-Disposition": "attachment; filename=goldarmy_portfolio.zip"}
     )
@@ -559,51 +818,14 @@ async def download_portfolio_zip(current_user: dict = Depends(get_current_user))
 async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
     """Récupère les statistiques réelles pour le Dashboard depuis MongoDB Atlas."""
     try:
-        from core.database import get_db
-        db = get_db()
-        
-        # 1. Candidatures envoyées (tout sauf TO_APPLY)
-        applied_count = await db.applications.count_documents({
-            "status": {"$ne": "TO_APPLY"}, 
-            "user_id": current_user["id"]
-        })
-        
-        # 2. Entretiens (status = INTERVIEW)
-        interview_count = await db.applications.count_documents({
-            "status": "INTERVIEW", 
-            "user_id": current_user["id"]
-        })
-        
-        # 3. Réseau (Contacts totaux — user direct + système)
-        network_count = await db.contacts.count_documents({
-            "$or": [
-                {"user_id": current_user["id"]},
-                {"user_id": "system_user"}
-            ]
-        })
-        
-        # 4. CV Analysés (Candidatures totales)
-        cv_analyzed = await db.applications.count_documents({
-            "user_id": current_user["id"]
-        })
-        
-        # 5. Croissance Mensuelle (Aggregation Pipeline)
-        pipeline = [
-            {"$match": {
-                "user_id": current_user["id"],
-                "created_at": {"$exists": True, "$ne": None}
-            }},
-            {"$group": {
-                "_id": {
-                    "$dateToString": {"format": "%Y-%m", "date": {"$toDate": "$created_at"}}
-                },
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"_id": 1}}
-        ]
-        
-        monthly_raw = await db.applications.aggregate(pipeline).to_list(length=None)
-        monthly_dict = {row["_id"]: row["count"] for row in monthly_raw if row.get("_id")}
+        # Document pré-agrégé (core/dashboard_stats.py) : lecture ponctuelle sur _id
+        from core.dashboard_stats import dashboard_stats
+        stats = await dashboard_stats.get_user_stats(current_user["id"])
+        applied_count = stats["applied"]
+        interview_count = stats["interviews"]
+        network_count = stats["network"]
+        cv_analyzed = stats["applications"]
+        monthly_dict = stats["monthly"]
 
         import datetime
         from dateutil.relativedelta import relativedelta
@@ -708,10 +930,12 @@ async def chat_endpoint(request: ChatRequest, current_user: dict = Depends(get_c
     Handles general chat, search requests, and CV context.
     """
     logger.info(f"📥 REQUEST /api/chat - User: {current_user['email']} | Message: {request.message[:50]}")
+    reserved = False
     try:
-        # Intercept search for limit check
+        # Intercept search for limit check (unité réservée, remboursée si la réponse n'est pas une recherche)
         if request.nb_results or any(k in request.message.lower() for k in ["cherche", "trouve", "stage", "emploi", "job"]):
-            check = await check_subscription_limit(current_user["id"], "sniper_search")
+            check = await reserve_quota(current_user["id"], "sniper_search")
+            reserved = check["allowed"]
             if not check["allowed"]:
                 return {
                     "status": "error",
@@ -722,13 +946,11 @@ async def chat_endpoint(request: ChatRequest, current_user: dict = Depends(get_c
         cv_text = request.cv_text
         cv_filename = request.cv_filename
 
-        # Auto-CV Retrieval from MongoDB if missing
+        # Auto-CV : CV sauvegardé du profil si la requête n'en fournit pas
         if not cv_text:
-            from core.database import get_db
-            db = get_db()
-            user_profile = await db.users.find_one({"id": current_user["id"]}, {"cv_text": 1, "_id": 0})
-            if user_profile and user_profile.get("cv_text"):
-                cv_text = user_profile["cv_text"]
+            saved_cv = await load_saved_cv(current_user["id"])
+            if saved_cv:
+                cv_text = saved_cv
                 cv_filename = "CV_Profil_Sauvegarde.pdf"
                 logger.info(f"Using stored CV for user {current_user['id']}")
 
@@ -744,9 +966,13 @@ async def chat_endpoint(request: ChatRequest, current_user: dict = Depends(get_c
         
         response = await orchestrator.think(task)
 
-        # Log usage si recherche d'emploi
+        # Usage compté seulement si recherche d'emploi
+        if reserved and response.get("type") != "job_search_results":
+            reserved = False
+            await release_quota(current_user["id"], "sniper_search")
         if response.get("type") == "job_search_results":
-            await log_usage(current_user["id"], "sniper_search")
+            if not reserved:
+                await log_usage(current_user["id"], "sniper_search")
             # Enrichissement carnet en arrière-plan : site officiel + emails RH pour chaque entreprise
             asyncio.create_task(_enrich_contacts_from_jobs(response.get("content"), current_user["id"]))
         
@@ -764,10 +990,82 @@ async def chat_endpoint(request: ChatRequest, current_user: dict = Depends(get_c
 
         return {"status": "success", "data": response}
     except Exception as e:
+        if reserved:
+            await release_quota(current_user["id"], "sniper_search")
         import logging
         logging.exception("Erreur /api/chat")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Recherche Sniper en streaming (Server-Sent Events).
+    Événements : plan, stage, source (progression par scraper), jobs (offres validées par lot du Judge),
+    done (résultat final identique à /api/chat) ou error.
+    """
+    logger.info(f"📥 REQUEST /api/chat/stream - User: {current_user['email']} | Message: {request.message[:50]}")
+    from core.search_stream import SearchEventStream
+
+    check = await reserve_quota(current_user["id"], "sniper_search")
+    if not check["allowed"]:
+        async def _limit_reached():
+            yield SearchEventStream.format_sse("error", {"type": "limit_reached", "content": check["message"]})
+        return StreamingResponse(_limit_reached(), media_type="text/event-stream")
+
+    cv_text = request.cv_text
+    cv_filename = request.cv_filename
+    if not cv_text:
+        saved_cv = await load_saved_cv(current_user["id"])
+        if saved_cv:
+            cv_text = saved_cv
+            cv_filename = "CV_Profil_Sauvegarde.pdf"
+
+    stream = SearchEventStream()
+    task = {
+        "query": request.message,
+        "cv_text": cv_text,
+        "cv_filename": cv_filename,
+        "nb_results": request.nb_results,
+        "location": request.location,
+        "session_id": request.session_id or "default",
+        "on_event": stream.emit,
+    }
+
+    async def _run_search():
+        succeeded = False
+        try:
+            search_result = await orchestrator.job_searcher.execute_task(task)
+            if search_result.get("success"):
+                succeeded = True
+                asyncio.create_task(_enrich_contacts_from_jobs(search_result, current_user["id"]))
+            stream.emit("done", type="job_search_results", content=search_result)
+        except Exception as e:
+            logger.error(f"❌ Erreur /api/chat/stream: {e}")
+            stream.emit("error", type="search_failed", content=str(e))
+        finally:
+            stream.close()
+            if not succeeded:
+                # Recherche échouée ou client parti : l'unité réservée est rendue
+                await asyncio.shield(release_quota(current_user["id"], "sniper_search"))
+
+    search_task = asyncio.create_task(_run_search())
+
+    async def _event_source():
+        try:
+            async for chunk in stream.events():
+                yield chunk
+        finally:
+            # Client déconnecté : inutile de continuer à scraper pour personne
+            if not search_task.done():
+                search_task.cancel()
+
+    return StreamingResponse(
+        _event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/api/adapt-cv")
 async def adapt_cv_endpoint(request: CVAdaptRequest, current_user: dict = Depends(get_current_user)):
     """
@@ -779,21 +1077,24 @@ async def adapt_cv_endpoint(request: CVAdaptRequest, current_user: dict = Depend
             raise HTTPException(status_code=400, detail="Le texte du CV est introuvable ou trop court. Veuillez uploader un CV d'abord.")
             
         # Check limit
-        check = await check_subscription_limit(current_user["id"], "cv_adaptation")
+        check = await reserve_quota(current_user["id"], "cv_adaptation")
         if not check["allowed"]:
             raise HTTPException(status_code=403, detail=check["message"])
             
-        from agents.cv_adapter import CVAdapterAgent
-        adapter = CVAdapterAgent()
-        await adapter.initialize()
-        
-        result = await adapter.adapt(
-            job_title=request.job_title,
-            job_desc=request.job_description,
-            cv_text=request.cv_text
-        )
+        try:
+            from agents.cv_adapter import CVAdapterAgent
+            adapter = CVAdapterAgent()
+            await adapter.initialize()
+            
+            result = await adapter.adapt(
+                job_title=request.job_title,
+                job_desc=request.job_description,
+                cv_text=request.cv_text
+            )
+        except BaseException:
+            await release_quota(current_user["id"], "cv_adaptation")
+            raise
         
-        await log_usage(current_user["id"], "cv_adaptation")
         return {"status": "success", "data": result}
     except Exception as e:
         from loguru import logger
@@ -829,8 +1130,8 @@ async def add_crm_from_link(request: CRMLinkRequest, current_user: dict = Depend
             html_content = resp.text
 
         # 2. Nettoyer basiquement le HTML et extraire les métadonnées pour Gemini (utile pour les sites JS)
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html_content, "html.parser")
+        from tools.html_parsing import make_soup
+        soup = make_soup(html_content)
         
         # Extraire le title et les metas OG pour aider l'IA (très utile si le body est vide car rendu en JS)
         page_title = soup.title.string if soup.title else ""
@@ -912,6 +1213,8 @@ Ne rajoute PAS de balises markdown comme ```json, renvoie uniquement l'objet JSO
         }
         
         await db.applications.insert_one(new_app)
+        from core.dashboard_stats import dashboard_stats
+        await dashboard_stats.application_inserted(new_app)
         
         # Rend les ObjectId stringifiable
         new_app["_id"] = str(new_app["_id"])
@@ -964,6 +1267,8 @@ async def create_crm_entry(request: CRMApplicationRequest, current_user: dict =
         }
         
         await db.applications.insert_one(new_app)
+        from core.dashboard_stats import dashboard_stats
+        await dashboard_stats.application_inserted(new_app)
         return {"status": "success", "data": {"id": app_id}}
     except Exception as e:
         logger.error(f"Error creating CRM entry: {e}")
@@ -982,10 +1287,14 @@ async def update_crm_entry(item_id: str, updates: Dict[str, Any], current_user:
         if not update_fields:
             return {"status": "success", "message": "No changes"}
             
-        await db.applications.update_one(
+        previous = await db.applications.find_one_and_update(
             {"id": item_id, "user_id": current_user["id"]},
-            {"$set": update_fields}
+            {"$set": update_fields},
+            projection={"status": 1},
         )
+        if previous and "status" in update_fields:
+            from core.dashboard_stats import dashboard_stats
+            await dashboard_stats.status_changed(current_user["id"], previous.get("status"), update_fields["status"])
         
         return {"status": "success"}
     except Exception as e:
@@ -997,7 +1306,12 @@ async def delete_crm_entry(item_id: str, current_user: dict = Depends(get_curren
     """Supprime une entrée CRM MongoDB."""
     try:
         db = get_db()
-        await db.applications.delete_one({"id": item_id, "user_id": current_user["id"]})
+        deleted = await db.applications.find_one_and_delete(
+            {"id": item_id, "user_id": current_user["id"]},
+            projection={"user_id": 1, "status": 1, "created_at": 1},
+        )
+        from core.dashboard_stats import dashboard_stats
+        await dashboard_stats.application_deleted(deleted)
         return {"status": "success", "message": "Deleted"}
     except Exception as e:
         logger.error(f"Erreur delete CRM: {e}")
@@ -1076,22 +1390,40 @@ def _require_admin(current_user: dict):
 async def admin_stats(current_user: dict = Depends(get_current_user)):
     """Statistiques globales pour le tableau de bord admin (effectif, tiers, candidatures)."""
     _require_admin(current_user)
-    db = get_db()
-    total_users = await db.users.count_documents({})
-    pipeline = [
-        {"$group": {"_id": "$subscription_tier", "count": {"$sum": 1}}},
-    ]
+    from core.dashboard_stats import dashboard_stats
+    global_stats = await dashboard_stats.get_global_stats()
+    total_users = global_stats.get("users", 0)
     tiers = {"pro": 0, "essential": 0, "free": 0}
-    async for doc in db.users.aggregate(pipeline):
-        t = (doc["_id"] or "FREE").upper()
+    for t, count in (global_stats.get("tiers") or {}).items():
         if t == "PRO":
-            tiers["pro"] = doc["count"]
+            tiers["pro"] = count
         elif t == "ESSENTIAL":
-            tiers["essential"] = doc["count"]
+            tiers["essential"] = count
         elif t == "FREE" or t == "ADMIN":
-            tiers["free"] = tiers.get("free", 0) + doc["count"]
-    total_applications = await db.applications.count_documents({})
-    return {"status": "success", "data": {"total_users": total_users, "tiers": tiers, "total_applications": total_applications}}
+            tiers["free"] = tiers.get("free", 0) + count
+    total_applications = global_stats.get("applications", 0)
+    from llm.response_cache import get_response_cache
+    from core.judge_scores import get_judge_score_store
+    from llm.rate_limiter import get_llm_governor
+    from core.render_pool import get_render_service
+    from core.artifact_cache import get_artifact_cache
+    from core.pdf_extraction import get_pdf_extraction_service
+    from core.source_health import get_source_health
+    llm_cache = get_response_cache()
+    cv_artifacts = get_artifact_cache()
+    judge_scores = get_judge_score_store()
+    return {"status": "success", "data": {
+        "total_users": total_users,
+        "tiers": tiers,
+        "total_applications": total_applications,
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "judge_scores": judge_scores.stats() if judge_scores else None,
+        "llm_governor": get_llm_governor().stats(),
+        "render_pool": get_render_service().stats(),
+        "pdf_extraction": get_pdf_extraction_service().stats(),
+        "cv_artifacts": cv_artifacts.stats() if cv_artifacts else None,
+        "sources": get_source_health().stats(),
+    }}
 
 
 @app.get("/api/admin/users")
@@ -1134,6 +1466,10 @@ async def admin_promote_user(req: PromoteUserRequest, current_user: dict = Depen
         {"email": req.email},
         {"$set": {"subscription_tier": req.tier}}
     )
+    from core.dashboard_stats import dashboard_stats
+    from api.auth import invalidate_user
+    await dashboard_stats.tier_changed(target.get("subscription_tier"), req.tier)
+    invalidate_user(target.get("id"))
     
     logger.info(f"👑 Admin {current_user['email']} a promu {req.email} au tier {req.tier}")
     return {"status": "success", "message": f"Utilisateur {req.email} promu au tier {req.tier} avec succès."}
@@ -1237,19 +1573,23 @@ def _ats_rule_score(text: str) -> int:
 @app.post("/api/public/mini-audit")
 async def public_mini_audit(file: UploadFile = File(...)):
     """
-    Scanne la 1ère page du CV (PyMuPDF), calcule un score ATS fiable (règles + LLM rapide)
+    Scanne la 1ère page du CV (service d'extraction PDF partagé, mis en cache), calcule un score ATS fiable (règles + LLM rapide)
     et renvoie score /100 + jusqu'à 7 défauts avec corrections. Traitement accéléré.
     """
     try:
-        import fitz  # PyMuPDF
+        extraction = await _extract_pdf_upload(file, max_pages=1)
+    except HTTPException as e:
+        # Saturation : le client réessaie (Retry-After) plutôt que de recevoir un faux score
+        if e.status_code in (503, 504):
+            raise
+        extraction = None
+
+    try:
         import re
 
-        file_bytes = await file.read()
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        if len(doc) == 0:
-            raise HTTPException(status_code=400, detail="PDF vide.")
-        first_page_text = doc[0].get_text()
-        doc.close()
+        if extraction is None:
+            raise ValueError("PDF illisible")
+        first_page_text = extraction["text"]
 
         text_snippet = first_page_text[:2500]
         rule_score = _ats_rule_score(text_snippet)
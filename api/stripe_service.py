@@ -76,7 +76,7 @@ async def update_user_subscription(session):
 
     db = get_db()
     try:
-        await db.users.update_one(
+        previous = await db.users.find_one_and_update(
             {"id": user_id},
             {
                 "$set": {
@@ -84,8 +84,14 @@ async def update_user_subscription(session):
                     "stripe_customer_id": stripe_cust_id,
                     "stripe_subscription_id": stripe_sub_id
                 }
-            }
+            },
+            projection={"subscription_tier": 1},
         )
+        if previous:
+            from core.dashboard_stats import dashboard_stats
+            await dashboard_stats.tier_changed(previous.get("subscription_tier"), tier)
+        from api.auth import invalidate_user
+        invalidate_user(user_id)
         logger.info(f"✅ Abonnement mis à jour (Stripe) pour {user_id}: {tier}")
     except Exception as e:
         logger.error(f"❌ Erreur DB Webhook: {e}")
@@ -96,15 +102,21 @@ async def cancel_user_subscription(subscription):
     
     db = get_db()
     try:
-        await db.users.update_one(
+        previous = await db.users.find_one_and_update(
             {"stripe_customer_id": stripe_cust_id},
             {
                 "$set": {
                     "subscription_tier": "FREE",
                     "stripe_subscription_id": None
                 }
-            }
+            },
+            projection={"id": 1, "subscription_tier": 1},
         )
+        if previous:
+            from core.dashboard_stats import dashboard_stats
+            await dashboard_stats.tier_changed(previous.get("subscription_tier"), "FREE")
+            from api.auth import invalidate_user
+            invalidate_user(previous.get("id"))
         logger.info(f"⚠️ Abonnement résilié (Stripe) pour client {stripe_cust_id}")
     except Exception as e:
         logger.error(f"❌ Erreur DB Webhook Cancel: {e}")
@@ -1,7 +1,15 @@
-from datetime import datetime, date
-from typing import Dict, Any, Optional
+"""
+Quotas SaaS par forfait.
+
+Compteurs atomiques dans la collection "usage_counters" : un document par (utilisateur, fonctionnalité, période),
+_id = "user_id:feature:bucket" avec bucket = "d:AAAA-MM-JJ", "m:AAAA-MM" ou "total".
+- reserve_quota : vérification + incrément en une seule opération conditionnelle (pas de course entre deux requêtes)
+- release_quota : remboursement si le traitement échoue après réservation
+- le tier vient du cache utilisateur de api.auth (déjà chargé par get_current_user pour la requête)
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 from core.database import get_db
-import uuid
 
 # Configuration des limites
 # Format: { 'tier': { 'feature': { 'limit': N, 'period': 'day'|'month'|'total' } } }
@@ -44,96 +52,165 @@ SUBSCRIPTION_LIMITS = {
     }
 }
 
+PERIODS = ("day", "month", "total")
+
+async def get_user_tier(user_id: str) -> str:
+    """Tier de l'utilisateur (cache utilisateur partagé avec l'authentification)."""
+    from api.auth import load_user
+    user = await load_user(user_id)
+    return (user or {}).get("subscription_tier") or "FREE"
+
+
+def period_bucket(period: str, now: Optional[datetime] = None) -> Tuple[str, Optional[datetime]]:
+    """Identifiant de période (UTC) et date d'expiration du compteur (purge par index TTL)."""
+    now = now or datetime.utcnow()
+    if period == "day":
+        start = datetime(now.year, now.month, now.day)
+        return f"d:{start:%Y-%m-%d}", start + timedelta(days=2)
+    if period == "month":
+        next_month = datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+        return f"m:{now:%Y-%m}", next_month + timedelta(days=1)
+    return "total", None
+
+
+def _counter_id(user_id: str, feature: str, bucket: str) -> str:
+    return f"{user_id}:{feature}:{bucket}"
+
+
+def _limit_config(tier: str, feature: str) -> Optional[Dict[str, Any]]:
+    return SUBSCRIPTION_LIMITS.get(tier, SUBSCRIPTION_LIMITS['FREE']).get(feature)
+
+
+def _limit_reached(feature: str, count: int, limit: int) -> Dict[str, Any]:
+    return {
+        'allowed': False,
+        'current': count,
+        'limit': limit,
+        'message': f"Limite atteinte pour {feature} ({count}/{limit}). Passez au forfait supérieur !"
+    }
+
+
+async def _current_count(user_id: str, feature: str, period: str) -> int:
+    db = get_db()
+    # Cas spécial pour address_book qui compte les lignes réelles
+    if period == 'total' and feature == 'address_book':
+        return await db.contacts.count_documents({"user_id": user_id})
+    bucket, _ = period_bucket(period)
+    doc = await db.usage_counters.find_one({"_id": _counter_id(user_id, feature, bucket)}, {"count": 1})
+    return doc["count"] if doc else 0
+
+
 async def check_subscription_limit(user_id: str, feature: str) -> Dict[str, Any]:
     """
-    Vérifie si un utilisateur a atteint sa limite pour une fonctionnalité donnée.
+    Vérifie si un utilisateur a atteint sa limite pour une fonctionnalité donnée (lecture seule).
     Retourne {'allowed': bool, 'current': int, 'limit': int, 'message': str}
+    Pour consommer une unité, utiliser reserve_quota (vérification + incrément atomiques).
     """
-    db = get_db()
     try:
-        # 1. Récupérer le tier de l'utilisateur
-        user = await db.users.find_one({"id": user_id})
-        tier = user.get('subscription_tier', 'FREE') if user else 'FREE'
-        
+        tier = await get_user_tier(user_id)
+
         # Bypass pour l'ADMIN
         if tier == 'ADMIN':
             return {'allowed': True, 'current': 0, 'limit': 999999}
 
-        limits = SUBSCRIPTION_LIMITS.get(tier, SUBSCRIPTION_LIMITS['FREE'])
-        config = limits.get(feature)
-        
+        config = _limit_config(tier, feature)
         if not config:
             return {'allowed': True} # Feature non limitée
-            
-        limit = config['limit']
-        period = config['period']
-        
-        # 2. Compter l'usage actuel
-        count = 0
-        
-        if period == 'day':
-            today_str = date.today().isoformat()
-            pipeline = [
-                {"$match": {"user_id": user_id, "feature": feature, "used_at": today_str}},
-                {"$group": {"_id": None, "total": {"$sum": "$count"}}}
-            ]
-            result = await db.usage_logs.aggregate(pipeline).to_list(length=1)
-            count = result[0]["total"] if result else 0
-
-        elif period == 'month':
-            month_str = date.today().strftime("%Y-%m")
-            pipeline = [
-                {"$match": {
-                    "user_id": user_id, 
-                    "feature": feature, 
-                    "used_at": {"$regex": f"^{month_str}"}
-                }},
-                {"$group": {"_id": None, "total": {"$sum": "$count"}}}
-            ]
-            result = await db.usage_logs.aggregate(pipeline).to_list(length=1)
-            count = result[0]["total"] if result else 0
-
-        elif period == 'total':
-             # Cas spécial pour address_book qui compte les lignes réelles
-            if feature == 'address_book':
-                count = await db.contacts.count_documents({"user_id": user_id})
-            else:
-                pipeline = [
-                    {"$match": {"user_id": user_id, "feature": feature}},
-                    {"$group": {"_id": None, "total": {"$sum": "$count"}}}
-                ]
-                result = await db.usage_logs.aggregate(pipeline).to_list(length=1)
-                count = result[0]["total"] if result else 0
 
+        limit = config['limit']
+        count = await _current_count(user_id, feature, config['period'])
         if count >= limit:
-            return {
-                'allowed': False,
-                'current': count,
-                'limit': limit,
-                'message': f"Limite atteinte pour {feature} ({count}/{limit}). Passez au forfait supérieur !"
-            }
-            
+            return _limit_reached(feature, count, limit)
         return {'allowed': True, 'current': count, 'limit': limit}
     except Exception as e:
         from loguru import logger
         logger.error(f"Erreur vérification limite: {e}")
         return {'allowed': False, 'message': 'Erreur interne de vérification des limites.'}
 
-async def log_usage(user_id: str, feature: str, count: int = 1):
-    """Enregistre une utilisation de fonctionnalité."""
-    db = get_db()
-    try:
-        today_str = date.today().isoformat()
-        
-        # Upsert: if a log for today exists, increment it. Otherwise, create it.
-        await db.usage_logs.update_one(
-            {"user_id": user_id, "feature": feature, "used_at": today_str},
+
+def _bucket_updates(user_id: str, feature: str, count: int, skip: Optional[str] = None) -> List[Any]:
+    """Upserts des compteurs jour / mois / total (un changement de forfait en cours de période garde un historique juste)."""
+    from pymongo import UpdateOne
+    ops = []
+    for period in PERIODS:
+        bucket, expires_at = period_bucket(period)
+        if bucket == skip:
+            continue
+        ops.append(UpdateOne(
+            {"_id": _counter_id(user_id, feature, bucket)},
             {
                 "$inc": {"count": count},
-                "$setOnInsert": {"id": str(uuid.uuid4())}
+                "$setOnInsert": {"user_id": user_id, "feature": feature, "bucket": bucket, "expires_at": expires_at},
             },
-            upsert=True
-        )
+            upsert=True,
+        ))
+    return ops
+
+
+async def reserve_quota(user_id: str, feature: str) -> Dict[str, Any]:
+    """
+    Vérifie ET consomme une unité en une opération atomique.
+    Retourne le même format que check_subscription_limit ; si 'allowed', appeler release_quota en cas d'échec du traitement.
+    """
+    from pymongo import ReturnDocument
+    from pymongo.errors import DuplicateKeyError
+    db = get_db()
+    try:
+        tier = await get_user_tier(user_id)
+        config = None if tier == 'ADMIN' else _limit_config(tier, feature)
+        if not config or (config['period'] == 'total' and feature == 'address_book'):
+            check = await check_subscription_limit(user_id, feature)
+            if check.get('allowed'):
+                await log_usage(user_id, feature)
+            return check
+
+        limit = config['limit']
+        if limit <= 0:
+            # Fonctionnalité fermée au forfait : l'upsert créerait sinon le compteur à 1 et laisserait passer
+            return _limit_reached(feature, 0, limit)
+        bucket, expires_at = period_bucket(config['period'])
+        counter_id = _counter_id(user_id, feature, bucket)
+        doc = None
+        for _ in range(2):
+            try:
+                # Filtre "count < limit" + upsert : compteur plein → l'upsert tente d'insérer le même _id → DuplicateKeyError
+                doc = await db.usage_counters.find_one_and_update(
+                    {"_id": counter_id, "count": {"$lt": limit}},
+                    {
+                        "$inc": {"count": 1},
+                        "$setOnInsert": {"user_id": user_id, "feature": feature, "bucket": bucket, "expires_at": expires_at},
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                    projection={"count": 1},
+                )
+                break
+            except DuplicateKeyError:
+                # Soit le compteur est plein, soit deux premières utilisations simultanées : un second essai tranche
+                continue
+        if doc is None:
+            return _limit_reached(feature, limit, limit)
+
+        others = _bucket_updates(user_id, feature, 1, skip=bucket)
+        if others:
+            await db.usage_counters.bulk_write(others, ordered=False)
+        return {'allowed': True, 'current': doc["count"], 'limit': limit}
+    except Exception as e:
+        from loguru import logger
+        logger.error(f"Erreur réservation quota: {e}")
+        return {'allowed': False, 'message': 'Erreur interne de vérification des limites.'}
+
+
+async def release_quota(user_id: str, feature: str, count: int = 1):
+    """Rembourse une réservation (traitement échoué)."""
+    await log_usage(user_id, feature, -count)
+
+
+async def log_usage(user_id: str, feature: str, count: int = 1):
+    """Enregistre une utilisation de fonctionnalité (sans vérification de limite)."""
+    db = get_db()
+    try:
+        await db.usage_counters.bulk_write(_bucket_updates(user_id, feature, count), ordered=False)
     except Exception as e:
         from loguru import logger
         logger.error(f"Erreur lors de l'enregistrement de l'utilisation SaaS: {e}")
@@ -0,0 +1 @@
+"""Benchmarks reproductibles (aucun appel réseau ni LLM réel)."""
@@ -0,0 +1,189 @@
+"""
+Micro-benchmark du parsing HTML des scrapers sur pages enregistrées.
+
+Chaque cas exécute la fonction de parsing réelle d'une source (mêmes sélecteurs que la production)
+sur une page sauvegardée, avec chaque parseur disponible (html.parser, lxml) :
+
+- jobbank_dump.html   → GovSearcher._parse_jobbank_html
+- job_debug.html      → job_description_fetcher.extract_description (page d'offre Job Bank)
+- ddg_dump.html       → liens d'une page de résultats DuckDuckGo (web_searcher / linkedin_scraper)
+- fixtures/*.html     → Indeed, LinkedIn, France Travail, page d'offre
+
+Mesures : temps médian et p95 par page (ms), nombre d'éléments extraits (doit être identique entre parseurs).
+
+Usage :
+    python -m benchmarks.parse_bench --runs 30
+    python -m benchmarks.parse_bench --parsers lxml --json parse.json
+    python -m benchmarks.parse_bench --baseline parse.json --tolerance 0.2   # code 1 si régression
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger
+
+import tools.html_parsing as html_parsing
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _ddg_links(html: str) -> List[str]:
+    soup = html_parsing.make_soup(html)
+    return [a["href"] for a in soup.find_all("a", href=True)]
+
+
+def build_cases() -> List[Tuple[str, Path, Callable[[str], Any]]]:
+    """(nom, page, fonction de parsing) — les sources sont instanciées sans accès réseau."""
+    from tools.gov_searcher import GovSearcher
+    from tools.indeed_searcher import IndeedMultiSearcher
+    from tools.job_description_fetcher import extract_description
+    from tools.linkedin_jobs_searcher import LinkedInJobsSearcher
+
+    gov = GovSearcher()
+    indeed = IndeedMultiSearcher()
+    linkedin = LinkedInJobsSearcher()
+    return [
+        ("jobbank", ROOT_DIR / "jobbank_dump.html", lambda html: gov._parse_jobbank_html(html, "Canada", 50)),
+        ("job_posting", ROOT_DIR / "job_debug.html", extract_description),
+        ("ddg", ROOT_DIR / "ddg_dump.html", _ddg_links),
+        ("indeed", FIXTURES_DIR / "indeed.html", lambda html: indeed._parse(html, "Paris", "fr.indeed.com", 50)),
+        ("linkedin", FIXTURES_DIR / "linkedin_cards.html", lambda html: linkedin._parse_linkedin_job_cards(html, "Montreal", 50)),
+        ("france_travail", FIXTURES_DIR / "france_travail.html",
+         lambda html: gov._parse_france_travail_html(html, "Paris", 50, "développeur")),
+        ("job_page", FIXTURES_DIR / "job_page.html", extract_description),
+    ]
+
+
+def available_parsers(requested: List[str]) -> List[str]:
+    parsers = []
+    for name in requested:
+        if name == "lxml":
+            try:
+                import lxml  # noqa: F401
+            except ImportError:
+                logger.warning("lxml non installé : cas lxml ignorés")
+                continue
+        parsers.append(name)
+    return parsers
+
+
+def _count(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, str):
+        return 1
+    return len(result)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def bench_case(func: Callable[[str], Any], html: str, runs: int) -> Dict[str, Any]:
+    func(html)  # chauffe : imports, compilation des sélecteurs
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(html)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "items": _count(result),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    parsers = available_parsers(args.parsers)
+    results = []
+    for name, path, func in build_cases():
+        if not path.exists():
+            logger.warning(f"Page absente, cas ignoré : {path}")
+            continue
+        html = path.read_text(encoding="utf-8", errors="replace")
+        row = {"case": name, "kb": round(len(html) / 1024, 1), "parsers": {}}
+        for parser in parsers:
+            html_parsing._parser_name = parser
+            row["parsers"][parser] = bench_case(func, html, args.runs)
+        results.append(row)
+    html_parsing._parser_name = None
+    return {"config": {"runs": args.runs, "parsers": parsers}, "results": results}
+
+
+def print_report(report: Dict[str, Any]):
+    parsers = report["config"]["parsers"]
+    print()
+    header = f"{'cas':<16} {'Ko':>7} " + " ".join(f"{p + ' p50':>16} {'p95':>8} {'n':>4}" for p in parsers)
+    if len(parsers) > 1:
+        header += f" {'gain':>6}"
+    print(header)
+    for row in report["results"]:
+        line = f"{row['case']:<16} {row['kb']:>7.1f} "
+        line += " ".join(
+            f"{row['parsers'][p]['p50_ms']:>16.2f} {row['parsers'][p]['p95_ms']:>8.2f} {row['parsers'][p]['items']:>4}"
+            for p in parsers
+        )
+        if len(parsers) > 1:
+            first, last = row["parsers"][parsers[0]]["p50_ms"], row["parsers"][parsers[-1]]["p50_ms"]
+            line += f" {first / last if last else 0:>5.1f}x"
+        print(line)
+        counts = {row["parsers"][p]["items"] for p in parsers}
+        if len(counts) > 1:
+            print(f"  ⚠️ {row['case']} : nombre d'éléments différent selon le parseur {counts}")
+
+
+def compare(report: Dict[str, Any], baseline_path: str, tolerance: float) -> List[str]:
+    """Régressions de p50 par cas et par parseur par rapport à un rapport précédent."""
+    baseline = {row["case"]: row for row in json.loads(Path(baseline_path).read_text())["results"]}
+    regressions = []
+    for row in report["results"]:
+        ref = baseline.get(row["case"])
+        if not ref:
+            continue
+        for parser, stats in row["parsers"].items():
+            ref_stats = ref["parsers"].get(parser)
+            if ref_stats and stats["p50_ms"] > ref_stats["p50_ms"] * (1 + tolerance):
+                regressions.append(f"{row['case']} ({parser}) : p50 {ref_stats['p50_ms']} → {stats['p50_ms']} ms")
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    report = run(args)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        print(f"\nRapport écrit dans {args.json}")
+    if args.baseline:
+        regressions = compare(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Régressions : " + " ; ".join(regressions))
+            return 1
+        print("\n✅ Pas de régression par rapport à la référence")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmark du parsing HTML des scrapers")
+    parser.add_argument("--runs", type=int, default=20, help="Répétitions par cas et par parseur")
+    parser.add_argument("--parsers", nargs="+", default=["html.parser", "lxml"], help="Parseurs BeautifulSoup à comparer")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    parser.add_argument("--baseline", help="Rapport JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Dégradation tolérée du p50 (0.2 = +20%%)")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level=cli_args.log_level)
+    sys.exit(main(cli_args))
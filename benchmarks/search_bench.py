@@ -0,0 +1,365 @@
+"""
+Benchmark de bout en bout du Swarm Sniper (JobSearchAgent.execute_task) sur fixtures enregistrées.
+
+- HTTP : toutes les requêtes des outils passent par tools.http_client ; elles sont rejouées
+  depuis benchmarks/fixtures (LinkedIn, Indeed, Jooble, JSearch, FindWork, France Travail, pages d'offres)
+- LLM : un client de substitution rejoue les sorties Gemini enregistrées (fixtures/llm)
+- Latences simulées configurables (réseau par requête, LLM par appel + par 1k tokens)
+
+Mesures : latence totale, durée par étape (profile, hunt_v1, judge_v1, hunt_v2, judge_v2, enrich),
+pic d'allocations (tracemalloc) et débit à N recherches simultanées.
+
+Usage :
+    python -m benchmarks.search_bench --concurrency 1 4 8 --runs 3
+    python -m benchmarks.search_bench --json bench.json
+    python -m benchmarks.search_bench --baseline bench.json --tolerance 0.2   # code 1 si régression
+"""
+import argparse
+import asyncio
+import html
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger
+
+from config.settings import settings
+from llm.rate_limiter import estimate_tokens
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+KEYWORD_PLACEHOLDER = "{{keyword}}"
+
+# (hôte contient, chemin commence par, fixture) — premier motif qui correspond
+ROUTES: List[Tuple[str, str, str]] = [
+    ("jooble.org", "/api/", "jooble.json"),
+    ("jsearch.p.rapidapi.com", "/search", "jsearch.json"),
+    ("findwork.dev", "/api/jobs", "findwork.json"),
+    ("linkedin.com", "/jobs-guest/jobs/api/", "linkedin_cards.html"),
+    ("linkedin.com", "/jobs/search", "linkedin_cards.html"),
+    ("www.indeed.com", "/jobs", "indeed.html"),
+    ("candidat.francetravail.fr", "/offres/recherche/detail", "job_page.html"),
+    ("candidat.francetravail.fr", "/offres/recherche", "france_travail.html"),
+    # Pages de détail (enrichissement des descriptions)
+    ("linkedin.com", "/jobs/view/", "job_page.html"),
+    ("www.indeed.com", "/rc/clk", "job_page.html"),
+    ("jooble.org", "/desc/", "job_page.html"),
+    ("findwork.dev", "/", "job_page.html"),
+    ("careers.example.com", "/", "job_page.html"),
+]
+
+STAGES = ["profile", "hunt_v1", "judge_v1", "hunt_v2", "judge_v2", "enrich", "total"]
+
+
+class ReplayResponse:
+    """Sous-ensemble de aiohttp.ClientResponse utilisé par les outils."""
+
+    def __init__(self, status: int, body: str, url: str):
+        self.status = status
+        self.url = url
+        self._body = body
+
+    async def text(self, *args, **kwargs) -> str:
+        return self._body
+
+    async def json(self, *args, **kwargs) -> Any:
+        return json.loads(self._body)
+
+    async def read(self) -> bytes:
+        return self._body.encode("utf-8")
+
+
+class ReplayTransport:
+    """Rejoue les fixtures HTTP ; les requêtes sans fixture reçoivent un 404 et sont comptées."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests: Counter = Counter()
+        self.unmatched: Counter = Counter()
+        self._fixtures: Dict[str, str] = {}
+
+    def _fixture(self, name: str) -> str:
+        if name not in self._fixtures:
+            self._fixtures[name] = (FIXTURES_DIR / name).read_text(encoding="utf-8")
+        return self._fixtures[name]
+
+    @staticmethod
+    def _keyword(url: str, kwargs: Dict[str, Any]) -> str:
+        payload = kwargs.get("json") or {}
+        params = {k: str(v) for k, v in (kwargs.get("params") or {}).items()}
+        params.update({k: v[0] for k, v in parse_qs(urlsplit(url).query).items()})
+        for key in ("keywords", "query", "q", "search", "motsCles"):
+            value = payload.get(key) or params.get(key)
+            if value:
+                # JSearch reçoit "<mots-clés> in <lieu>"
+                return str(value).split(" in ")[0].replace('"', "").strip()
+        return "Développeur"
+
+    async def __call__(self, method: str, url: str, kwargs: Dict[str, Any]) -> ReplayResponse:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for host_part, path_prefix, name in ROUTES:
+            if host_part in host and parts.path.startswith(path_prefix):
+                self.requests[name] += 1
+                body = self._fixture(name)
+                if KEYWORD_PLACEHOLDER in body:
+                    keyword = self._keyword(url, kwargs)
+                    escaped = json.dumps(keyword, ensure_ascii=False)[1:-1] if name.endswith(".json") else html.escape(keyword)
+                    body = body.replace(KEYWORD_PLACEHOLDER, escaped)
+                return ReplayResponse(200, body, url)
+        self.unmatched[host] += 1
+        return ReplayResponse(404, "", url)
+
+
+class ReplayLLMClient:
+    """Remplace UnifiedLLMClient : sorties Gemini enregistrées, choisies d'après le prompt."""
+
+    openrouter_client = None
+
+    def __init__(self, latency: float = 0.0, latency_per_1k_tokens: float = 0.0):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.calls: Counter = Counter()
+        self.prompt_tokens = 0
+        self.cv_profile = (FIXTURES_DIR / "llm" / "cv_profile.json").read_text(encoding="utf-8")
+        self.strategy = (FIXTURES_DIR / "llm" / "search_strategy.json").read_text(encoding="utf-8")
+        self.judge_rules = json.loads((FIXTURES_DIR / "llm" / "judge_rules.json").read_text(encoding="utf-8"))
+
+    async def generate(self, prompt: str, system: Optional[str] = None, **kwargs) -> str:
+        tokens = estimate_tokens(prompt) + estimate_tokens(system or "")
+        self.prompt_tokens += tokens
+        delay = self.latency + self.latency_per_1k_tokens * tokens / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if "Judge recrutement" in prompt:
+            self.calls["judge"] += 1
+            return self._judge(prompt)
+        if "Analyse ce CV" in prompt:
+            self.calls["cv_profile"] += 1
+            return self.cv_profile
+        if "stratégie de recherche" in prompt:
+            self.calls["search_strategy"] += 1
+            return self.strategy
+        self.calls["other"] += 1
+        return "{}"
+
+    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return await self.generate("\n".join(m.get("content", "") for m in messages), **kwargs)
+
+    async def close(self):
+        pass
+
+    def _judge(self, prompt: str) -> str:
+        """Une note par bloc « ID: n » du prompt, selon judge_rules.json."""
+        section = prompt.split("=== OFFRES", 1)[-1]
+        scores = []
+        for block in section.split("\n---\n"):
+            match = re.search(r"ID: (\d+)", block)
+            if not match:
+                continue
+            fields = dict(re.findall(r"^(TITRE|ENTREPRISE|LOC): (.*)$", block, re.M))
+            scores.append({"id": int(match.group(1)), **self._score(fields)})
+        return json.dumps(scores, ensure_ascii=False)
+
+    def _score(self, fields: Dict[str, str]) -> Dict[str, Any]:
+        for rule in self.judge_rules["rules"]:
+            value = fields.get(rule["field"], "").strip()
+            if ("equals" in rule and value == rule["equals"]) or ("contains" in rule and rule["contains"] in value):
+                return {"score": rule["score"], "reason": rule["reason"]}
+        return dict(self.judge_rules["default"])
+
+
+def configure(args: argparse.Namespace) -> Tuple[ReplayTransport, ReplayLLMClient]:
+    """Installe le rejeu HTTP/LLM et neutralise les caches (sauf --warm-caches)."""
+    import core.agent_base
+    from tools.http_client import install_replay
+
+    transport = ReplayTransport(latency=args.http_latency)
+    llm = ReplayLLMClient(latency=args.llm_latency, latency_per_1k_tokens=args.llm_latency_per_1k)
+    install_replay(transport)
+    core.agent_base.UnifiedLLMClient = lambda: llm
+
+    # Clés factices : les sources ne partent que si leur clé est configurée
+    settings.jooble_api_key = settings.jooble_api_key or "bench"
+    settings.rapidapi_key = settings.rapidapi_key or "bench"
+    settings.findwork_api_key = settings.findwork_api_key or "bench"
+    if not args.warm_caches:
+        settings.job_cache_backend = "none"
+        settings.judge_score_cache_backend = "none"
+        settings.llm_cache_backend = "none"
+    # Répartition fixe des vagues : sinon la santé mesurée à un niveau promeut les sources au suivant
+    # et les étapes hunt_v2 / judge_v2 ne sont plus comparables d'un niveau à l'autre
+    settings.source_adaptive_waves = False
+    return transport, llm
+
+
+async def run_search(task: Dict[str, Any], cv_text: Optional[str]) -> Tuple[float, Dict[str, Any]]:
+    """Une recherche complète ; retourne (latence en s, résultat)."""
+    from agents.job_searcher import JobSearchAgent
+
+    agent = JobSearchAgent()
+    started = time.perf_counter()
+    if cv_text:
+        # execute_task ne transmet pas de CV : on enchaîne think/act comme l'API le fait avec un CV
+        result = await agent.act(await agent.think(task, cv_text=cv_text))
+    else:
+        result = await agent.execute_task(task)
+    return time.perf_counter() - started, result
+
+
+async def run_level(concurrency: int, args: argparse.Namespace, cv_text: Optional[str], trace_alloc: bool) -> Dict[str, Any]:
+    """Lance `concurrency` recherches simultanées."""
+    from core.source_health import get_source_health
+
+    # Circuits et télémétrie des sources remis à zéro : chaque passage part du même état
+    get_source_health().reset()
+    tasks = [
+        {"id": f"bench-{concurrency}-{i}", "description": "benchmark", "query": args.query,
+         "location": args.location, "nb_results": args.nb_results}
+        for i in range(concurrency)
+    ]
+    if trace_alloc:
+        tracemalloc.start()
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(run_search(t, cv_text) for t in tasks))
+    wall = time.perf_counter() - started
+    peak = None
+    if trace_alloc:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "wall": wall,
+        "latencies": [lat for lat, _ in outcomes],
+        "timings": [res.get("timings", {}) for _, res in outcomes],
+        "jobs": [res.get("total_jobs_found", 0) for _, res in outcomes],
+        "peak_bytes": peak,
+    }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def summarize(concurrency: int, levels: List[Dict[str, Any]], traced: Dict[str, Any]) -> Dict[str, Any]:
+    latencies = [lat * 1000 for level in levels for lat in level["latencies"]]
+    searches = sum(len(level["latencies"]) for level in levels)
+    wall = sum(level["wall"] for level in levels)
+    stages = {}
+    for stage in STAGES:
+        values = [t[stage] for level in levels for t in level["timings"] if stage in t]
+        if values:
+            stages[stage] = round(statistics.median(values), 1)
+    return {
+        "concurrency": concurrency,
+        "searches": searches,
+        "p50_ms": round(_percentile(latencies, 0.5), 1),
+        "p95_ms": round(_percentile(latencies, 0.95), 1),
+        "throughput_per_s": round(searches / wall, 3) if wall else 0.0,
+        "jobs_per_search": round(statistics.mean(j for level in levels for j in level["jobs"]), 1),
+        "peak_alloc_mb": round(traced["peak_bytes"] / 1_048_576, 2) if traced.get("peak_bytes") else None,
+        "stages_p50_ms": stages,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print()
+    print(f"{'N':>4} {'p50 ms':>9} {'p95 ms':>9} {'rech/s':>8} {'offres':>7} {'pic Mo':>8}   étapes p50 (ms)")
+    for row in report["results"]:
+        stages = " ".join(f"{k}={v}" for k, v in row["stages_p50_ms"].items())
+        peak = f"{row['peak_alloc_mb']:.2f}" if row["peak_alloc_mb"] is not None else "-"
+        print(f"{row['concurrency']:>4} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['throughput_per_s']:>8.2f} "
+              f"{row['jobs_per_search']:>7.1f} {peak:>8}   {stages}")
+    print(f"\nRequêtes HTTP rejouées : {dict(report['http_requests'])}")
+    if report["http_unmatched"]:
+        print(f"Sans fixture (404) : {dict(report['http_unmatched'])}")
+    print(f"Appels LLM : {dict(report['llm_calls'])} | ~{report['llm_prompt_tokens']} tokens de prompt")
+
+
+def compare(report: Dict[str, Any], baseline_path: str, tolerance: float) -> List[str]:
+    """Régressions de p50 par niveau de concurrence par rapport à un rapport précédent."""
+    baseline = {row["concurrency"]: row for row in json.loads(Path(baseline_path).read_text())["results"]}
+    regressions = []
+    for row in report["results"]:
+        ref = baseline.get(row["concurrency"])
+        if ref and row["p50_ms"] > ref["p50_ms"] * (1 + tolerance):
+            regressions.append(f"N={row['concurrency']} : p50 {ref['p50_ms']} → {row['p50_ms']} ms")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    transport, llm = configure(args)
+    cv_text = (FIXTURES_DIR / "cv.txt").read_text(encoding="utf-8") if args.cv else None
+
+    # Tour de chauffe : imports, compilation des regex, parseurs
+    await run_level(1, args, cv_text, trace_alloc=False)
+    transport.requests.clear()
+    transport.unmatched.clear()
+    llm.calls.clear()
+    llm.prompt_tokens = 0
+
+    results = []
+    for concurrency in args.concurrency:
+        levels = [await run_level(concurrency, args, cv_text, trace_alloc=False) for _ in range(args.runs)]
+        # Allocations mesurées sur un passage séparé (tracemalloc ralentit l'exécution)
+        traced = await run_level(concurrency, args, cv_text, trace_alloc=True) if args.alloc else {}
+        results.append(summarize(concurrency, levels, traced))
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+        "results": results,
+        "http_requests": dict(transport.requests),
+        "http_unmatched": dict(transport.unmatched),
+        "llm_calls": dict(llm.calls),
+        "llm_prompt_tokens": llm.prompt_tokens,
+    }
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        print(f"\nRapport écrit dans {args.json}")
+    if args.baseline:
+        regressions = compare(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Régressions : " + " ; ".join(regressions))
+            return 1
+        print("\n✅ Pas de régression par rapport à la référence")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark du Swarm Sniper sur fixtures enregistrées")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Recherches simultanées par niveau")
+    parser.add_argument("--runs", type=int, default=3, help="Répétitions par niveau")
+    parser.add_argument("--query", default="développeur logiciel")
+    parser.add_argument("--location", default="Montreal")
+    parser.add_argument("--nb-results", type=int, default=50)
+    parser.add_argument("--cv", action="store_true", help="Inclure l'analyse du CV (fixtures/cv.txt)")
+    parser.add_argument("--http-latency", type=float, default=0.15, help="Latence simulée par requête HTTP (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Latence simulée par appel LLM (s)")
+    parser.add_argument("--llm-latency-per-1k", type=float, default=0.05, help="Latence LLM additionnelle par 1k tokens de prompt (s)")
+    parser.add_argument("--warm-caches", action="store_true", help="Garder les caches d'offres et de scores actifs")
+    parser.add_argument("--no-alloc", dest="alloc", action="store_false", help="Ne pas mesurer les allocations")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    parser.add_argument("--baseline", help="Rapport JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Dégradation tolérée du p50 (0.2 = +20%%)")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level=cli_args.log_level)
+    sys.exit(asyncio.run(main(cli_args)))
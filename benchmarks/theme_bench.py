@@ -0,0 +1,118 @@
+"""
+Micro-benchmark des thèmes de CV : coût des styles par rendu, avant / après le registre de thèmes.
+
+Pour chaque générateur (ats : cv_ats_generator, pdf : cv_pdf_generator) et chaque thème :
+- build  : construction complète du bundle (getSampleStyleSheet, ParagraphStyle, HexColor), ce que
+           chaque rendu payait avant le registre
+- get    : lecture du bundle partagé dans le registre, ce que chaque rendu paie désormais
+- rendu  : génération complète du PDF sur un CV d'exemple
+
+Mesures : temps médian (ms) ; "gain" = build - get, économisé à chaque rendu.
+
+Usage :
+    python -m benchmarks.theme_bench --runs 20
+    python -m benchmarks.theme_bench --generators ats --json themes.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SAMPLE_CV = {
+    "full_name": "Jeanne Tremblay",
+    "title": "Développeuse Python Senior",
+    "email": "jeanne.tremblay@example.com",
+    "phone": "+1 514 555 0100",
+    "location": "Montréal, QC",
+    "linkedin": "linkedin.com/in/jeanne-tremblay",
+    "summary": "Huit ans d'expérience en backend Python, API asynchrones et traitement de données.",
+    "experiences": [
+        {
+            "title": "Développeuse Backend",
+            "company": "Acme",
+            "location": "Montréal, QC",
+            "start_date": "2020-01",
+            "end_date": "Present",
+            "bullets": [
+                "API de recherche d'offres à fort trafic (p95 divisé par 3).",
+                "Cache distribué et file de rendu des CV.",
+            ],
+        }
+    ],
+    "skills": {"Backend": ["Python", "FastAPI", "asyncio"], "Données": ["MongoDB", "PostgreSQL"]},
+    "education": [
+        {"degree": "Baccalauréat en informatique", "institution": "Université de Montréal", "location": "Montréal, QC", "year": "2016"}
+    ],
+    "languages": ["Français (Natif)", "Anglais (Courant)"],
+}
+
+
+def generators() -> Dict[str, Any]:
+    """Nom → (module du générateur, fonction de rendu)."""
+    from core import cv_ats_generator, cv_pdf_generator
+    return {
+        "ats": (cv_ats_generator, cv_ats_generator.generate_ats_cv_pdf),
+        "pdf": (cv_pdf_generator, cv_pdf_generator.generate_cv_pdf),
+    }
+
+
+def median_ms(func: Callable[[], Any], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 4)
+
+
+def run(runs: int = 10, names: Optional[List[str]] = None, cv_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    cv_data = cv_data or SAMPLE_CV
+    results = []
+    for name, (module, generate) in generators().items():
+        if names and name not in names:
+            continue
+        registry = module.theme_registry
+        for theme_id, theme in module.THEMES.items():
+            registry.get(theme_id)  # chauffe : le bundle est construit ici, une fois
+            generate(cv_data, theme_id=theme_id)
+            build_ms = median_ms(lambda: module._build_theme_bundle(theme_id, theme), runs)
+            get_ms = median_ms(lambda: registry.get(theme_id), runs)
+            render_ms = median_ms(lambda: generate(cv_data, theme_id=theme_id), max(1, runs // 3))
+            results.append({
+                "generator": name, "theme": theme_id,
+                "build_ms": build_ms, "get_ms": get_ms, "render_ms": render_ms,
+                "saved_ms": round(build_ms - get_ms, 4),
+            })
+    return {"config": {"runs": runs}, "results": results}
+
+
+def print_report(report: Dict[str, Any]):
+    print()
+    print(f"{'gén.':>4} {'thème':<10} {'build ms':>9} {'get ms':>8} {'gain ms':>8} {'rendu ms':>9}")
+    for row in report["results"]:
+        print(
+            f"{row['generator']:>4} {row['theme']:<10} {row['build_ms']:>9.3f} {row['get_ms']:>8.4f}"
+            f" {row['saved_ms']:>8.3f} {row['render_ms']:>9.1f}"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Micro-benchmark des thèmes de CV (registre de styles)")
+    parser.add_argument("--runs", type=int, default=10, help="Répétitions par mesure (rendu : runs / 3)")
+    parser.add_argument("--generators", nargs="+", choices=["ats", "pdf"], help="Générateurs à mesurer (défaut : tous)")
+    parser.add_argument("--json", help="Écrire le rapport JSON dans ce fichier")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    cli_args = parse_args()
+    bench_report = run(cli_args.runs, cli_args.generators)
+    print_report(bench_report)
+    if cli_args.json:
+        Path(cli_args.json).write_text(json.dumps(bench_report, ensure_ascii=False, indent=2))
+        print(f"\nRapport écrit dans {cli_args.json}")
@@ -24,6 +24,10 @@ class Settings(BaseSettings):
 
     # Gemini Configuration
     gemini_api_key: Optional[str] = Field(default=None, description="Clé API Gemini")
+    gemini_pool_size: int = Field(default=100, description="Connexions HTTP max du pool Gemini partagé")
+    gemini_pool_per_host: int = Field(default=50, description="Connexions HTTP max par hôte vers l'API Gemini")
+    gemini_dns_cache_ttl: int = Field(default=300, description="Durée du cache DNS du pool Gemini (secondes)")
+    gemini_keepalive_timeout: float = Field(default=60.0, description="Durée de vie des connexions inactives (keep-alive, secondes)")
 
     # Stripe Configuration
     stripe_api_key: Optional[str] = Field(default=None, description="Clé API Stripe Live")
@@ -55,6 +59,103 @@ class Settings(BaseSettings):
     redis_db: int = Field(default=0, description="Redis database")
     redis_enabled: bool = Field(default=False, description="Activer Redis")
     
+    # LLM Response Cache
+    llm_cache_backend: str = Field(default="memory", description="Backend du cache LLM: memory, sqlite, redis ou none")
+    llm_cache_ttl: int = Field(default=3600, description="Durée de vie d'une réponse LLM en cache (secondes)")
+    llm_cache_max_bytes: int = Field(default=64 * 1024 * 1024, description="Budget mémoire du cache LLM en RAM (octets)")
+    llm_cache_sqlite_path: Path = Field(default=Path("./storage/llm_cache.db"), description="Fichier SQLite du cache LLM")
+    
+    # Job Offer Cache (résultats des sources partagés entre recherches)
+    job_cache_backend: str = Field(default="memory", description="Backend du cache des offres: memory, mongo ou none")
+    job_cache_fresh_seconds: Optional[int] = Field(default=None, description="Fenêtre de fraîcheur unique (sinon TTL par source)")
+    job_cache_stale_seconds: int = Field(default=3600, description="Fenêtre stale-while-revalidate après expiration (secondes)")
+    job_cache_max_entries: int = Field(default=5000, description="Nombre max d'entrées du cache des offres en RAM")
+    
+    # Dédoublonnage inter-sources (core.job_dedup)
+    job_dedup_title_similarity: float = Field(default=0.8, description="Similarité min (Jaccard des trigrammes) entre titres de doublons d'une même entreprise (1 = clé exacte seulement)")
+    job_dedup_desc_chars: int = Field(default=200, description="Caractères de début de description comparés entre doublons potentiels")
+
+    # Santé des sources (core.source_health : télémétrie, circuit breaker, vagues adaptatives)
+    source_timeout_default: float = Field(default=12.0, description="Durée max d'un appel de source hors SOURCE_TIMEOUTS (secondes)")
+    source_health_window: int = Field(default=20, description="Appels récents par source pris en compte par le planificateur")
+    source_health_min_samples: int = Field(default=5, description="Appels récents min avant de promouvoir ou rétrograder une source")
+    source_adaptive_waves: bool = Field(default=True, description="Répartir les vagues selon la santé récente des sources (sinon répartition fixe)")
+    source_min_yield: float = Field(default=0.2, description="Part min d'appels récents ramenant des offres réelles (sinon source en vague 2)")
+    source_fast_p90: float = Field(default=4.0, description="Latence p90 (s) max d'une source de vague 1")
+    source_breaker_failures: int = Field(default=3, description="Échecs consécutifs avant ouverture du circuit d'une source")
+    source_breaker_backoff: float = Field(default=30.0, description="Première durée d'ouverture du circuit (secondes, doublée à chaque rechute)")
+    source_breaker_max_backoff: float = Field(default=1800.0, description="Durée max d'ouverture du circuit (secondes)")
+    source_health_flush_interval: int = Field(default=60, description="Intervalle d'écriture des compteurs dans MongoDB (secondes, 0 = désactivé)")
+    source_health_retention_days: int = Field(default=90, description="Conservation des compteurs journaliers par source (jours)")
+
+    # Judge Score Cache (scores mémoïsés par offre + profil)
+    judge_score_cache_backend: str = Field(default="memory", description="Backend des scores Judge: memory, sqlite, redis ou none")
+    judge_score_ttl: int = Field(default=86400, description="Durée de vie d'un score Judge mémoïsé (secondes)")
+    
+    # Judge Batching (lots par budget de tokens + concurrence adaptative AIMD)
+    judge_batch_target_tokens: int = Field(default=12000, description="Taille cible d'un prompt Judge (tokens estimés)")
+    judge_batch_max_jobs: int = Field(default=50, description="Nombre max d'offres par lot Judge")
+    judge_description_chars: int = Field(default=500, description="Caractères de description envoyés au Judge par offre")
+    judge_concurrency_initial: int = Field(default=10, description="Lots Judge simultanés au démarrage")
+    judge_concurrency_min: int = Field(default=2, description="Plancher de concurrence Judge après rate limit")
+    judge_concurrency_max: int = Field(default=30, description="Plafond de concurrence Judge")
+    judge_latency_target: float = Field(default=20.0, description="Latence max d'un lot (s) pour augmenter la concurrence")
+    
+    # LLM Governor (quotas RPM/TPM par modèle + files à priorités)
+    llm_governor_enabled: bool = Field(default=True, description="Active le gouverneur global des appels LLM")
+    llm_rate_limit_pause: float = Field(default=5.0, description="Pause d'un modèle après un 429 sans délai indiqué (secondes)")
+    
+    # HTTP Tools Pool (scrapers et APIs d'emploi)
+    http_pool_size: int = Field(default=200, description="Connexions simultanées max du pool HTTP des outils")
+    http_per_host_limit: int = Field(default=8, description="Requêtes simultanées max par hôte (hors HOST_LIMITS)")
+    http_dns_cache_ttl: int = Field(default=300, description="Durée du cache DNS du pool des outils (secondes)")
+    http_keepalive_timeout: float = Field(default=30.0, description="Durée de vie d'une connexion inactive (secondes)")
+    http_default_timeout: float = Field(default=20.0, description="Timeout total par défaut d'une requête d'outil (secondes)")
+    
+    # Parsing HTML des scrapers (tools.html_parsing)
+    html_parser_backend: str = Field(default="auto", description="Parseur BeautifulSoup : auto (lxml si installé), lxml ou html.parser")
+    html_parse_offload_bytes: int = Field(default=100_000, description="Taille (caractères) à partir de laquelle une page est parsée hors event loop")
+    html_parse_workers: int = Field(default=4, description="Threads dédiés au parsing des pages volumineuses")
+
+    # Render Pool (PDF / DOCX / ZIP hors event loop)
+    render_workers: int = Field(default=2, description="Processus dédiés au rendu des documents")
+    render_max_pending: int = Field(default=16, description="Rendus en cours + en attente max avant HTTP 503")
+    render_timeout: float = Field(default=30.0, description="Durée max d'un rendu (secondes)")
+    cv_thumbnail_width: int = Field(default=240, description="Largeur des miniatures PNG de CV (pixels)")
+    
+    # CV Artifact Cache (PDF/DOCX rendus, adressés par contenu)
+    cv_artifact_backend: str = Field(default="disk", description="Backend du cache des CV rendus: disk, gridfs ou none")
+    cv_artifact_dir: Path = Field(default=Path("./storage/cv_artifacts"), description="Répertoire du cache disque des CV rendus")
+    cv_artifact_max_mb: int = Field(default=500, description="Taille max du cache des CV rendus (Mo)")
+    
+    # Extraction PDF (CV uploadés)
+    pdf_max_bytes: int = Field(default=10 * 1024 * 1024, description="Taille max d'un PDF uploadé (octets)")
+    pdf_max_pages: int = Field(default=20, description="Pages extraites au maximum par PDF")
+    pdf_pages_per_task: int = Field(default=4, description="Pages par tâche d'extraction (tranches traitées en parallèle)")
+    pdf_extract_workers: int = Field(default=2, description="Processus dédiés à l'extraction PDF")
+    pdf_extract_max_pending: int = Field(default=32, description="Extractions en cours + en attente max avant HTTP 503")
+    pdf_extract_timeout: float = Field(default=15.0, description="Durée max d'une tranche d'extraction (secondes)")
+    pdf_text_cache_backend: str = Field(default="memory", description="Backend du cache des textes extraits: memory, sqlite, redis ou none")
+    pdf_text_cache_ttl: int = Field(default=7 * 86400, description="Durée de vie d'un texte extrait en cache (secondes)")
+
+    # Statistiques Dashboard pré-agrégées
+    dashboard_stats_reconcile_interval: int = Field(default=600, description="Intervalle du réconciliateur des stats Dashboard (secondes, 0 = désactivé)")
+    dashboard_stats_reconcile_batch: int = Field(default=50, description="Utilisateurs recalculés par passage du réconciliateur")
+
+    # Cache des utilisateurs authentifiés (get_current_user, quotas)
+    auth_user_cache_ttl: int = Field(default=30, description="Durée de cache d'un utilisateur authentifié (secondes)")
+    auth_user_cache_max: int = Field(default=5000, description="Nombre max d'utilisateurs gardés en cache")
+
+    # Entretien simulé (voix en flux)
+    interview_tts_engine: str = Field(default="edge", description="Moteur TTS de l'entretien: edge ou fake (tests, hors ligne)")
+    interview_tts_min_chars: int = Field(default=24, description="Longueur min d'une phrase envoyée seule à la synthèse")
+    interview_context_tokens: int = Field(default=2500, description="Budget (tokens) des échanges récents envoyés verbatim à chaque tour")
+    interview_recent_turns_min: int = Field(default=4, description="Nombre min de messages récents jamais résumés")
+    interview_summary_model: str = Field(default="gemini-2.0-flash", description="Modèle rapide du résumé glissant d'entretien")
+    interview_context_cache: bool = Field(default=True, description="Mettre le prompt système d'entretien en cache Gemini (cachedContents)")
+    gemini_context_cache_min_tokens: int = Field(default=4096, description="Taille min (tokens estimés) d'un prompt pour le cache de contexte Gemini")
+    gemini_context_cache_ttl: int = Field(default=1800, description="Durée de vie d'un contexte Gemini en cache (secondes)")
+
     # ChromaDB Configuration
     chroma_persist_dir: Path = Field(default=Path("./storage/chroma_db"), description="ChromaDB persist directory")
     
@@ -0,0 +1,214 @@
+"""
+Cache des documents CV rendus (PDF / DOCX), adressé par contenu.
+Clé : sha256(cv_json normalisé + thème + type + version du générateur) — sert aussi d'ETag.
+
+Backends :
+- disk   : un fichier par document, éviction LRU (mtime) au-delà de settings.cv_artifact_max_mb
+- gridfs : bucket MongoDB "cv_artifacts", éviction des plus anciens au-delà de la même limite
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from config.settings import settings
+
+# À incrémenter à chaque modification du rendu (core/cv_ats_generator.py, core/cv_generator.py)
+GENERATOR_VERSIONS = {"pdf": "1", "docx": "1"}
+
+
+def artifact_key(cv_data: Dict[str, Any], kind: str, theme_id: str = "") -> str:
+    """Empreinte d'un document rendu ; `cv_data` doit déjà être passé par normalize_cv_json."""
+    canonical = json.dumps(cv_data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    raw = f"{kind}|{GENERATOR_VERSIONS.get(kind, '0')}|{theme_id}|{canonical}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def etag_for(key: str) -> str:
+    return f'"{key[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    """En-tête If-None-Match (liste d'ETags) contenant l'ETag du document."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return etag_for(key) in candidates
+
+
+def artifact_url(key: str, kind: str) -> str:
+    """URL GET du document (revalidation If-None-Match par le navigateur)."""
+    return f"/api/cv-artifacts/{key}.{kind}"
+
+
+class DiskArtifactBackend:
+    """Fichiers sous `directory` ; la lecture rafraîchit le mtime (LRU)."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None
+
+    def _path(self, key: str, kind: str) -> Path:
+        return self.directory / f"{key}.{kind}"
+
+    def _get(self, key: str, kind: str) -> Optional[bytes]:
+        path = self._path(key, kind)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def _put(self, key: str, kind: str, data: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key, kind)
+        try:
+            # Même clé réécrite (deux rendus simultanés) : l'ancienne taille ne compte plus
+            previous = path.stat().st_size
+        except FileNotFoundError:
+            previous = 0
+        tmp = path.with_suffix(f".{kind}.tmp{os.getpid()}")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # écriture atomique : jamais de PDF tronqué servi
+        if self._total is None:
+            self._total = sum(p.stat().st_size for p in self.directory.iterdir() if p.is_file())
+        else:
+            self._total += len(data) - previous
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        files = sorted((p for p in self.directory.iterdir() if p.is_file()), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        target = int(self.max_bytes * 0.9)  # marge pour ne pas évincer à chaque écriture
+        removed = 0
+        for path in files:
+            if total <= target:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                total -= size
+                removed += 1
+            except FileNotFoundError:
+                continue
+        self._total = total
+        logger.debug(f"🗑️ Cache CV : {removed} document(s) évincé(s)")
+
+    async def get(self, key: str, kind: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key, kind)
+
+    async def put(self, key: str, kind: str, data: bytes):
+        await asyncio.to_thread(self._put, key, kind, data)
+
+
+class GridFSArtifactBackend:
+    """Bucket GridFS partagé entre instances (éviction par date d'upload)."""
+
+    BUCKET = "cv_artifacts"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._bucket = None
+
+    def _get_bucket(self):
+        if self._bucket is None:
+            from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+            from core.database import get_db
+            self._bucket = AsyncIOMotorGridFSBucket(get_db(), bucket_name=self.BUCKET)
+        return self._bucket
+
+    async def get(self, key: str, kind: str) -> Optional[bytes]:
+        from gridfs.errors import NoFile
+        try:
+            stream = await self._get_bucket().open_download_stream_by_name(f"{key}.{kind}")
+        except NoFile:
+            return None
+        return await stream.read()
+
+    async def put(self, key: str, kind: str, data: bytes):
+        bucket = self._get_bucket()
+        await bucket.upload_from_stream(f"{key}.{kind}", data, metadata={"kind": kind})
+        await self._evict()
+
+    async def _evict(self):
+        from core.database import get_db
+        files = get_db()[f"{self.BUCKET}.files"]
+        totals = await files.aggregate([{"$group": {"_id": None, "size": {"$sum": "$length"}}}]).to_list(1)
+        total = totals[0]["size"] if totals else 0
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        async for doc in files.find({}, {"length": 1}).sort("uploadDate", 1):
+            if total <= target:
+                break
+            await self._get_bucket().delete(doc["_id"])
+            total -= doc.get("length", 0)
+
+
+class ArtifactCache:
+    """Lecture/écriture tolérantes aux pannes : un backend indisponible déclenche simplement un rendu."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def get(self, key: str, kind: str) -> Optional[bytes]:
+        started = time.perf_counter()
+        try:
+            data = await self.backend.get(key, kind)
+        except Exception as e:
+            logger.debug(f"Cache CV (lecture) indisponible: {e}")
+            data = None
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            logger.debug(f"📄 Cache CV HIT {key[:12]} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        return data
+
+    async def put(self, key: str, kind: str, data: bytes):
+        try:
+            await self.backend.put(key, kind, data)
+        except Exception as e:
+            logger.debug(f"Cache CV (écriture) indisponible: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# Instance globale
+_artifact_cache: Optional[ArtifactCache] = None
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """Retourne le cache global des CV rendus, ou None si désactivé (CV_ARTIFACT_BACKEND=none)."""
+    global _artifact_cache
+    kind = settings.cv_artifact_backend.lower()
+    if kind == "none":
+        return None
+    if _artifact_cache is None:
+        max_bytes = settings.cv_artifact_max_mb * 1024 * 1024
+        if kind == "gridfs":
+            backend = GridFSArtifactBackend(max_bytes)
+        else:
+            backend = DiskArtifactBackend(settings.cv_artifact_dir, max_bytes)
+        _artifact_cache = ArtifactCache(backend)
+        logger.info(f"📄 Cache des CV rendus activé ({type(backend).__name__})")
+    return _artifact_cache
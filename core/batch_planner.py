@@ -0,0 +1,114 @@
+"""
+Planification des lots LLM par budget de tokens et contrôle de concurrence adaptatif (AIMD).
+- pack_batches : remplit chaque lot jusqu'à une taille de prompt cible (tokens estimés par l'appelant)
+- AIMDConcurrency : +1 slot par fenêtre de succès rapides, ÷2 sur rate limit (429)
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, List, Optional, TypeVar
+
+from loguru import logger
+
+from config.settings import settings
+
+T = TypeVar("T")
+
+
+def pack_batches(items: List[T], cost: Callable[[T], int], target_tokens: int, max_items: int) -> List[List[T]]:
+    """Découpe `items` en lots dont le coût cumulé reste sous `target_tokens` (au moins un élément par lot)."""
+    batches: List[List[T]] = []
+    current: List[T] = []
+    current_cost = 0
+    for item in items:
+        item_cost = cost(item)
+        if current and (current_cost + item_cost > target_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, current_cost = [], 0
+        current.append(item)
+        current_cost += item_cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class AIMDConcurrency:
+    """Limite de concurrence adaptative partagée entre toutes les requêtes d'un même modèle."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, latency_target: float, cooldown: float = 2.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Attend qu'un slot soit libre sous la limite courante."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def record_success(self, latency: float):
+        """Augmentation additive : +1 slot après une fenêtre complète de réponses sous la latence cible."""
+        if latency > self.latency_target:
+            self._successes = 0
+            return
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self._successes = 0
+            self.limit += 1
+            self._wake()
+
+    def record_rate_limit(self):
+        """Diminution multiplicative ; une rafale de 429 simultanés ne divise la limite qu'une fois."""
+        self.rate_limited += 1
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        previous = self.limit
+        self.limit = max(self.minimum, self.limit // 2)
+        logger.warning(f"🚦 Rate limit LLM : concurrence {previous} → {self.limit}")
+
+    def _wake(self):
+        # Réveille les lots en attente sans bloquer l'appelant
+        async def _notify():
+            async with self._cond:
+                self._cond.notify_all()
+        try:
+            asyncio.get_running_loop().create_task(_notify())
+        except RuntimeError:
+            pass
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "rate_limited": self.rate_limited}
+
+
+# Instance globale (le quota Gemini est partagé par toutes les recherches du processus)
+_judge_concurrency: Optional[AIMDConcurrency] = None
+
+
+def get_judge_concurrency() -> AIMDConcurrency:
+    """Contrôleur de concurrence des appels du Judge."""
+    global _judge_concurrency
+    if _judge_concurrency is None:
+        _judge_concurrency = AIMDConcurrency(
+            initial=settings.judge_concurrency_initial,
+            minimum=settings.judge_concurrency_min,
+            maximum=settings.judge_concurrency_max,
+            latency_target=settings.judge_latency_target,
+        )
+    return _judge_concurrency
@@ -74,6 +74,8 @@ class ContactsManager:
                 }
                 
                 await db.contacts.insert_one(new_contact)
+                from core.dashboard_stats import dashboard_stats
+                await dashboard_stats.contact_inserted(user_id)
                 logger.info(f"💾 Nouveau contact MongoDB enregistré: {company_name} ({category})")
                 return True
                 
@@ -17,13 +17,15 @@ Design families:
 
 ATS text order: Name → Email → Phone → Address → Summary →
 Experience → Projects → Education → Skills → Languages → Certifications
+
+Toute modification du rendu doit incrémenter GENERATOR_VERSIONS["pdf"] (core/artifact_cache.py).
 """
 import io, re
 from typing import Dict, Any, List
 
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.colors import HexColor, black, white
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from reportlab.lib.units import inch
 from reportlab.platypus import (
@@ -31,6 +33,8 @@ from reportlab.platypus import (
     HRFlowable, KeepTogether, Table, TableStyle
 )
 
+from core.cv_theme_registry import ThemeRegistry, base_normal_style
+
 # ─────────────────────────────────────────────────────────────────────────────
 # LANGUAGE DETECTION
 # ─────────────────────────────────────────────────────────────────────────────
@@ -270,7 +274,7 @@ def _styles(t: dict) -> dict:
     fb  = t["font_body"]
     fbd = t["font_bold"]
     fn  = t["font_name"]
-    N   = getSampleStyleSheet()["Normal"]
+    N   = base_normal_style()
     txt = HexColor(t["body_text"])
     sec = HexColor(t["section_color"])
     met = HexColor(t["meta_color"])
@@ -334,6 +338,20 @@ def _styles(t: dict) -> dict:
     }
 
 
+def _build_theme_bundle(theme_id: str, t: dict) -> dict:
+    """Styles + couleurs de décoration d'un thème (construits une fois, voir theme_registry)."""
+    return {
+        "styles":    _styles(t),
+        "accent":    HexColor(t["accent"]),
+        "body_bg":   HexColor(t["body_bg"]),
+        "tint":      HexColor(t["header_tint"]),
+        "left_bar":  HexColor(t["left_bar"]) if t["left_bar"] else None,
+    }
+
+
+theme_registry = ThemeRegistry(THEMES, _build_theme_bundle)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # MAIN GENERATOR
 # ─────────────────────────────────────────────────────────────────────────────
@@ -350,7 +368,8 @@ def generate_ats_cv_pdf(cv_data: Dict[str, Any], theme_id: str = "midnight") ->
     Family C: same light tinted rectangle + thin bottom accent line
     """
     t      = THEMES.get(theme_id, THEMES["midnight"])
-    S      = _styles(t)
+    bundle = theme_registry.get(theme_id)
+    S      = bundle["styles"]
     lang   = _detect_lang(cv_data)
     lbl    = SECTION_LABELS[lang]
     family = t["family"]
@@ -365,10 +384,10 @@ def generate_ats_cv_pdf(cv_data: Dict[str, Any], theme_id: str = "midnight") ->
     MAR_B  = 0.55 * inch
     BAR_W  = 5           # left bar width for family B (points)
 
-    acc_c      = HexColor(t["accent"])
-    body_bg_c  = HexColor(t["body_bg"])
-    tint_c     = HexColor(t["header_tint"])
-    bar_c      = HexColor(t["left_bar"]) if t["left_bar"] else None
+    acc_c      = bundle["accent"]
+    body_bg_c  = bundle["body_bg"]
+    tint_c     = bundle["tint"]
+    bar_c      = bundle["left_bar"]
 
     # Estimated header height = name(32) + title(17) + contacts(13 * up to 5) + spacers
     HEADER_H = 1.55 * inch    # visual header block height (used for tint rect only)
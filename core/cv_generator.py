@@ -124,6 +124,7 @@ def _add_bullet(doc: Document, text: str):
     return para
 
 
+# Toute modification du rendu doit incrémenter GENERATOR_VERSIONS["docx"] (core/artifact_cache.py)
 def generate_cv_docx(cv_data: Dict[str, Any]) -> bytes:
     """
     Génère un fichier DOCX ATS-optimisé à partir des données structurées du CV.
@@ -8,7 +8,7 @@ from typing import Dict, Any, List
 
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.colors import HexColor, white, black, Color
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.platypus import (
     BaseDocTemplate, PageTemplate, Frame, Paragraph, Spacer,
@@ -16,6 +16,8 @@ from reportlab.platypus import (
 )
 from reportlab.lib import colors as rl_colors
 
+from core.cv_theme_registry import ThemeRegistry, base_normal_style
+
 # ─────────────────────────────────────────────────────────────────────────────
 # THÈMES
 # ─────────────────────────────────────────────────────────────────────────────
@@ -204,7 +206,7 @@ def _inject_invisible_ats_layer(canvas, doc, cv_data: Dict[str, Any]):
 # STYLES TYPOGRAPHIQUES (varient selon le thème pour un rendu unique)
 # ─────────────────────────────────────────────────────────────────────────────
 def _get_styles(c, theme_dict=None):
-    base = getSampleStyleSheet()
+    base = {"Normal": base_normal_style()}
     LEAD = 1.3
     t = theme_dict or {}
     sb_name_font = t.get("name_font_size", 22)
@@ -873,15 +875,27 @@ def _render_compact_tight(cv_data, doc, story, styles, c):
     _build_main_full(cv_data, story, M, c)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# REGISTRE DES THÈMES (couleurs + styles construits une fois par processus)
+# ─────────────────────────────────────────────────────────────────────────────
+def _build_theme_bundle(theme_id: str, theme: dict) -> dict:
+    c = _get_colors(theme_id)
+    c["HR_THICKNESS"] = theme.get("hr_thickness", 1)
+    return {"colors": c, "styles": _get_styles(c, theme)}
+
+
+theme_registry = ThemeRegistry(THEMES, _build_theme_bundle)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # DISPATCHER PRINCIPAL
 # ─────────────────────────────────────────────────────────────────────────────
 def generate_cv_pdf(cv_data: Dict[str, Any], theme_id: str = "midnight") -> bytes:
     buffer = io.BytesIO()
     theme  = THEMES.get(theme_id, THEMES["midnight"])
-    c      = _get_colors(theme_id)
-    c["HR_THICKNESS"] = theme.get("hr_thickness", 1)
-    styles = _get_styles(c, theme)
+    bundle = theme_registry.get(theme_id)
+    c      = bundle["colors"]
+    styles = bundle["styles"]
 
     doc   = BaseDocTemplate(buffer, pagesize=LETTER)
     story: List = []
@@ -0,0 +1,67 @@
+"""
+Registre des thèmes CV : styles ReportLab (ParagraphStyle, HexColor) construits une seule fois par thème
+et par processus, puis réutilisés à chaque rendu.
+
+Les bundles sont figés (MappingProxyType) : un rendu ne peut pas remplacer un style partagé ;
+pour une variante locale, dériver un nouveau ParagraphStyle(parent=...) comme le font déjà les générateurs.
+"""
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
+
+from reportlab.lib.styles import getSampleStyleSheet
+
+_base_normal = None
+
+
+def base_normal_style():
+    """Style "Normal" de la feuille d'exemple ReportLab (getSampleStyleSheet reconstruit tout à chaque appel)."""
+    global _base_normal
+    if _base_normal is None:
+        _base_normal = getSampleStyleSheet()["Normal"]
+    return _base_normal
+
+
+def freeze(value: Any) -> Any:
+    """Dictionnaires (imbriqués) en lecture seule."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    return value
+
+
+class ThemeRegistry:
+    """Bundles de styles par thème, construits à la première demande (ou par warm())."""
+
+    def __init__(self, themes: Dict[str, dict], builder: Callable[[str, dict], dict], default: str = "midnight"):
+        self.themes = themes
+        self.builder = builder
+        self.default = default
+        self._bundles: Dict[str, Mapping] = {}
+        self._lock = threading.Lock()
+
+    def get(self, theme_id: Optional[str]) -> Mapping:
+        theme_id = theme_id if theme_id in self.themes else self.default
+        bundle = self._bundles.get(theme_id)
+        if bundle is None:
+            with self._lock:
+                bundle = self._bundles.get(theme_id)
+                if bundle is None:
+                    bundle = freeze(self.builder(theme_id, self.themes[theme_id]))
+                    self._bundles[theme_id] = bundle
+        return bundle
+
+    def warm(self, theme_ids: Optional[Iterable[str]] = None):
+        for theme_id in theme_ids or self.themes:
+            self.get(theme_id)
+
+    def clear(self):
+        with self._lock:
+            self._bundles.clear()
+
+
+def warm_theme_registries():
+    """Précharge les dix thèmes des deux générateurs (démarrage des processus de rendu)."""
+    from core.cv_ats_generator import theme_registry as ats_registry
+    from core.cv_pdf_generator import theme_registry as pdf_registry
+    ats_registry.warm()
+    pdf_registry.warm()
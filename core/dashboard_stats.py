@@ -0,0 +1,221 @@
+"""
+Statistiques du Dashboard pré-agrégées (collection MongoDB "user_stats").
+
+- un document par utilisateur (_id = user_id) : candidatures, envoyées, entretiens, contacts, histogramme mensuel
+- un document global (_id = "__global__") : totaux admin (candidatures, utilisateurs, tiers) + contacts système
+- mis à jour par $inc à chaque écriture CRM / contact / inscription / changement de tier
+- un réconciliateur en tâche de fond recalcule périodiquement les documents (les plus anciens d'abord)
+  pour corriger toute dérive (écriture directe en base, crash entre deux opérations, migration)
+
+Lecture du Dashboard : un seul find sur _id (index natif), quel que soit le nombre de candidatures.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from config.settings import settings
+from core.database import get_db
+
+GLOBAL_ID = "__global__"
+SYSTEM_USER = "system_user"
+
+
+def _month_key(created_at: Any) -> Optional[str]:
+    if isinstance(created_at, datetime):
+        return created_at.strftime("%Y-%m")
+    if isinstance(created_at, str) and len(created_at) >= 7:
+        return created_at[:7]
+    return None
+
+
+def _application_delta(app: Dict[str, Any], sign: int) -> Dict[str, int]:
+    """Compteurs touchés par une candidature (sign = +1 à l'insertion, -1 à la suppression)."""
+    status = app.get("status")
+    delta = {"applications": sign}
+    if status != "TO_APPLY":
+        delta["applied"] = sign
+    if status == "INTERVIEW":
+        delta["interviews"] = sign
+    month = _month_key(app.get("created_at"))
+    if month:
+        delta[f"monthly.{month}"] = sign
+    return delta
+
+
+def _status_delta(old_status: Optional[str], new_status: Optional[str]) -> Dict[str, int]:
+    delta: Dict[str, int] = {}
+    was_applied, is_applied = old_status != "TO_APPLY", new_status != "TO_APPLY"
+    if was_applied != is_applied:
+        delta["applied"] = 1 if is_applied else -1
+    was_interview, is_interview = old_status == "INTERVIEW", new_status == "INTERVIEW"
+    if was_interview != is_interview:
+        delta["interviews"] = 1 if is_interview else -1
+    return delta
+
+
+class DashboardStatsStore:
+    """Incréments tolérants aux pannes : une erreur ici ne fait jamais échouer l'écriture métier."""
+
+    def __init__(self):
+        self._reconciler: Optional[asyncio.Task] = None
+        self.reconciled = 0
+
+    @property
+    def collection(self):
+        return get_db().user_stats
+
+    async def _inc(self, doc_id: str, delta: Dict[str, int]):
+        if not delta:
+            return
+        try:
+            result = await self.collection.update_one(
+                {"_id": doc_id},
+                {"$inc": delta, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True,
+            )
+            if result.upserted_id is not None:
+                # Document absent (compte antérieur aux stats matérialisées) : l'incrément seul serait faux
+                if doc_id == GLOBAL_ID:
+                    await self.reconcile_global()
+                else:
+                    await self.reconcile_user(doc_id)
+        except Exception as e:
+            logger.debug(f"Stats Dashboard ({doc_id}) non mises à jour: {e}")
+
+    # --- Hooks d'écriture ---
+
+    async def application_inserted(self, app: Dict[str, Any]):
+        await self._inc(app["user_id"], _application_delta(app, 1))
+        await self._inc(GLOBAL_ID, {"applications": 1})
+
+    async def application_deleted(self, app: Optional[Dict[str, Any]]):
+        if not app:
+            return
+        await self._inc(app["user_id"], _application_delta(app, -1))
+        await self._inc(GLOBAL_ID, {"applications": -1})
+
+    async def status_changed(self, user_id: str, old_status: Optional[str], new_status: Optional[str]):
+        await self._inc(user_id, _status_delta(old_status, new_status))
+
+    async def contact_inserted(self, user_id: str):
+        if user_id == SYSTEM_USER:
+            await self._inc(GLOBAL_ID, {"system_contacts": 1})
+        else:
+            await self._inc(user_id, {"contacts": 1})
+
+    async def user_created(self, tier: str = "FREE"):
+        await self._inc(GLOBAL_ID, {"users": 1, f"tiers.{(tier or 'FREE').upper()}": 1})
+
+    async def tier_changed(self, old_tier: Optional[str], new_tier: Optional[str]):
+        old_tier, new_tier = (old_tier or "FREE").upper(), (new_tier or "FREE").upper()
+        if old_tier != new_tier:
+            await self._inc(GLOBAL_ID, {f"tiers.{old_tier}": -1, f"tiers.{new_tier}": 1})
+
+    # --- Lecture ---
+
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Document de l'utilisateur + contacts système (un seul aller-retour)."""
+        docs = await self.collection.find({"_id": {"$in": [user_id, GLOBAL_ID]}}).to_list(length=2)
+        by_id = {d["_id"]: d for d in docs}
+        user_doc = by_id.get(user_id)
+        global_doc = by_id.get(GLOBAL_ID)
+        if user_doc is None:
+            # Premier affichage (compte antérieur aux stats matérialisées) : calcul complet une seule fois
+            user_doc = await self.reconcile_user(user_id)
+        if global_doc is None:
+            global_doc = await self.reconcile_global()
+        return {
+            "applied": max(0, user_doc.get("applied", 0)),
+            "interviews": max(0, user_doc.get("interviews", 0)),
+            "applications": max(0, user_doc.get("applications", 0)),
+            "network": max(0, user_doc.get("contacts", 0)) + max(0, global_doc.get("system_contacts", 0)),
+            "monthly": {k: v for k, v in (user_doc.get("monthly") or {}).items() if v > 0},
+        }
+
+    async def get_global_stats(self) -> Dict[str, Any]:
+        doc = await self.collection.find_one({"_id": GLOBAL_ID})
+        if doc is None:
+            doc = await self.reconcile_global()
+        return doc
+
+    # --- Réconciliation ---
+
+    async def reconcile_user(self, user_id: str) -> Dict[str, Any]:
+        """Recalcule le document d'un utilisateur depuis les collections sources."""
+        db = get_db()
+        counts = {"applications": 0, "applied": 0, "interviews": 0}
+        monthly: Dict[str, int] = {}
+        async for app in db.applications.find({"user_id": user_id}, {"status": 1, "created_at": 1}):
+            for field, value in _application_delta(app, 1).items():
+                if field.startswith("monthly."):
+                    month = field.split(".", 1)[1]
+                    monthly[month] = monthly.get(month, 0) + value
+                else:
+                    counts[field] += value
+        doc = {
+            **counts,
+            "contacts": await db.contacts.count_documents({"user_id": user_id}),
+            "monthly": monthly,
+            "updated_at": datetime.utcnow(),
+            "reconciled_at": datetime.utcnow(),
+        }
+        await self.collection.replace_one({"_id": user_id}, doc, upsert=True)
+        return {"_id": user_id, **doc}
+
+    async def reconcile_global(self) -> Dict[str, Any]:
+        db = get_db()
+        tiers: Dict[str, int] = {}
+        async for row in db.users.aggregate([{"$group": {"_id": "$subscription_tier", "count": {"$sum": 1}}}]):
+            tier = (row["_id"] or "FREE").upper()
+            tiers[tier] = tiers.get(tier, 0) + row["count"]
+        doc = {
+            "applications": await db.applications.estimated_document_count(),
+            "users": sum(tiers.values()),
+            "tiers": tiers,
+            "system_contacts": await db.contacts.count_documents({"user_id": SYSTEM_USER}),
+            "updated_at": datetime.utcnow(),
+            "reconciled_at": datetime.utcnow(),
+        }
+        await self.collection.replace_one({"_id": GLOBAL_ID}, doc, upsert=True)
+        return {"_id": GLOBAL_ID, **doc}
+
+    async def reconcile_batch(self, batch_size: int) -> int:
+        """Recalcule le global + les `batch_size` documents utilisateur les moins récemment vérifiés."""
+        await self.reconcile_global()
+        cursor = self.collection.find(
+            {"_id": {"$ne": GLOBAL_ID}}, {"_id": 1}
+        ).sort("reconciled_at", 1).limit(batch_size)
+        count = 0
+        async for doc in cursor:
+            await self.reconcile_user(doc["_id"])
+            count += 1
+        self.reconciled += count
+        return count
+
+    async def _reconcile_loop(self):
+        interval = settings.dashboard_stats_reconcile_interval
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                count = await self.reconcile_batch(settings.dashboard_stats_reconcile_batch)
+                logger.debug(f"📊 Stats Dashboard réconciliées ({count} utilisateur(s))")
+            except Exception as e:
+                logger.warning(f"⚠️ Réconciliation des stats Dashboard échouée: {e}")
+
+    def start_reconciler(self):
+        if settings.dashboard_stats_reconcile_interval <= 0:
+            return
+        if self._reconciler is None or self._reconciler.done():
+            self._reconciler = asyncio.create_task(self._reconcile_loop())
+            logger.info("📊 Réconciliateur des stats Dashboard démarré")
+
+    def stop_reconciler(self):
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+            self._reconciler = None
+
+
+# Instance globale
+dashboard_stats = DashboardStatsStore()
@@ -53,10 +53,22 @@ async def init_db():
         await db.usage_logs.create_index("user_id")
         await db.usage_logs.create_index([("user_id", 1), ("feature", 1), ("used_at", 1)])
         
+        # Index Collection Usage Counters (quotas atomiques, purge des périodes échues via index TTL)
+        await db.usage_counters.create_index("expires_at", expireAfterSeconds=0)
+        await db.usage_counters.create_index("user_id")
+        
         # Index Collections Interview Sessions (History + Free Tier Gating)
         await db.interview_sessions.create_index("user_id")
         await db.interview_sessions.create_index([("user_id", 1), ("created_at", -1)])
         
+        # Index Collection Job Offer Cache (purge automatique via index TTL)
+        await db.job_offer_cache.create_index("key", unique=True)
+        await db.job_offer_cache.create_index("expires_at", expireAfterSeconds=0)
+        
+        # Index Collection Source Health (compteurs journaliers par source, purge automatique)
+        await db.source_health.create_index([("source", 1), ("day", -1)])
+        await db.source_health.create_index("expires_at", expireAfterSeconds=0)
+        
         logger.info("✅ Index MongoDB vérifiés et créés avec succès.")
     except Exception as e:
         logger.error(f"❌ Erreur lors de la création des index MongoDB: {e}")
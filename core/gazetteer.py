@@ -0,0 +1,277 @@
+"""
+Gazetteer des localisations : villes, régions, pays et zones, avec alias et fautes courantes ("califormie").
+
+Une chaîne de localisation est résolue une fois en lieu structuré (Place) par un trie de mots
+(plus longue correspondance, en un seul passage) au lieu de dizaines de `any(w in loc for w in [...])`.
+Mêmes données pour tout le pipeline :
+
+- JobSearchAgent : normalisation de la localisation demandée ("montreal" -> "Montreal, QC, Canada")
+- HunterAgent : choix des sources selon la zone (Europe, Amériques, Cameroun) et filtre des villes hors cible
+- GovSearcher / IndeedMultiSearcher : pays cible (portails, domaine Indeed)
+
+Résolution : le qualificatif le plus à droite fixe le pays ("Paris, TX" -> Texas, USA ; "Montréal, Québec" -> Montréal),
+puis le lieu le plus précis de ce pays est retenu.
+"""
+import functools
+import re
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+_COMBINING_RE = re.compile("[\u0300-\u036f]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+_KIND_RANK = {"city": 0, "region": 1, "country": 2, "zone": 3}
+
+
+def strip_accents(text: str) -> str:
+    """Minuscules sans accents."""
+    text = (text or "").lower()
+    if text.isascii():
+        return text
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text))
+
+
+def words(text: str) -> List[str]:
+    """Mots d'une localisation ("New-York" et "new york" donnent les mêmes mots)."""
+    return _WORD_RE.findall(strip_accents(text))
+
+
+class Place(NamedTuple):
+    key: str
+    name: str            # forme envoyée aux APIs ("Montreal, QC, Canada")
+    kind: str            # city, region, country ou zone
+    country: str         # code pays utilisé par les sources (france, usa, canada, belgique...)
+    zone: str            # europe, americas, cameroon ou other (routage des sources)
+    region: str = ""     # région d'une ville, si connue
+    metro: str = ""      # agglomération d'une ville (Laval -> montreal)
+
+    def covers(self, city: "Place") -> bool:
+        """La ville `city` est-elle dans la zone ciblée par ce lieu ?"""
+        if self.kind == "city":
+            return (city.metro or city.key) == (self.metro or self.key)
+        if self.kind == "region":
+            # Région inconnue de la ville : hors cible (Vancouver n'est pas au Québec)
+            return city.country == self.country and city.region == self.key
+        if self.kind == "country":
+            return city.country == self.country
+        return city.zone == self.zone
+
+
+# (code, nom, zone, alias)
+COUNTRIES: List[Tuple[str, str, str, List[str]]] = [
+    ("france", "France", "europe", ["france"]),
+    ("usa", "United States", "americas", ["usa", "us", "united states", "united-states", "america", "etats-unis", "etats unis"]),
+    ("canada", "Canada", "americas", ["canada"]),
+    ("belgique", "Belgique", "europe", ["belgique", "belgium"]),
+    ("suisse", "Suisse", "europe", ["suisse", "switzerland"]),
+    ("uk", "United Kingdom", "europe", ["uk", "united kingdom", "royaume-uni", "england", "angleterre", "scotland", "wales"]),
+    ("allemagne", "Germany", "europe", ["allemagne", "germany", "deutschland"]),
+    ("espagne", "Spain", "europe", ["espagne", "spain"]),
+    ("italie", "Italie", "europe", ["italie", "italy"]),
+    ("portugal", "Portugal", "europe", ["portugal"]),
+    ("pays-bas", "Pays-Bas", "europe", ["pays-bas", "netherlands", "hollande", "nederland"]),
+    ("luxembourg", "Luxembourg", "europe", ["luxembourg"]),
+    ("maroc", "Maroc", "other", ["maroc", "morocco"]),
+    ("cameroun", "Cameroun", "cameroon", ["cameroun", "cameroon"]),
+]
+
+# (clé, nom, pays, alias)
+REGIONS: List[Tuple[str, str, str, List[str]]] = [
+    ("quebec", "Quebec, QC, Canada", "canada", ["quebec", "qc"]),
+    ("ontario", "Ontario, Canada", "canada", ["ontario"]),
+    ("british-columbia", "British Columbia, Canada", "canada", ["british columbia", "colombie-britannique", "bc"]),
+    ("alberta", "Alberta, Canada", "canada", ["alberta", "ab"]),
+    ("california", "California, USA", "usa", ["california", "californie", "califormie", "califormia"]),
+    ("texas", "Texas, USA", "usa", ["texas", "tx"]),
+    ("florida", "Florida, USA", "usa", ["florida", "floride", "fl"]),
+    ("washington", "Washington, USA", "usa", ["washington"]),
+    ("silicon-valley", "Silicon Valley, CA, USA", "usa", ["silicon valley"]),
+    ("ile-de-france", "Île-de-France, France", "france", ["ile-de-france", "idf"]),
+    ("auvergne-rhone-alpes", "Auvergne-Rhône-Alpes, France", "france", ["auvergne-rhone-alpes", "aura", "rhone-alpes"]),
+    ("paca", "Provence-Alpes-Côte d'Azur, France", "france", ["provence-alpes-cote d'azur", "paca", "cote d'azur"]),
+    ("occitanie", "Occitanie, France", "france", ["occitanie"]),
+    ("nouvelle-aquitaine", "Nouvelle-Aquitaine, France", "france", ["nouvelle-aquitaine"]),
+    ("pays-de-la-loire", "Pays de la Loire, France", "france", ["pays de la loire"]),
+    ("hauts-de-france", "Hauts-de-France, France", "france", ["hauts-de-france"]),
+    ("bretagne", "Bretagne, France", "france", ["bretagne", "brittany"]),
+    ("grand-est", "Grand Est, France", "france", ["grand est", "alsace"]),
+    ("wallonie", "Wallonie, Belgique", "belgique", ["wallonie", "wallonia"]),
+]
+
+# (clé, nom, pays, région, alias[, agglomération])
+CITIES: List[tuple] = [
+    # Canada
+    ("montreal", "Montreal, QC, Canada", "canada", "quebec", ["montreal", "mtl"]),
+    ("laval", "Laval, QC, Canada", "canada", "quebec", ["laval"], "montreal"),
+    ("longueuil", "Longueuil, QC, Canada", "canada", "quebec", ["longueuil"], "montreal"),
+    ("quebec-city", "Quebec City, QC, Canada", "canada", "quebec", ["quebec city", "ville de quebec"]),
+    ("gatineau", "Gatineau, QC, Canada", "canada", "quebec", ["gatineau"]),
+    ("sherbrooke", "Sherbrooke, QC, Canada", "canada", "quebec", ["sherbrooke"]),
+    ("saguenay", "Saguenay, QC, Canada", "canada", "quebec", ["saguenay"]),
+    ("toronto", "Toronto, ON, Canada", "canada", "ontario", ["toronto"]),
+    ("ottawa", "Ottawa, ON, Canada", "canada", "ontario", ["ottawa"]),
+    ("vancouver", "Vancouver, BC, Canada", "canada", "british-columbia", ["vancouver"]),
+    ("calgary", "Calgary, AB, Canada", "canada", "alberta", ["calgary"]),
+    ("edmonton", "Edmonton, AB, Canada", "canada", "alberta", ["edmonton"]),
+    # France
+    ("paris", "Paris, France", "france", "ile-de-france", ["paris"]),
+    ("lyon", "Lyon, France", "france", "auvergne-rhone-alpes", ["lyon"]),
+    ("marseille", "Marseille, France", "france", "paca", ["marseille"]),
+    ("toulouse", "Toulouse, France", "france", "occitanie", ["toulouse"]),
+    ("bordeaux", "Bordeaux, France", "france", "nouvelle-aquitaine", ["bordeaux"]),
+    ("nantes", "Nantes, France", "france", "pays-de-la-loire", ["nantes"]),
+    ("lille", "Lille, France", "france", "hauts-de-france", ["lille"]),
+    ("nice", "Nice, France", "france", "paca", ["nice"]),
+    ("rennes", "Rennes, France", "france", "bretagne", ["rennes"]),
+    ("strasbourg", "Strasbourg, France", "france", "grand-est", ["strasbourg"]),
+    ("grenoble", "Grenoble, France", "france", "auvergne-rhone-alpes", ["grenoble"]),
+    ("montpellier", "Montpellier, France", "france", "occitanie", ["montpellier"]),
+    # USA
+    ("new-york", "New York, USA", "usa", "", ["new york", "nyc"]),
+    ("washington-dc", "Washington, DC, USA", "usa", "", ["washington dc", "washington d c", "district of columbia"]),
+    ("seattle", "Seattle, WA, USA", "usa", "washington", ["seattle"]),
+    ("boston", "Boston, MA, USA", "usa", "", ["boston"]),
+    ("chicago", "Chicago, IL, USA", "usa", "", ["chicago"]),
+    ("los-angeles", "Los Angeles, CA, USA", "usa", "california", ["los angeles"]),
+    ("san-francisco", "San Francisco, CA, USA", "usa", "california", ["san francisco"]),
+    # Europe
+    ("bruxelles", "Bruxelles, Belgique", "belgique", "", ["bruxelles", "brussels"]),
+    ("liege", "Liège, Belgique", "belgique", "wallonie", ["liege"]),
+    ("namur", "Namur, Belgique", "belgique", "wallonie", ["namur"]),
+    ("gand", "Gand, Belgique", "belgique", "", ["gand", "ghent"]),
+    ("anvers", "Anvers, Belgique", "belgique", "", ["anvers", "antwerp"]),
+    ("zurich", "Zurich, Suisse", "suisse", "", ["zurich"]),
+    ("geneve", "Genève, Suisse", "suisse", "", ["geneve", "geneva"]),
+    ("berne", "Berne, Suisse", "suisse", "", ["berne", "bern"]),
+    ("lausanne", "Lausanne, Suisse", "suisse", "", ["lausanne"]),
+    ("bale", "Bâle, Suisse", "suisse", "", ["bale", "basel"]),
+    ("london", "London, UK", "uk", "", ["london", "londres"]),
+    ("manchester", "Manchester, UK", "uk", "", ["manchester"]),
+    ("birmingham", "Birmingham, UK", "uk", "", ["birmingham"]),
+    ("berlin", "Berlin, Germany", "allemagne", "", ["berlin"]),
+    ("munich", "Munich, Germany", "allemagne", "", ["munich", "munchen"]),
+    ("hamburg", "Hamburg, Germany", "allemagne", "", ["hamburg", "hambourg"]),
+    ("frankfurt", "Frankfurt, Germany", "allemagne", "", ["frankfurt", "francfort"]),
+    ("cologne", "Cologne, Germany", "allemagne", "", ["cologne", "koln"]),
+    ("madrid", "Madrid, Spain", "espagne", "", ["madrid"]),
+    ("barcelona", "Barcelona, Spain", "espagne", "", ["barcelona", "barcelone"]),
+    ("valencia", "Valencia, Spain", "espagne", "", ["valencia"]),
+    ("seville", "Séville, Spain", "espagne", "", ["seville", "sevilla"]),
+    ("rome", "Rome, Italie", "italie", "", ["rome", "roma"]),
+    ("milan", "Milan, Italie", "italie", "", ["milan", "milano"]),
+    ("naples", "Naples, Italie", "italie", "", ["naples", "napoli"]),
+    ("turin", "Turin, Italie", "italie", "", ["turin", "torino"]),
+    ("lisbonne", "Lisbonne, Portugal", "portugal", "", ["lisbonne", "lisbon", "lisboa"]),
+    ("porto", "Porto, Portugal", "portugal", "", ["porto"]),
+    ("amsterdam", "Amsterdam, Pays-Bas", "pays-bas", "", ["amsterdam"]),
+    ("rotterdam", "Rotterdam, Pays-Bas", "pays-bas", "", ["rotterdam"]),
+    # Maroc
+    ("casablanca", "Casablanca, Maroc", "maroc", "", ["casablanca"]),
+    ("rabat", "Rabat, Maroc", "maroc", "", ["rabat"]),
+    ("marrakech", "Marrakech, Maroc", "maroc", "", ["marrakech"]),
+    ("fes", "Fès, Maroc", "maroc", "", ["fes"]),
+    # Cameroun
+    ("yaounde", "Yaoundé, Cameroun", "cameroun", "", ["yaounde"]),
+    ("douala", "Douala, Cameroun", "cameroun", "", ["douala"]),
+    ("garoua", "Garoua, Cameroun", "cameroun", "", ["garoua"]),
+    ("bafoussam", "Bafoussam, Cameroun", "cameroun", "", ["bafoussam"]),
+]
+
+# Zones multi-pays (portail EURES)
+ZONES: List[Tuple[str, str, str, List[str]]] = [
+    ("europe", "Europe", "europe", ["europe", "eu", "union europeenne", "european union", "schengen"]),
+]
+
+_END = ""
+
+
+class Gazetteer:
+    """Trie de mots alias -> Place, compilé une fois."""
+
+    def __init__(self):
+        self.places: Dict[str, Place] = {}
+        self._aliases: Dict[str, Place] = {}
+        self._trie: Dict[str, dict] = {}
+        zones = {code: zone for code, _, zone, _ in COUNTRIES}
+        for code, name, zone, aliases in COUNTRIES:
+            self._add(Place(code, name, "country", code, zone), aliases)
+        for key, name, country, aliases in REGIONS:
+            self._add(Place(key, name, "region", country, zones[country]), aliases)
+        for key, name, country, region, aliases, *metro in CITIES:
+            self._add(Place(key, name, "city", country, zones[country], region, metro[0] if metro else ""), aliases)
+        for key, name, zone, aliases in ZONES:
+            self._add(Place(key, name, "zone", key, zone), aliases)
+
+    def _add(self, place: Place, aliases: Iterable[str]):
+        self.places[place.key] = place
+        for alias in aliases:
+            tokens = words(alias)
+            self._aliases[" ".join(tokens)] = place
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_END] = place
+
+    def scan(self, text: str) -> List[Place]:
+        """Lieux cités dans `text`, dans l'ordre (plus longue correspondance à chaque position)."""
+        tokens = words(text)
+        found: List[Place] = []
+        i, n = 0, len(tokens)
+        while i < n:
+            node, j, match, end = self._trie, i, None, i
+            while j < n and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if _END in node:
+                    match, end = node[_END], j
+            if match is not None:
+                found.append(match)
+                i = end
+            else:
+                i += 1
+        return found
+
+    def lookup(self, text: str) -> Optional[Place]:
+        """Lieu dont un alias correspond exactement à toute la chaîne."""
+        return self._aliases.get(" ".join(words(text)))
+
+    def resolve(self, text: str) -> Optional[Place]:
+        """Lieu le plus précis, dans le pays du qualificatif le plus à droite."""
+        found = self.scan(text)
+        if not found:
+            return None
+        anchored = [p for p in found if p.kind != "zone"] or found
+        country = anchored[-1].country
+        return min((p for p in anchored if p.country == country), key=lambda p: _KIND_RANK[p.kind])
+
+    def cities(self, text: str) -> List[Place]:
+        return [p for p in self.scan(text) if p.kind == "city"]
+
+
+# Instance globale
+_gazetteer: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Gazetteer:
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+@functools.lru_cache(maxsize=4096)
+def resolve_location(location: str) -> Optional[Place]:
+    """Résolution mémoïsée (les mêmes chaînes de localisation reviennent d'une offre à l'autre)."""
+    return get_gazetteer().resolve(location)
+
+
+@functools.lru_cache(maxsize=4096)
+def cities_in(location: str) -> Tuple[Place, ...]:
+    """Villes citées dans une localisation d'offre (mémoïsé)."""
+    return tuple(get_gazetteer().cities(location))
+
+
+def country_of(location: str, default: str = "france") -> str:
+    """Code pays d'une localisation (sources gouvernementales, domaine Indeed)."""
+    place = resolve_location(location or "")
+    return place.country if place else default
@@ -0,0 +1,120 @@
+"""
+Contexte borné d'un entretien simulé.
+
+Le prompt envoyé à chaque tour ne grossit plus avec la durée de l'entretien :
+- prompt système (rôle, CV, offre) : statique ; mis en cache côté Gemini (cachedContents) s'il est assez long
+- derniers échanges : verbatim, dans la limite de settings.interview_context_tokens
+- échanges plus anciens : condensés dans un résumé glissant, mis à jour en tâche de fond entre deux tours
+  (tant que le résumé n'est pas prêt, les échanges concernés restent envoyés verbatim : aucune perte)
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from config.settings import settings
+from llm.rate_limiter import estimate_tokens
+
+SUMMARY_PROMPT = """Tu tiens les notes d'un entretien d'embauche en cours. Mets à jour le résumé ci-dessous avec les nouveaux échanges.
+Garde : questions déjà posées, réponses clés du candidat (faits, chiffres, technologies, exemples), points forts/faibles relevés, ton de l'échange.
+Style télégraphique, 150 mots maximum, pas de Markdown.
+
+Résumé actuel :
+{summary}
+
+Nouveaux échanges :
+{turns}
+
+Résumé mis à jour :"""
+
+
+def _tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages)
+
+
+class InterviewContext:
+    """Historique d'un entretien : `turns` garde tout (transcription), `messages()` ne renvoie que le contexte borné."""
+
+    def __init__(self, system_prompt: str, llm, model: str, budget_tokens: Optional[int] = None):
+        self.system_prompt = system_prompt
+        self.llm = llm
+        self.model = model
+        self.budget_tokens = budget_tokens or settings.interview_context_tokens
+        self.turns: List[Dict[str, str]] = []
+        self.summary = ""
+        self.summary_covers = 0  # nombre de tours (depuis le début) intégrés au résumé
+        self.cached_content: Optional[str] = None
+        self._summary_task: Optional[asyncio.Task] = None
+
+    def add(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content})
+
+    async def prepare(self):
+        """Met le prompt système en cache côté Gemini s'il dépasse le minimum du fournisseur."""
+        gemini = getattr(self.llm, "gemini_client", None)
+        if not settings.interview_context_cache or gemini is None:
+            return
+        if estimate_tokens(self.system_prompt) < settings.gemini_context_cache_min_tokens:
+            return
+        self.cached_content = await gemini.create_cached_content(
+            self.system_prompt, model=self.model, ttl_seconds=settings.gemini_context_cache_ttl
+        )
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Système (sauf s'il est en cache) + résumé + tours récents."""
+        messages = [] if self.cached_content else [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            messages.append({
+                "role": "user",
+                "content": f"[Notes de l'entretien jusqu'ici, pour ton contexte uniquement — ne pas y répondre]\n{self.summary}",
+            })
+        return messages + self.turns[self.summary_covers:]
+
+    def request_kwargs(self) -> Dict[str, Any]:
+        return {"cached_content": self.cached_content} if self.cached_content else {}
+
+    def maybe_compact(self):
+        """À appeler après chaque réponse : lance la mise à jour du résumé si les tours récents dépassent le budget."""
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+        recent = self.turns[self.summary_covers:]
+        if _tokens(recent) <= self.budget_tokens:
+            return
+        keep = max(settings.interview_recent_turns_min, 2)
+        cut = self.summary_covers
+        # Les tours partent par paires (recruteur, candidat) : le contexte récent commence toujours par le recruteur
+        while len(self.turns) - (cut + 2) >= keep and _tokens(self.turns[cut:]) > self.budget_tokens // 2:
+            cut += 2
+        if cut == self.summary_covers:
+            return
+        self._summary_task = asyncio.create_task(self._summarize(cut))
+
+    async def _summarize(self, cut: int):
+        chunk = self.turns[self.summary_covers:cut]
+        transcript = "\n".join(
+            f"{'Recruteur' if t['role'] == 'assistant' else 'Candidat'}: {t['content']}" for t in chunk
+        )
+        prompt = SUMMARY_PROMPT.format(summary=self.summary or "(vide)", turns=transcript)
+        try:
+            summary = await self.llm.chat(
+                [{"role": "user", "content": prompt}],
+                model=settings.interview_summary_model,
+                max_tokens=400,
+                temperature=0.2,
+                priority="batch",
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Résumé d'entretien non mis à jour: {e}")
+            return
+        if summary and summary.strip():
+            self.summary = summary.strip()
+            self.summary_covers = cut
+            logger.debug(f"🗜️ Entretien : {cut} tour(s) résumé(s), contexte ~{_tokens(self.messages())} tokens")
+
+    async def close(self):
+        if self._summary_task is not None and not self._summary_task.done():
+            self._summary_task.cancel()
+        gemini = getattr(self.llm, "gemini_client", None)
+        if self.cached_content and gemini is not None:
+            await gemini.delete_cached_content(self.cached_content)
+            self.cached_content = None
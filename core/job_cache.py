@@ -0,0 +1,217 @@
+"""
+Cache partagé des résultats de sources d'emploi (Jooble, JSearch, LinkedIn, Indeed...).
+Clé : (source, mot-clé normalisé, localisation normalisée, type de contrat).
+Stratégie stale-while-revalidate : une entrée périmée mais encore dans la fenêtre de
+tolérance est servie immédiatement pendant qu'un rafraîchissement part en arrière-plan.
+"""
+import asyncio
+import hashlib
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from config.settings import settings
+
+# Durée de fraîcheur par source (secondes) : les scrapers HTML bougent vite, les portails gouv. lentement
+SOURCE_TTLS = {
+    "jooble": 1800,
+    "jsearch": 3600,
+    "findwork": 3600,
+    "glassdoor": 3600,
+    "linkedin": 900,
+    "indeed": 900,
+    "indeed_fr": 900,
+    "google_jobs": 1800,
+    "gov": 7200,
+    "emploi_cm": 3600,
+}
+DEFAULT_TTL = 1800
+
+
+def _normalize(text: str) -> str:
+    """Minuscules, sans accents, espaces compactés."""
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.replace('"', " ").split())
+
+
+def _is_placeholder(job: Dict[str, Any]) -> bool:
+    """Vrai pour les liens de recherche de repli ('Voir toutes les offres sur ...')."""
+    job_id = str(job.get("id", ""))
+    return job_id.endswith("-link") or job_id.endswith("-search")
+
+
+class MemoryJobCacheBackend:
+    """Stockage local en RAM (LRU borné en nombre d'entrées)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: Dict[str, Any]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class MongoJobCacheBackend:
+    """Stockage MongoDB partagé entre workers (collection job_offer_cache, index TTL sur expires_at)."""
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        from core.database import get_db
+        return await get_db().job_offer_cache.find_one({"key": key}, {"_id": 0})
+
+    async def set(self, key: str, entry: Dict[str, Any]):
+        from core.database import get_db
+        await get_db().job_offer_cache.replace_one({"key": key}, {"key": key, **entry}, upsert=True)
+
+
+class JobOfferCache:
+    """Cache des résultats par source avec fenêtre de fraîcheur et stale-while-revalidate."""
+
+    def __init__(self, backend, stale_window: int, fresh_override: Optional[int] = None):
+        self.backend = backend
+        self.stale_window = stale_window
+        self.fresh_override = fresh_override
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: set = set()
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "errors": 0}
+
+    def ttl_for(self, source: str) -> int:
+        if self.fresh_override:
+            return self.fresh_override
+        return SOURCE_TTLS.get(source, DEFAULT_TTL)
+
+    @staticmethod
+    def make_key(source: str, keyword: str, location: str, job_type: str) -> str:
+        raw = "|".join([source, _normalize(keyword), _normalize(location), _normalize(job_type or "emploi")])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    async def get_or_fetch(
+        self,
+        source: str,
+        keyword: str,
+        location: str,
+        job_type: str,
+        fetch: Callable[[], Awaitable[List[Dict[str, Any]]]],
+    ) -> List[Dict[str, Any]]:
+        """Retourne les offres en cache si fraîches (ou périmées dans la fenêtre), sinon interroge la source."""
+        key = self.make_key(source, keyword, location, job_type)
+        entry = None
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.debug(f"Cache offres (lecture) indisponible: {e}")
+
+        if entry:
+            age = time.time() - entry.get("fetched_at", 0)
+            ttl = self.ttl_for(source)
+            if age < ttl:
+                self.stats["fresh_hits"] += 1
+                return self._copy(entry["jobs"])
+            if age < ttl + self.stale_window:
+                self.stats["stale_hits"] += 1
+                self._schedule_refresh(key, source, fetch)
+                return self._copy(entry["jobs"])
+
+        self.stats["misses"] += 1
+        return self._copy(await self._fetch_and_store(key, source, fetch))
+
+    async def _fetch_and_store(self, key: str, source: str, fetch) -> List[Dict[str, Any]]:
+        # Déduplication des requêtes identiques simultanées (même mot-clé lancé par deux utilisateurs)
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            # asyncio.wait n'annule pas le futur si cet appelant est annulé, et ne lève pas si le meneur l'est
+            await asyncio.wait({inflight})
+            if not inflight.cancelled():
+                return inflight.result()
+            # Meneur annulé (client SSE déconnecté) : la requête est relancée par cet appelant
+            inflight = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            jobs = await fetch()
+            jobs = jobs if isinstance(jobs, list) else []
+            if jobs and not all(_is_placeholder(j) for j in jobs):
+                await self._store(key, source, jobs)
+            future.set_result(jobs)
+            return jobs
+        except Exception as e:
+            future.set_exception(e)
+            # Évite l'avertissement "exception never retrieved" si personne n'attendait ce futur
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                # Meneur annulé : les appelants en attente sont réveillés au lieu d'attendre indéfiniment
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    async def _store(self, key: str, source: str, jobs: List[Dict[str, Any]]):
+        now = datetime.now(timezone.utc)
+        entry = {
+            "source": source,
+            "jobs": jobs,
+            "fetched_at": time.time(),
+            "expires_at": now + timedelta(seconds=self.ttl_for(source) + self.stale_window),
+        }
+        try:
+            await self.backend.set(key, entry)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.debug(f"Cache offres (écriture) indisponible: {e}")
+
+    def _schedule_refresh(self, key: str, source: str, fetch):
+        if key in self._refreshing or key in self._inflight:
+            return
+        self._refreshing.add(key)
+
+        async def _refresh():
+            try:
+                await self._fetch_and_store(key, source, fetch)
+                logger.debug(f"♻️ Cache offres rafraîchi en arrière-plan ({source})")
+            except Exception as e:
+                logger.debug(f"Rafraîchissement cache offres échoué ({source}): {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        asyncio.create_task(_refresh())
+
+    @staticmethod
+    def _copy(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Les agents en aval modifient les offres (score, description) : on ne partage jamais les dicts du cache
+        return [dict(j) for j in jobs]
+
+
+# Instance globale
+_job_offer_cache: Optional[JobOfferCache] = None
+
+
+def get_job_offer_cache() -> Optional[JobOfferCache]:
+    """Retourne le cache global des offres, ou None si désactivé (JOB_CACHE_BACKEND=none)."""
+    global _job_offer_cache
+    kind = settings.job_cache_backend.lower()
+    if kind == "none":
+        return None
+    if _job_offer_cache is None:
+        backend = MongoJobCacheBackend() if kind == "mongo" else MemoryJobCacheBackend(settings.job_cache_max_entries)
+        _job_offer_cache = JobOfferCache(
+            backend,
+            stale_window=settings.job_cache_stale_seconds,
+            fresh_override=settings.job_cache_fresh_seconds,
+        )
+        logger.info(f"🗃️ Cache des offres activé ({type(backend).__name__})")
+    return _job_offer_cache
@@ -0,0 +1,195 @@
+"""
+Dédoublonnage inter-sources des offres du Sniper Swarm.
+
+La même offre revient de LinkedIn, Indeed, Jooble... avec des titres légèrement différents
+("Développeur .NET (H/F)" / "Developpeur .NET") : la clé exacte titre+entreprise la laissait passer
+et le Judge la notait plusieurs fois. L'index compare, dans l'ordre :
+
+1. l'URL canonique (hôte sans www, sans fragment ni paramètres de suivi) ; les liens de repli vers une page
+   de recherche ou de listing (carte sans lien propre) sont ignorés, plusieurs offres les partagent
+2. la clé titre+entreprise normalisée (accents retirés, marqueurs H/F, ponctuation et forme juridique ignorés)
+3. les offres de la même entreprise normalisée (hors entreprise inconnue / "Confidentiel") : quasi-doublon si la similarité de Jaccard des trigrammes du titre
+   atteint settings.job_dedup_title_similarity (seuil abaissé quand le début de description est identique),
+   à niveau égal (Senior / Junior / II...) et dans une ville compatible.
+
+Un doublon est fusionné dans l'offre déjà retenue : description la plus riche, champs manquants complétés,
+sources d'origine listées dans "sources".
+"""
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+from config.settings import settings
+from core.gazetteer import strip_accents
+from core.job_cache import _is_placeholder
+from core.job_record import JobRecord
+
+_GENDER_RE = re.compile(r"\(?\b[hfmx](?:\s*/\s*[hfmx]){1,2}\b\)?|\((?:e|se|euse|rice|ne)\)")
+_TOKEN_RE = re.compile(r"\.?[a-z0-9][a-z0-9+#.]*")
+_LEGAL_FORMS = frozenset({
+    "inc", "ltd", "ltee", "llc", "corp", "corporation", "limited", "sa", "sas", "sarl", "sasu", "gmbh", "co",
+})
+_TRACKING_PARAMS = frozenset({
+    "refid", "trackingid", "trk", "from", "src", "ref", "fbclid", "gclid", "tk", "vjs", "advn", "adid",
+})
+# Entreprises de repli des sources (carte sans employeur) : aucun rapprochement approximatif entre elles
+_UNKNOWN_COMPANIES = frozenset({"", "confidentiel", "confidential", "anonyme", "incognito", "non specifie", "fonction publique"})
+# Dernier segment de chemin d'une page de recherche / listing (URL de repli partagée par plusieurs offres)
+_LISTING_SEGMENTS = frozenset({
+    "jobs", "search", "emplois", "recherche", "offres", "offres-emploi", "offre-emploi", "job-details",
+    "jobsearch", "recherche-jobs-cameroun",
+})
+# Mots qui distinguent deux postes malgré des titres presque identiques ("Engineer II" / "Engineer III")
+_LEVEL_TOKENS = frozenset({
+    "i", "ii", "iii", "iv", "v", "1", "2", "3", "4", "junior", "jr", "senior", "sr", "lead", "principal",
+    "staff", "chef", "head", "manager", "directeur", "director", "stage", "stagiaire", "intern", "internship",
+    "alternance", "apprenti",
+})
+# Même début de description : titres un peu plus éloignés acceptés ("Java Developer" / "Java Developer - Remote"),
+# mais pas deux postes différents d'une entreprise qui réutilise son texte de présentation (".NET" / "Java")
+_SAME_DESCRIPTION_BONUS = 0.15
+
+
+def fold(text: Any) -> str:
+    """Minuscules sans accents ni marqueurs de genre (H/F, (e))."""
+    return _GENDER_RE.sub(" ", strip_accents(str(text or "")))
+
+
+def tokens(text: Any) -> List[str]:
+    """Mots normalisés (".net", "c++", "c#" et "node.js" restent entiers)."""
+    return [t.rstrip(".") for t in _TOKEN_RE.findall(fold(text))]
+
+
+def company_key(company: Any) -> str:
+    return " ".join(t for t in tokens(company) if t not in _LEGAL_FORMS)
+
+
+def canonical_url(url: Any) -> str:
+    """URL comparable d'une source à l'autre ("" si absente ou non HTTP)."""
+    if not url or not str(url).startswith("http"):
+        return ""
+    parts = urlsplit(str(url).strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=False)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    return urlunsplit(("https", host, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def is_listing_url(url: Any) -> bool:
+    """Vrai pour une racine de site ou une page de recherche (".../jobs?q=...", ".../offres/recherche?motsCles=...")."""
+    path = urlsplit(str(url or "")).path.strip("/").lower()
+    return not path or path.rsplit("/", 1)[-1] in _LISTING_SEGMENTS
+
+
+def trigrams(words: List[str]) -> FrozenSet[str]:
+    text = f" {' '.join(words)} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+class _Features(NamedTuple):
+    grams: FrozenSet[str]
+    levels: FrozenSet[str]
+    city: str
+    desc_head: str
+
+
+class JobDedupIndex:
+    """Offres déjà retenues pour une recherche ; `add` renvoie l'offre si elle est nouvelle, None si fusionnée."""
+
+    def __init__(self, title_similarity: Optional[float] = None, desc_chars: Optional[int] = None):
+        self.title_similarity = settings.job_dedup_title_similarity if title_similarity is None else title_similarity
+        self.desc_chars = settings.job_dedup_desc_chars if desc_chars is None else desc_chars
+        self.records: List[JobRecord] = []
+        self.merged = 0
+        self._by_url: Dict[str, int] = {}
+        self._by_key: Dict[str, int] = {}
+        self._by_company: Dict[str, List[int]] = {}
+        self._features: List[_Features] = []
+
+    def add(self, job: Any) -> Optional[JobRecord]:
+        record = JobRecord.coerce(job)
+        url = "" if _is_placeholder(record) or is_listing_url(record.url) else canonical_url(record.url)
+        title_tokens = tokens(record.title)
+        company = company_key(record.company)
+        key = f"{' '.join(title_tokens)}|{company}"
+
+        idx = self._by_url.get(url) if url else None
+        if idx is None:
+            idx = self._by_key.get(key)
+        features = None
+        if idx is None and self.title_similarity < 1 and company not in _UNKNOWN_COMPANIES:
+            features = self._describe(record, title_tokens)
+            idx = self._near_duplicate(features, company)
+        if idx is not None:
+            self._merge(self.records[idx], record)
+            self.merged += 1
+            return None
+
+        idx = len(self.records)
+        self.records.append(record)
+        self._features.append(features or self._describe(record, title_tokens))
+        if url:
+            self._by_url[url] = idx
+        self._by_key.setdefault(key, idx)
+        self._by_company.setdefault(company, []).append(idx)
+        return record
+
+    def add_all(self, jobs: Iterable[Any]) -> List[JobRecord]:
+        """Offres nouvelles parmi `jobs` (ordre conservé), les doublons étant fusionnés dans l'index."""
+        before = self.merged
+        fresh = [record for record in map(self.add, jobs) if record is not None]
+        if self.merged > before:
+            logger.info(f"🧬 Dédoublonnage: {self.merged - before} doublon(s) inter-sources fusionné(s)")
+        return fresh
+
+    def _describe(self, record: JobRecord, title_tokens: List[str]) -> _Features:
+        city = tokens((record.location or "").split(",")[0])
+        return _Features(
+            grams=trigrams(title_tokens),
+            levels=frozenset(t for t in title_tokens if t in _LEVEL_TOKENS),
+            city=" ".join(city),
+            desc_head=" ".join(tokens((record.description or "")[:self.desc_chars])),
+        )
+
+    def _near_duplicate(self, features: _Features, company: str) -> Optional[int]:
+        for idx in self._by_company.get(company, ()):
+            other = self._features[idx]
+            if other.levels != features.levels:
+                continue
+            if features.city and other.city and features.city != other.city:
+                continue
+            threshold = self.title_similarity
+            if features.desc_head and features.desc_head == other.desc_head:
+                threshold -= _SAME_DESCRIPTION_BONUS
+            if jaccard(features.grams, other.grams) >= threshold:
+                return idx
+        return None
+
+    @staticmethod
+    def _merge(kept: JobRecord, duplicate: JobRecord):
+        if len(duplicate.description or "") > len(kept.description or ""):
+            kept["description"] = duplicate.description
+        for field, value in duplicate.items():
+            if field not in kept and value not in ("", None):
+                kept[field] = value
+        sources = kept.get("sources") or ([kept.source] if kept.source else [])
+        if duplicate.source and duplicate.source not in sources:
+            kept["sources"] = sources + [duplicate.source]
+
+
+def dedupe_jobs(jobs: Iterable[Any]) -> List[JobRecord]:
+    """Dédoublonnage ponctuel d'une liste d'offres."""
+    return JobDedupIndex().add_all(jobs)
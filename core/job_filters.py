@@ -0,0 +1,93 @@
+"""
+Pré-filtre déterministe des offres, exécuté AVANT tout appel LLM.
+Les règles éliminatoires du Judge (Québec strict, hors-dev, stage) et les exclusions du Hunter
+sont compilées une seule fois en expressions régulières : chaque offre est parcourue en un seul
+passage au lieu d'une boucle de `in` par mot-clé.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from core.job_record import JobRecord
+
+DEV_SEARCH_TERMS = ["dev", "developpeur", "developer", "logiciel", "software", "programmation", "programming"]
+NON_DEV_TERMS = [
+    "mécanique", "mechanic", r"\bformation\b", r"\brh\b", "relations industrielles",
+    "manufacturing engineering", "controls engineering", "ordnance", r"\bmaintenance\b",
+]
+STAGE_TERMS = ["stage", "intern", "stagiaire", "internship"]
+QUEBEC_TARGET_TERMS = ["quebec", "québec", "montreal", ", qc"]
+
+# Longueur de description examinée par les règles (identique à l'ancien filet post-LLM)
+DESC_SCAN_CHARS = 400
+
+
+def compile_terms(terms: Iterable[str], raw: bool = False) -> Optional[Pattern]:
+    """Compile une liste de termes en une alternative unique (None si la liste est vide).
+
+    Avec raw=True, les termes sont des fragments regex (ex: r"\\brh\\b"), sinon ils sont échappés.
+    """
+    parts = [t if raw else re.escape(t) for t in terms if t]
+    if not parts:
+        return None
+    # Les plus longs d'abord pour que l'alternative préfère la correspondance la plus précise
+    parts.sort(key=len, reverse=True)
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+_DEV_SEARCH_RE = compile_terms(DEV_SEARCH_TERMS)
+_NON_DEV_RE = compile_terms(NON_DEV_TERMS, raw=True)
+_STAGE_RE = compile_terms(STAGE_TERMS)
+_QUEBEC_TARGET_RE = compile_terms(QUEBEC_TARGET_TERMS)
+
+
+def filter_excluded(jobs: List[Dict[str, Any]], exclude: List[str]) -> List[Dict[str, Any]]:
+    """Retire les offres dont le titre ou la description contient un terme exclu."""
+    pattern = compile_terms(e.strip() for e in exclude)
+    if pattern is None:
+        return jobs
+    return [j for j in jobs if not pattern.search(f"{j.get('title', '')} {j.get('description', '')}")]
+
+
+class JobPreScorer:
+    """Règles éliminatoires du Judge, préparées une fois par profil de recherche."""
+
+    def __init__(self, profile: Dict[str, Any]):
+        target_loc = (profile.get("target_location") or "").lower()
+        search_q = (profile.get("search_query") or "").lower()
+        job_type = (profile.get("target_job_type") or profile.get("target_level") or "emploi").lower()
+        self.is_quebec_target = bool(_QUEBEC_TARGET_RE.search(target_loc))
+        self.is_dev_search = bool(_DEV_SEARCH_RE.search(search_q))
+        self.wants_stage = job_type == "stage" or bool(_STAGE_RE.search(search_q))
+
+    def evaluate(self, job: Dict[str, Any]) -> Optional[str]:
+        """Retourne la raison d'élimination si l'offre est certainement hors cible, sinon None (à juger par le LLM)."""
+        if isinstance(job, JobRecord):
+            loc, title = job.location_lc.strip(), job.title_lc
+        else:
+            loc = (job.get("location") or "").strip().lower()
+            title = (job.get("title") or "").lower()
+        # Les motifs sont en IGNORECASE : pas besoin de copier la description en minuscules
+        desc = (job.get("description") or "")[:DESC_SCAN_CHARS]
+
+        if self.is_quebec_target and loc == "canada":
+            return "Localisation « Canada » seule : hors Québec."
+        if self.is_dev_search and (_NON_DEV_RE.search(title) or _NON_DEV_RE.search(desc)):
+            return "Hors dev: mécanique/formation/manufacturing."
+        if self.wants_stage:
+            text = f"{title} {desc} {(job.get('job_type') or '').lower()}"
+            if not _STAGE_RE.search(text):
+                return "Recherche stage : l'offre n'est pas un stage/intern."
+        return None
+
+    def partition(self, jobs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Sépare les offres à envoyer au LLM de celles éliminées d'office (score 0 + justification)."""
+        candidates, rejected = [], []
+        for job in jobs:
+            reason = self.evaluate(job)
+            if reason is None:
+                candidates.append(job)
+            else:
+                job["match_score"] = 0
+                job["match_justification"] = reason
+                rejected.append(job)
+        return candidates, rejected
@@ -0,0 +1,194 @@
+"""
+Représentation canonique d'une offre dans le pipeline Hunter → Judge → JobSearchAgent.
+
+Les sources renvoient des dicts aux clés variables ; ils sont convertis une fois, à l'ingestion par le Hunter,
+en JobRecord (__slots__ : pas de __dict__ par instance, les clés rares d'une source vont dans `extra`).
+Les formes normalisées (titre / entreprise / lieu en minuscules, clé de dédoublonnage) sont calculées à ce
+moment-là, l'empreinte de contenu et le hash de description au premier usage ; les boucles de
+dédoublonnage, de filtrage et de notation ne refont plus ces `.lower()` et concaténations.
+
+Accès compatible dict (job.get("title"), job["match_score"] = 80, "match_score" in job) : le code existant
+et les sources n'ont pas à changer. to_dict() produit la réponse API. `origin` (clé de la source interrogée :
+"linkedin", "gov"...) sert à la télémétrie des sources et n'est jamais sérialisé.
+"""
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Champs connus de tout le pipeline ; les autres clés d'une source (salary, posted_date...) vont dans `extra`
+CANONICAL_FIELDS: Tuple[str, ...] = (
+    "id", "title", "company", "location", "url", "description", "source",
+    "match_score", "match_justification", "apply_email",
+)
+_CANONICAL = frozenset(CANONICAL_FIELDS)
+_LOWERED = frozenset(("title", "company", "location"))
+_CONTENT = frozenset(("title", "company", "location", "description", "url"))
+
+
+def condense(value: Any) -> str:
+    """Forme canonique d'un champ (liste triée, minuscules, espaces compactés)."""
+    if isinstance(value, (list, tuple, set)):
+        return ",".join(sorted(condense(v) for v in value if v))
+    return " ".join(str(value or "").lower().split())
+
+
+def content_fingerprint(job: Any) -> str:
+    """
+    Empreinte du contenu noté par le Judge (url, titre, entreprise, lieu, début de description).
+    La description est tronquée comme dans le prompt du Judge (settings.judge_description_chars) :
+    un score mémoïsé ne sert que si le Judge aurait vu exactement le même texte.
+    """
+    from config.settings import settings
+    raw = "|".join([
+        condense(job.get("url")),
+        condense(job.get("title")),
+        condense(job.get("company")),
+        condense(job.get("location")),
+        condense((job.get("description") or "")[:settings.judge_description_chars]),
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class JobRecord:
+    """Offre d'emploi : champs canoniques en slots, normalisations précalculées, accès type dict."""
+
+    __slots__ = CANONICAL_FIELDS + (
+        "extra", "origin", "title_lc", "company_lc", "location_lc", "dedupe_key", "_fingerprint", "_description_hash",
+    )
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **fields: Any):
+        for name in CANONICAL_FIELDS:
+            setattr(self, name, None)
+        self.extra: Optional[Dict[str, Any]] = None
+        self.origin: Optional[str] = None
+        if data:
+            self._assign(data)
+        if fields:
+            self._assign(fields)
+        self._normalize()
+        self._fingerprint: Optional[str] = None
+        self._description_hash: Optional[str] = None
+
+    @classmethod
+    def coerce(cls, job: Any) -> "JobRecord":
+        """Dict de source → JobRecord (un JobRecord est renvoyé tel quel)."""
+        return job if isinstance(job, JobRecord) else cls(job)
+
+    @classmethod
+    def coerce_all(cls, jobs: Iterable[Any]) -> List["JobRecord"]:
+        return [job if isinstance(job, JobRecord) else cls(job) for job in jobs]
+
+    def _assign(self, data: Dict[str, Any]):
+        for key, value in data.items():
+            if key in _CANONICAL:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    def _normalize(self):
+        self.title_lc = (self.title or "").lower()
+        self.company_lc = (self.company or "").lower()
+        self.location_lc = (self.location or "").lower()
+        self.dedupe_key = f"{self.title_lc}-{self.company_lc}"
+
+    # --- Valeurs dérivées calculées au premier usage ---
+
+    @property
+    def fingerprint(self) -> str:
+        """Empreinte de contenu (clé des scores Judge mémoïsés), identique à core.judge_scores.job_fingerprint."""
+        if self._fingerprint is None:
+            self._fingerprint = content_fingerprint(self)
+        return self._fingerprint
+
+    @property
+    def description_hash(self) -> str:
+        """Hash de la description complète normalisée (dédoublonnage de contenu)."""
+        if self._description_hash is None:
+            self._description_hash = hashlib.sha1(condense(self.description).encode("utf-8")).hexdigest()
+        return self._description_hash
+
+    # --- Accès compatible dict ---
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _CANONICAL:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra is None:
+            return default
+        return self.extra.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _CANONICAL:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value: Any):
+        if key in _CANONICAL:
+            setattr(self, key, value)
+            if key in _CONTENT:
+                if key in _LOWERED:
+                    self._normalize()
+                self._fingerprint = None
+                if key == "description":
+                    self._description_hash = None
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: object) -> bool:
+        if key in _CANONICAL:
+            return getattr(self, key) is not None
+        return self.extra is not None and key in self.extra
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, data: Dict[str, Any]):
+        for key, value in data.items():
+            self[key] = value
+
+    def keys(self) -> List[str]:
+        present = [name for name in CANONICAL_FIELDS if getattr(self, name) is not None]
+        if self.extra:
+            present.extend(self.extra)
+        return present
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sérialisation pour la réponse API / le flux SSE (seuls les champs présents)."""
+        data = {name: getattr(self, name) for name in CANONICAL_FIELDS if getattr(self, name) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self) -> str:
+        return f"JobRecord(id={self.id!r}, title={self.title!r}, company={self.company!r}, source={self.source!r})"
+
+
+def job_dedupe_key(job: Any) -> str:
+    """Clé titre+entreprise d'une offre (JobRecord ou dict)."""
+    if isinstance(job, JobRecord):
+        return job.dedupe_key
+    return f"{job.get('title') or ''}-{job.get('company') or ''}".lower()
+
+
+def to_dicts(jobs: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Liste d'offres prête à être sérialisée (les dicts sont conservés tels quels)."""
+    return [job.to_dict() if isinstance(job, JobRecord) else job for job in jobs]
@@ -0,0 +1,110 @@
+"""
+Mémoïsation des scores du Judge.
+Clé : (version du prompt Judge, empreinte condensée du profil/recherche, empreinte du contenu de l'offre).
+Une offre déjà notée pour un profil équivalent n'est plus renvoyée au LLM, y compris d'une vague à l'autre.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import settings
+from core.job_record import JobRecord, condense as _condense, content_fingerprint
+from llm.response_cache import build_backend
+
+
+def job_fingerprint(job: Dict[str, Any]) -> str:
+    """Empreinte du contenu noté par le Judge (mêmes champs que le prompt) ; précalculée sur un JobRecord."""
+    if isinstance(job, JobRecord):
+        return job.fingerprint
+    return content_fingerprint(job)
+
+
+def profile_digest(profile: Dict[str, Any]) -> str:
+    """Empreinte des seuls champs du profil qui influencent la note."""
+    raw = "|".join([
+        _condense(profile.get("target_location")),
+        _condense(profile.get("target_job_type") or profile.get("target_level") or "emploi"),
+        _condense(profile.get("search_query")),
+        _condense(profile.get("target_roles")),
+        _condense(profile.get("skills")),
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class JudgeScoreStore:
+    """Scores du Judge en cache ; une panne du backend ne fait que renvoyer les offres au LLM."""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(job: Dict[str, Any], digest: str, prompt_version: str) -> str:
+        return f"{prompt_version}:{digest}:{job_fingerprint(job)}"
+
+    async def lookup(
+        self, jobs: List[Dict[str, Any]], profile: Dict[str, Any], prompt_version: str
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Applique les scores connus ; retourne (offres déjà notées, offres à envoyer au LLM)."""
+        digest = profile_digest(profile)
+        known, pending = [], []
+        for job in jobs:
+            value = None
+            try:
+                value = await self.backend.get(self.make_key(job, digest, prompt_version))
+            except Exception as e:
+                logger.debug(f"Scores Judge (lecture) indisponibles: {e}")
+            if value is None:
+                pending.append(job)
+                continue
+            data = json.loads(value)
+            job["match_score"] = data.get("score", 0)
+            job["match_justification"] = data.get("reason", "")
+            known.append(job)
+        self.hits += len(known)
+        self.misses += len(pending)
+        return known, pending
+
+    async def store(self, jobs: List[Dict[str, Any]], profile: Dict[str, Any], prompt_version: str):
+        """Enregistre les scores effectivement attribués par le LLM (les offres non notées sont ignorées)."""
+        digest = profile_digest(profile)
+        for job in jobs:
+            if "match_score" not in job:
+                continue
+            value = json.dumps(
+                {"score": job.get("match_score", 0), "reason": job.get("match_justification", "")},
+                ensure_ascii=False,
+            )
+            try:
+                await self.backend.set(self.make_key(job, digest, prompt_version), value, self.ttl)
+            except Exception as e:
+                logger.debug(f"Scores Judge (écriture) indisponibles: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# Instance globale
+_judge_score_store: Optional[JudgeScoreStore] = None
+
+
+def get_judge_score_store() -> Optional[JudgeScoreStore]:
+    """Retourne le store global des scores, ou None si désactivé (JUDGE_SCORE_CACHE_BACKEND=none)."""
+    global _judge_score_store
+    if settings.judge_score_cache_backend.lower() == "none":
+        return None
+    if _judge_score_store is None:
+        backend = build_backend(settings.judge_score_cache_backend, namespace="judge")
+        _judge_score_store = JudgeScoreStore(backend, settings.judge_score_ttl)
+        logger.info(f"🗃️ Mémoïsation des scores Judge activée ({type(backend).__name__})")
+    return _judge_score_store
@@ -0,0 +1,163 @@
+"""
+Extraction du texte des CV PDF uploadés (parse-pdf, upload-cv, mini-audit public).
+
+- l'upload est recopié par blocs dans un fichier temporaire (hash calculé au fil de l'eau, taille plafonnée)
+- PyMuPDF tourne dans un pool de processus dédié (pas sur l'event loop, PyMuPDF n'étant pas thread-safe),
+  par tranches de pages en parallèle pour les longs documents
+- résultat mis en cache par empreinte du fichier : un CV ré-uploadé est servi sans réextraction
+- sortie structurée : texte + blocs par page
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import settings
+from core.render_pool import RenderSaturatedError, RenderService, RenderTimeoutError
+from llm.response_cache import build_backend
+
+CHUNK_SIZE = 64 * 1024
+# À incrémenter si le format de sortie change (invalide le cache)
+EXTRACTOR_VERSION = "1"
+
+
+class PdfTooLargeError(ValueError):
+    """Fichier au-delà de settings.pdf_max_bytes."""
+
+
+class PdfExtractionError(ValueError):
+    """PDF illisible ou vide."""
+
+
+# --- Tâche exécutée dans les processus d'extraction ---
+
+def extract_pages(path: str, start: int, stop: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """Pages [start, stop) du PDF : (nombre total de pages, blocs de texte par page)."""
+    import fitz  # PyMuPDF
+    pages = []
+    with fitz.open(path) as doc:
+        total = len(doc)
+        for number in range(start, min(stop, total)):
+            blocks = [
+                {"bbox": [round(b[0], 1), round(b[1], 1), round(b[2], 1), round(b[3], 1)], "text": b[4]}
+                for b in doc.load_page(number).get_text("blocks")
+                if b[6] == 0 and b[4].strip()  # type 0 = texte (1 = image)
+            ]
+            pages.append({
+                "page": number + 1,
+                "text": "".join(b["text"] for b in blocks),
+                "blocks": blocks,
+            })
+    return total, pages
+
+
+class PdfExtractionService:
+    def __init__(self, pool: RenderService, cache_backend: Optional[Any], ttl: int):
+        self.pool = pool
+        self.cache = cache_backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def spool(self, upload) -> Tuple[str, str, int]:
+        """Recopie l'upload (Starlette UploadFile) dans un fichier temporaire ; retourne (chemin, sha256, taille)."""
+        digest = hashlib.sha256()
+        size = 0
+        fd, path = tempfile.mkstemp(prefix="cv_upload_", suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = await upload.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > settings.pdf_max_bytes:
+                        raise PdfTooLargeError(f"PDF trop volumineux (max {settings.pdf_max_bytes // (1024 * 1024)} Mo)")
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path, digest.hexdigest(), size
+
+    async def _extract_file(self, path: str, max_pages: int) -> Dict[str, Any]:
+        chunk = max(1, settings.pdf_pages_per_task)
+        # La première tranche donne aussi le nombre de pages (un seul aller-retour pour un CV court)
+        total, pages = await self.pool.run(extract_pages, path, 0, min(chunk, max_pages))
+        limit = min(total, max_pages)
+        if limit > chunk:
+            rest = await asyncio.gather(*(
+                self.pool.run(extract_pages, path, start, min(start + chunk, limit))
+                for start in range(chunk, limit, chunk)
+            ))
+            for _, more in rest:
+                pages.extend(more)
+        return {"page_count": total, "truncated": total > limit, "pages": pages}
+
+    async def extract_upload(self, upload, max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """Texte et blocs par page d'un PDF uploadé (plafonné à max_pages / settings.pdf_max_pages)."""
+        max_pages = min(max_pages or settings.pdf_max_pages, settings.pdf_max_pages)
+        path, sha, size = await self.spool(upload)
+        try:
+            key = f"{EXTRACTOR_VERSION}:{max_pages}:{sha}"
+            cached = None
+            if self.cache is not None:
+                try:
+                    cached = await self.cache.get(key)
+                except Exception as e:
+                    logger.debug(f"Cache extraction PDF (lecture) indisponible: {e}")
+            if cached is not None:
+                self.hits += 1
+                return json.loads(cached)
+            self.misses += 1
+
+            try:
+                result = await self._extract_file(path, max_pages)
+            except (ImportError, RenderSaturatedError, RenderTimeoutError):
+                raise
+            except Exception as e:
+                raise PdfExtractionError(f"PDF illisible: {e}")
+            if result["page_count"] == 0:
+                raise PdfExtractionError("PDF vide.")
+            result["text"] = "".join(p["text"] for p in result["pages"]).strip()
+            result["sha256"] = sha
+            result["size"] = size
+            if self.cache is not None:
+                try:
+                    await self.cache.set(key, json.dumps(result, ensure_ascii=False), self.ttl)
+                except Exception as e:
+                    logger.debug(f"Cache extraction PDF (écriture) indisponible: {e}")
+            return result
+        finally:
+            os.unlink(path)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "pool": self.pool.stats(),
+        }
+
+
+# Instance globale
+_pdf_extraction_service: Optional[PdfExtractionService] = None
+
+
+def get_pdf_extraction_service() -> PdfExtractionService:
+    global _pdf_extraction_service
+    if _pdf_extraction_service is None:
+        pool = RenderService(
+            workers=settings.pdf_extract_workers,
+            max_pending=settings.pdf_extract_max_pending,
+            timeout=settings.pdf_extract_timeout,
+        )
+        kind = settings.pdf_text_cache_backend.lower()
+        backend = None if kind == "none" else build_backend(kind, namespace="pdf_text")
+        _pdf_extraction_service = PdfExtractionService(pool, backend, settings.pdf_text_cache_ttl)
+    return _pdf_extraction_service
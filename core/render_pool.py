@@ -0,0 +1,181 @@
+"""
+Service de rendu des documents (PDF ReportLab, DOCX, ZIP) hors de l'event loop.
+
+Le rendu est CPU-bound : exécuté dans le handler async, un CV bloque toutes les autres
+requêtes du worker uvicorn (y compris les WebSockets d'entretien). Ici :
+- pool de processus dédié (settings.render_workers)
+- profondeur de file bornée : au-delà, RenderSaturatedError (→ HTTP 503 + Retry-After)
+- timeout par rendu : RenderTimeoutError (le slot reste occupé tant que le processus travaille)
+"""
+import asyncio
+import io
+import multiprocessing
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from config.settings import settings
+
+
+class RenderSaturatedError(Exception):
+    """Trop de rendus en attente : le client doit réessayer plus tard."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Service de rendu saturé, réessayer dans {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RenderTimeoutError(Exception):
+    """Le rendu a dépassé settings.render_timeout."""
+
+
+# --- Tâches exécutées dans les processus du pool (fonctions de module : picklables) ---
+
+def _warmup() -> bool:
+    # Charge ReportLab et python-docx, puis construit les styles des dix thèmes une fois par processus
+    import core.cv_generator  # noqa: F401
+    from core.cv_theme_registry import warm_theme_registries
+    warm_theme_registries()
+    return True
+
+
+def render_cv_pdf(cv_data: Dict[str, Any], theme_id: str) -> bytes:
+    from core.cv_ats_generator import generate_ats_cv_pdf
+    return generate_ats_cv_pdf(cv_data, theme_id=theme_id)
+
+
+def render_cv_docx(cv_data: Dict[str, Any]) -> bytes:
+    from core.cv_generator import generate_cv_docx
+    return generate_cv_docx(cv_data)
+
+
+def render_thumbnail(pdf_bytes: bytes, width: int) -> bytes:
+    """PNG basse résolution de la page 1 (sélecteur de thèmes)."""
+    import fitz  # PyMuPDF
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page = doc.load_page(0)
+        zoom = width / page.rect.width
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).tobytes("png")
+
+
+# Formats déjà compressés : stockés tels quels dans les ZIP (DEFLATE ne gagnerait rien)
+_STORED_EXTENSIONS = (".pdf", ".png", ".docx", ".zip")
+
+
+def build_zip(files: Dict[str, Any]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in files.items():
+            compress = zipfile.ZIP_STORED if name.lower().endswith(_STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+            zip_file.writestr(name, content, compress_type=compress)
+    return buffer.getvalue()
+
+
+class RenderService:
+    """File bornée devant un pool de processus de rendu."""
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.timeout = timeout
+        self.pending = 0
+        self.metrics = {"completed": 0, "rejected": 0, "timeouts": 0, "failed": 0, "avg_seconds": 0.0}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()  # _on_done tourne dans le thread de gestion du pool
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn : pas de fork d'un processus qui porte des threads (Motor, aiohttp)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def retry_after(self) -> int:
+        """Estimation du temps avant qu'un slot se libère (secondes)."""
+        avg = self.metrics["avg_seconds"] or 2.0
+        return max(1, int(avg * self.pending / self.workers + 0.5))
+
+    async def run(self, func: Callable[..., bytes], *args) -> bytes:
+        """Exécute `func(*args)` dans le pool ; lève RenderSaturatedError si la file est pleine."""
+        if self.pending >= self.max_pending:
+            self.metrics["rejected"] += 1
+            raise RenderSaturatedError(self.retry_after())
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BrokenProcessPool:
+            self._reset()
+            future = self._get_executor().submit(func, *args)
+
+        # Le slot est rendu quand le processus a réellement fini (même après un timeout côté client)
+        with self._lock:
+            self.pending += 1
+        started = time.monotonic()
+        future.add_done_callback(lambda f: self._on_done(f, started))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"] += 1
+            logger.warning(f"⏱️ Rendu {func.__name__} > {self.timeout}s, abandonné")
+            raise RenderTimeoutError(f"Rendu trop long (> {self.timeout:.0f}s)")
+        except BrokenProcessPool:
+            self._reset()
+            raise
+
+    def _on_done(self, future, started: float):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.metrics["failed"] += 1
+                return
+            done = self.metrics["completed"]
+            self.metrics["avg_seconds"] = (self.metrics["avg_seconds"] * done + elapsed) / (done + 1)
+            self.metrics["completed"] = done + 1
+
+    def _reset(self):
+        logger.error("💥 Pool de rendu cassé (processus tué ?), recréation")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def warmup(self):
+        """Démarre les processus et précharge les générateurs (évite le coût au premier CV)."""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _warmup) for _ in range(self.workers)))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            logger.info("🖨️ Pool de rendu arrêté")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.metrics.items()},
+        }
+
+
+# Instance globale
+_render_service: Optional[RenderService] = None
+
+
+def get_render_service() -> RenderService:
+    global _render_service
+    if _render_service is None:
+        _render_service = RenderService(
+            workers=settings.render_workers,
+            max_pending=settings.render_max_pending,
+            timeout=settings.render_timeout,
+        )
+    return _render_service
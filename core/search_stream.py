@@ -0,0 +1,77 @@
+"""
+Flux d'événements de recherche (Server-Sent Events) pour le Sniper Swarm.
+Les agents reçoivent un simple callback `on_event(type, **data)` ; le flux les met en file
+et l'endpoint /api/chat/stream les sérialise au format SSE au fil de l'eau.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from loguru import logger
+
+from core.job_record import job_dedupe_key, to_dicts
+
+# Callback transmis aux agents via le plan d'action (clé "on_event")
+EventCallback = Callable[..., None]
+
+
+def emit_event(on_event: Optional[EventCallback], event_type: str, **data: Any):
+    """Émet un événement si un callback est branché ; une erreur d'émission ne casse jamais la recherche."""
+    if on_event is None:
+        return
+    try:
+        on_event(event_type, **data)
+    except Exception as e:
+        logger.debug(f"Événement de recherche '{event_type}' non émis: {e}")
+
+
+class SearchEventStream:
+    """File d'événements d'une recherche, consommée par une réponse SSE."""
+
+    def __init__(self, heartbeat: float = 15.0):
+        self.heartbeat = heartbeat
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        self._seen_jobs: set = set()
+        self._closed = False
+
+    def emit(self, event_type: str, **data: Any):
+        """Callback synchrone passé aux agents (non bloquant)."""
+        if self._closed:
+            return
+        if event_type == "jobs":
+            # Une offre déjà poussée au client (autre vague, autre lot) n'est pas renvoyée
+            fresh = []
+            for job in data.get("jobs", []):
+                key = job_dedupe_key(job)
+                if key not in self._seen_jobs:
+                    self._seen_jobs.add(key)
+                    fresh.append(job)
+            if not fresh:
+                return
+            # Instantané sérialisable (les JobRecord continuent d'être enrichis par le pipeline)
+            data["jobs"] = to_dicts(fresh)
+        self._queue.put_nowait({"event": event_type, "data": data})
+
+    def close(self):
+        """Termine le flux après les événements déjà en file."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(None)
+
+    @staticmethod
+    def format_sse(event_type: str, data: Any) -> str:
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        return f"event: {event_type}\ndata: {payload}\n\n"
+
+    async def events(self) -> AsyncIterator[str]:
+        """Générateur SSE : un message par événement, commentaire keep-alive si la file reste vide."""
+        while True:
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=self.heartbeat)
+            except asyncio.TimeoutError:
+                # Évite la coupure de la connexion par les proxies pendant un scraper lent
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                break
+            yield self.format_sse(item["event"], item["data"])
@@ -0,0 +1,395 @@
+"""
+Santé des sources d'emploi (Jooble, JSearch, LinkedIn, Indeed...) : télémétrie et planification adaptative.
+
+Chaque appel de source passe par SourceHealthRegistry.call :
+- durée bornée par source (SOURCE_TIMEOUTS) : un scraper qui pend ne retient plus toute une vague
+- latence (histogramme), issue (ok / vide / liens de repli / timeout / erreur), statuts HTTP observés
+  via tools.http_client, offres réelles ramenées ; le JobSearchAgent ajoute les offres notées / retenues par le Judge
+- circuit breaker : après settings.source_breaker_failures échecs consécutifs la source est coupée,
+  puis retentée par un seul appel d'essai après un délai doublé à chaque rechute (plafonné)
+
+Le planificateur (plan_waves) s'appuie sur les derniers appels : source au rendement faible ou lente
+→ vague 2, source rapide et productive → vague 1, circuit ouvert → ignorée.
+
+Les compteurs sont cumulés par $inc dans un document journalier par source (collection MongoDB
+"source_health", _id = "<source>:<AAAA-MM-JJ>") ; l'état des circuits reste en mémoire.
+"""
+import asyncio
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from config.settings import settings
+from core.job_cache import _is_placeholder
+
+# Durée max d'un appel par source (secondes) : les scrapers qui chargent les pages de détail ont plus de marge
+SOURCE_TIMEOUTS = {
+    "jooble": 10.0,
+    "jsearch": 12.0,
+    "findwork": 10.0,
+    "glassdoor": 12.0,
+    "linkedin": 20.0,
+    "indeed": 15.0,
+    "indeed_fr": 15.0,
+    "google_jobs": 15.0,
+    "gov": 20.0,
+    "emploi_cm": 20.0,
+}
+
+# Bornes de l'histogramme de latence (millisecondes), plus un seau de débordement
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 4000, 8000, 15000)
+
+# Issues d'un appel ; timeout et error comptent comme échecs pour le circuit breaker
+OUTCOMES = ("ok", "empty", "placeholder", "timeout", "error", "skipped")
+
+
+class _CallProbe:
+    """Statuts HTTP observés pendant l'appel en cours (propagé aux requêtes via contextvars)."""
+
+    __slots__ = ("statuses",)
+
+    def __init__(self):
+        self.statuses: List[Any] = []
+
+    @property
+    def failed(self) -> bool:
+        """Au moins une requête en erreur (exception réseau ou statut HTTP >= 400)."""
+        return any(not isinstance(s, int) or s >= 400 for s in self.statuses)
+
+
+_current_call: ContextVar[Optional[_CallProbe]] = ContextVar("source_call", default=None)
+
+
+def _observe_status(host: str, status: Any):
+    probe = _current_call.get()
+    if probe is not None and status is not None:
+        probe.statuses.append(status)
+
+
+def latency_bucket(latency_ms: float) -> str:
+    for bound in LATENCY_BUCKETS_MS:
+        if latency_ms <= bound:
+            return f"le_{bound}"
+    return f"gt_{LATENCY_BUCKETS_MS[-1]}"
+
+
+class CircuitBreaker:
+    """Fermé → ouvert après N échecs consécutifs → semi-ouvert (un seul appel d'essai) à l'expiration du délai."""
+
+    def __init__(self, failure_threshold: int, backoff: float, max_backoff: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    def state(self, now: float) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if now < self.open_until or self.probing else "half_open"
+
+    def acquire(self, now: float) -> Optional[bool]:
+        """None si l'appel est refusé, sinon True pour l'appel d'essai d'un circuit semi-ouvert."""
+        state = self.state(now)
+        if state == "closed":
+            return False
+        if state == "open":
+            return None
+        self.probing = True
+        return True
+
+    def record(self, success: bool, now: float, probe: bool = False) -> bool:
+        """Enregistre l'issue d'un appel ; True si le circuit vient de s'ouvrir."""
+        if success:
+            self.failures = 0
+            self.trips = 0
+            self.open_until = 0.0
+            self.probing = False
+            return False
+        if self.open_until and not probe:
+            # Appel lancé avant l'ouverture : le circuit est déjà ouvert, le délai ne change pas
+            return False
+        self.failures += 1
+        if probe or self.failures >= self.failure_threshold:
+            self.trips += 1
+            self.open_until = now + min(self.max_backoff, self.backoff * 2 ** (self.trips - 1))
+            self.failures = 0
+            self.probing = False
+            return True
+        return False
+
+
+class _Sample(NamedTuple):
+    latency_ms: float
+    outcome: str
+    real_jobs: int
+
+
+class SourceStats:
+    """Compteurs d'une source : fenêtre glissante (planificateur), totaux (admin), deltas à persister."""
+
+    def __init__(self, window: int, breaker: CircuitBreaker):
+        self.recent: Deque[_Sample] = deque(maxlen=max(1, window))
+        self.breaker = breaker
+        self.totals: Counter = Counter()
+        self.pending: Counter = Counter()
+
+    def bump(self, field: str, amount: int = 1):
+        if amount:
+            self.totals[field] += amount
+            self.pending[field] += amount
+
+    def record_call(self, latency_ms: float, outcome: str, statuses: Iterable[Any], jobs: int, real_jobs: int):
+        self.recent.append(_Sample(latency_ms, outcome, real_jobs))
+        self.bump("calls")
+        self.bump(f"outcomes.{outcome}")
+        self.bump(f"latency_ms.{latency_bucket(latency_ms)}")
+        self.bump("latency_ms_total", int(latency_ms))
+        for status in statuses:
+            self.bump(f"http.{status}")
+        self.bump("jobs", jobs)
+        self.bump("real_jobs", real_jobs)
+
+    def yield_rate(self) -> Optional[float]:
+        """Part des appels récents ayant ramené au moins une offre réelle (None si aucun appel)."""
+        if not self.recent:
+            return None
+        return sum(1 for s in self.recent if s.real_jobs) / len(self.recent)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(s.latency_ms for s in self.recent)
+        return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+    def verdict(self, min_samples: int, min_yield: float, fast_p90_ms: float) -> Optional[str]:
+        """poor / slow / fast d'après les appels récents, None tant que l'échantillon est trop petit."""
+        if len(self.recent) < min_samples:
+            return None
+        if self.yield_rate() < min_yield:
+            return "poor"
+        if self.latency_percentile(0.9) > fast_p90_ms:
+            return "slow"
+        return "fast"
+
+
+class SourceHealthRegistry:
+    """Télémétrie et circuits de toutes les sources (partagés par toutes les recherches du processus)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.sources: Dict[str, SourceStats] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def source(self, name: str) -> SourceStats:
+        stats = self.sources.get(name)
+        if stats is None:
+            breaker = CircuitBreaker(
+                settings.source_breaker_failures,
+                settings.source_breaker_backoff,
+                settings.source_breaker_max_backoff,
+            )
+            stats = SourceStats(settings.source_health_window, breaker)
+            self.sources[name] = stats
+        return stats
+
+    @staticmethod
+    def timeout_for(source: str) -> float:
+        return SOURCE_TIMEOUTS.get(source, settings.source_timeout_default)
+
+    async def call(self, source: str, fetch: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Exécute `fetch` sous timeout et circuit breaker ; une source coupée ou en échec renvoie []."""
+        stats = self.source(source)
+        probe_call = stats.breaker.acquire(self.clock())
+        if probe_call is None:
+            stats.bump("outcomes.skipped")
+            return []
+
+        probe = _CallProbe()
+        token = _current_call.set(probe)
+        started = self.clock()
+        jobs: List[Dict[str, Any]] = []
+        error: Optional[BaseException] = None
+        try:
+            result = await asyncio.wait_for(fetch(), timeout=self.timeout_for(source))
+            jobs = result if isinstance(result, list) else []
+        except asyncio.TimeoutError as e:
+            error = e
+        except asyncio.CancelledError:
+            if probe_call:
+                stats.breaker.probing = False
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            _current_call.reset(token)
+        latency_ms = (self.clock() - started) * 1000
+
+        real_jobs = sum(1 for j in jobs if not _is_placeholder(j))
+        if isinstance(error, asyncio.TimeoutError):
+            outcome = "timeout"
+        elif error is not None or (not real_jobs and probe.failed):
+            outcome = "error"
+        elif real_jobs:
+            outcome = "ok"
+        else:
+            outcome = "placeholder" if jobs else "empty"
+
+        stats.record_call(latency_ms, outcome, probe.statuses, len(jobs), real_jobs)
+        if outcome == "timeout":
+            logger.warning(f"⏱️ Source {source} abandonnée après {self.timeout_for(source):.0f}s")
+        elif error is not None:
+            logger.error(f"🔴 Source {source} en erreur: {error}")
+        if stats.breaker.record(outcome not in ("timeout", "error"), self.clock(), probe=probe_call):
+            stats.bump("breaker_trips")
+            delay = stats.breaker.open_until - self.clock()
+            logger.warning(f"🔌 Source {source} coupée pour {delay:.0f}s ({outcome} répétés)")
+        elif probe_call and outcome not in ("timeout", "error"):
+            logger.info(f"🔌 Source {source} rétablie")
+
+        return jobs
+
+    def is_available(self, source: str) -> bool:
+        stats = self.sources.get(source)
+        return stats is None or stats.breaker.state(self.clock()) != "open"
+
+    def available(self, sources: Iterable[str]) -> List[str]:
+        return [s for s in sources if self.is_available(s)]
+
+    def plan_waves(self, sources: Iterable[str], fast: Iterable[str]) -> Tuple[List[str], List[str], List[str]]:
+        """(vague 1, vague 2, sources ignorées) : `fast` est la répartition par défaut, corrigée par la santé récente."""
+        fast = set(fast)
+        wave_1, wave_2, skipped = [], [], []
+        for source in sources:
+            if not self.is_available(source):
+                skipped.append(source)
+                continue
+            stats = self.sources.get(source)
+            verdict = None
+            if stats is not None and settings.source_adaptive_waves:
+                verdict = stats.verdict(
+                    settings.source_health_min_samples, settings.source_min_yield, settings.source_fast_p90 * 1000
+                )
+            if verdict == "fast" or (verdict is None and source in fast):
+                wave_1.append(source)
+            else:
+                wave_2.append(source)
+        if not wave_1:
+            # Rien de rapide : une seule vague plutôt qu'une vague 1 vide
+            wave_1, wave_2 = wave_2, []
+        return wave_1, wave_2, skipped
+
+    def reset(self):
+        """Oublie télémétrie et circuits (benchmarks : chaque niveau part du même état)."""
+        self.sources.clear()
+
+    def record_judged(self, judged: Iterable[Any], kept: Iterable[Any]):
+        """Offres envoyées au Judge et offres retenues, par source d'origine (JobRecord.origin)."""
+        for field, jobs in (("judged", judged), ("kept", kept)):
+            for source, count in Counter(getattr(j, "origin", None) for j in jobs).items():
+                if source:
+                    self.source(source).bump(field, count)
+
+    def stats(self) -> Dict[str, Any]:
+        now = self.clock()
+        result = {}
+        for name, stats in self.sources.items():
+            totals = stats.totals
+            yield_rate = stats.yield_rate()
+            p50, p90 = stats.latency_percentile(0.5), stats.latency_percentile(0.9)
+            result[name] = {
+                "calls": totals["calls"],
+                "outcomes": {o: totals[f"outcomes.{o}"] for o in OUTCOMES if totals[f"outcomes.{o}"]},
+                "http": {k[5:]: v for k, v in totals.items() if k.startswith("http.")},
+                "latency_ms": {k[11:]: v for k, v in totals.items() if k.startswith("latency_ms.")},
+                "avg_latency_ms": round(totals["latency_ms_total"] / totals["calls"]) if totals["calls"] else 0,
+                "jobs": totals["jobs"],
+                "real_jobs": totals["real_jobs"],
+                "judged": totals["judged"],
+                "kept": totals["kept"],
+                "recent_yield": round(yield_rate, 3) if yield_rate is not None else None,
+                "recent_p50_ms": round(p50) if p50 is not None else None,
+                "recent_p90_ms": round(p90) if p90 is not None else None,
+                "verdict": stats.verdict(
+                    settings.source_health_min_samples, settings.source_min_yield, settings.source_fast_p90 * 1000
+                ),
+                "circuit": stats.breaker.state(now),
+                "breaker_trips": totals["breaker_trips"],
+                "timeout": self.timeout_for(name),
+            }
+        return result
+
+    # --- Persistance (compteurs journaliers) ---
+
+    async def flush(self) -> int:
+        """Écrit les deltas accumulés dans MongoDB ; retourne le nombre de sources mises à jour."""
+        from core.database import get_db
+
+        now = datetime.now(timezone.utc)
+        day = now.strftime("%Y-%m-%d")
+        expires_at = now + timedelta(days=settings.source_health_retention_days)
+        written = 0
+        for name, stats in self.sources.items():
+            if not stats.pending:
+                continue
+            delta, stats.pending = dict(stats.pending), Counter()
+            try:
+                await get_db().source_health.update_one(
+                    {"_id": f"{name}:{day}"},
+                    {"$inc": delta, "$set": {"source": name, "day": day, "updated_at": now, "expires_at": expires_at}},
+                    upsert=True,
+                )
+                written += 1
+            except Exception as e:
+                # Deltas conservés pour le prochain passage
+                stats.pending.update(delta)
+                logger.debug(f"Santé des sources (écriture) indisponible: {e}")
+        return written
+
+    async def _flush_loop(self):
+        interval = settings.source_health_flush_interval
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                count = await self.flush()
+                if count:
+                    logger.debug(f"🩺 Santé des sources enregistrée ({count} source(s))")
+            except Exception as e:
+                logger.warning(f"⚠️ Enregistrement de la santé des sources échoué: {e}")
+
+    def start_flusher(self):
+        if settings.source_health_flush_interval <= 0:
+            return
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+            logger.info("🩺 Enregistrement de la santé des sources démarré")
+
+    async def stop_flusher(self):
+        """Arrête la tâche de fond et écrit les derniers deltas."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.debug(f"Santé des sources (dernière écriture) échouée: {e}")
+
+
+# Instance globale
+_source_health: Optional[SourceHealthRegistry] = None
+
+
+def get_source_health() -> SourceHealthRegistry:
+    global _source_health
+    if _source_health is None:
+        from tools.http_client import install_status_observer
+
+        _source_health = SourceHealthRegistry()
+        install_status_observer(_observe_status)
+    return _source_health
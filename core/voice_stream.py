@@ -0,0 +1,181 @@
+"""
+Voix du recruteur en flux pour l'entretien simulé (WebSocket /api/interview/ws).
+
+Texte LLM en fragments → phrases complètes → synthèse phrase par phrase → trames audio envoyées au fil de l'eau.
+La première phrase est audible pendant que le LLM rédige encore la suite.
+
+Protocole (mode "binary", annoncé par le client dans le setup : audioMode = "binary") :
+- {"type": "chunk", "content": "<phrase> "}                    texte affiché au rythme de la voix
+- {"type": "voice_start", "utterance": u, "segment": n, "format": "audio/mpeg"}
+- trames binaires (MP3) du segment n
+- {"type": "voice_end", "utterance": u, "segment": n}
+- {"type": "voice_done", "utterance": u, "segments": total}
+Mode historique (par défaut) : un seul message {"type": "voice", "audio": <base64>} en fin de réponse.
+"""
+import asyncio
+import base64
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional
+
+from loguru import logger
+
+from config.settings import settings
+
+# Ponctuation de fin de phrase (guillemets/parenthèses fermants inclus) suivie d'un blanc
+_SENTENCE_END = re.compile(r"([.!?…]+[\"»)\]]*)\s+")
+# Abréviations courantes à l'oral qui ne terminent pas une phrase
+_ABBREVIATIONS = {"m", "mme", "mlle", "dr", "pr", "me", "etc", "ex", "cf", "p", "st", "vs", "env"}
+
+
+class SentenceChunker:
+    """Découpe un flux de fragments de texte en phrases complètes."""
+
+    def __init__(self, min_chars: Optional[int] = None):
+        self.min_chars = settings.interview_tts_min_chars if min_chars is None else min_chars
+        self.buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Ajoute un fragment ; retourne les phrases désormais complètes."""
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self.buffer):
+            before = self.buffer[start:match.start(1)].split()
+            if match.group(1) == "." and before and before[-1].lower() in _ABBREVIATIONS:
+                continue
+            candidate = self.buffer[start:match.end(1)].strip()
+            if len(candidate) < self.min_chars:
+                continue  # phrase trop courte : fusionnée avec la suivante (moins d'appels TTS)
+            sentences.append(candidate)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Reste du texte en fin de flux."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return rest or None
+
+
+class EdgeTTSEngine:
+    """Synthèse Microsoft Edge (edge-tts), MP3 en flux."""
+
+    def __init__(self, voice: str):
+        self.voice = voice
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        import edge_tts
+        async for chunk in edge_tts.Communicate(text, self.voice).stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+
+class FakeTTSEngine:
+    """Stand-in local (tests, dev hors ligne) : octets déterministes, aucun accès réseau."""
+
+    def __init__(self, voice: str = "fake", frame_size: int = 256, delay: float = 0.0):
+        self.voice = voice
+        self.frame_size = frame_size
+        self.delay = delay
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        data = f"[{self.voice}] {text}".encode("utf-8")
+        for offset in range(0, len(data), self.frame_size):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield data[offset:offset + self.frame_size]
+
+
+def get_tts_engine(voice: str):
+    """Moteur TTS configuré (settings.interview_tts_engine : edge ou fake)."""
+    if settings.interview_tts_engine.lower() == "fake":
+        return FakeTTSEngine(voice)
+    return EdgeTTSEngine(voice)
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+class VoiceStreamer:
+    """Enchaîne LLM en flux → phrases → TTS → WebSocket pour une connexion d'entretien."""
+
+    def __init__(
+        self,
+        send_json: Callable[[dict], Awaitable[None]],
+        send_bytes: Callable[[bytes], Awaitable[None]],
+        tts,
+        binary: bool = True,
+    ):
+        self.send_json = send_json
+        self.send_bytes = send_bytes
+        self.tts = tts
+        self.binary = binary
+        self.utterances = 0
+
+    async def speak(self, text: str) -> str:
+        """Texte déjà connu (accueil) : envoyé avec la même segmentation."""
+        return await self.speak_stream(_single(text), emit_text=False)
+
+    async def speak_stream(self, deltas: AsyncIterator[str], emit_text: bool = True) -> str:
+        """
+        Consomme les fragments LLM, pousse texte et audio phrase par phrase ; retourne le texte complet.
+        La synthèse d'une phrase tourne pendant que le LLM produit les suivantes.
+        """
+        self.utterances += 1
+        utterance = self.utterances
+        queue: asyncio.Queue = asyncio.Queue()
+        synth = asyncio.create_task(self._synthesize(utterance, queue))
+        chunker = SentenceChunker()
+        parts: List[str] = []
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                await self._enqueue(queue, chunker.feed(delta), emit_text)
+            rest = chunker.flush()
+            await self._enqueue(queue, [rest] if rest else [], emit_text)
+        finally:
+            queue.put_nowait(None)
+            try:
+                await synth
+            except Exception as e:
+                logger.error(f"TTS Error: {e}")
+        return "".join(parts).strip()
+
+    async def _enqueue(self, queue: asyncio.Queue, sentences: Iterable[str], emit_text: bool):
+        for sentence in sentences:
+            if emit_text:
+                await self.send_json({"type": "chunk", "content": sentence + " "})
+            queue.put_nowait(sentence)
+
+    async def _synthesize(self, utterance: int, queue: asyncio.Queue):
+        started = time.perf_counter()
+        first_audio_ms = None
+        legacy_audio: List[bytes] = []
+        segment = 0
+        while True:
+            sentence = await queue.get()
+            if sentence is None:
+                break
+            if self.binary:
+                await self.send_json({
+                    "type": "voice_start", "utterance": utterance, "segment": segment, "format": "audio/mpeg",
+                })
+            async for frame in self.tts.stream(sentence):
+                if first_audio_ms is None:
+                    first_audio_ms = (time.perf_counter() - started) * 1000
+                if self.binary:
+                    await self.send_bytes(frame)
+                else:
+                    legacy_audio.append(frame)
+            if self.binary:
+                await self.send_json({"type": "voice_end", "utterance": utterance, "segment": segment})
+            segment += 1
+
+        if self.binary:
+            await self.send_json({"type": "voice_done", "utterance": utterance, "segments": segment})
+        elif legacy_audio:
+            await self.send_json({"type": "voice", "audio": base64.b64encode(b"".join(legacy_audio)).decode("utf-8")})
+        if first_audio_ms is not None:
+            logger.debug(f"🔊 Réponse {utterance} : 1er audio {first_audio_ms:.0f} ms, {segment} segment(s)")
@@ -3,10 +3,61 @@ import aiohttp
 import json
 import traceback
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from loguru import logger
 
 from config.settings import settings
+from llm.rate_limiter import DEFAULT_PRIORITY, estimate_tokens, get_llm_governor
+
+
+# Pool HTTP partagé par tout le processus : chaque agent instancie son propre
+# GeminiClient, mais tous réutilisent les mêmes connexions TCP/TLS chaudes.
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_session_lock: Optional[asyncio.Lock] = None
+
+
+def _build_connector() -> aiohttp.TCPConnector:
+    """Connecteur keep-alive avec limites par hôte et cache DNS."""
+    return aiohttp.TCPConnector(
+        limit=settings.gemini_pool_size,
+        limit_per_host=settings.gemini_pool_per_host,
+        ttl_dns_cache=settings.gemini_dns_cache_ttl,
+        keepalive_timeout=settings.gemini_keepalive_timeout,
+        enable_cleanup_closed=True,
+    )
+
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """Retourne la session HTTP partagée (créée à la demande, une par event loop)."""
+    global _shared_session, _shared_session_loop, _session_lock
+    loop = asyncio.get_running_loop()
+    if _shared_session is not None and not _shared_session.closed and _shared_session_loop is loop:
+        return _shared_session
+    if _session_lock is None or _shared_session_loop is not loop:
+        _session_lock = asyncio.Lock()
+    async with _session_lock:
+        if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+            # Une session liée à un ancien event loop (scripts asyncio.run successifs) est abandonnée
+            _shared_session = aiohttp.ClientSession(connector=_build_connector())
+            _shared_session_loop = loop
+            logger.debug("🔌 Pool HTTP Gemini créé")
+    return _shared_session
+
+
+async def close_shared_session():
+    """Ferme le pool HTTP partagé (à appeler à l'arrêt de l'application)."""
+    global _shared_session, _shared_session_loop
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+        logger.info("🔌 Pool HTTP Gemini fermé")
+    _shared_session = None
+    _shared_session_loop = None
+
+
+class GeminiRateLimitError(Exception):
+    """Quota Gemini dépassé (429) après épuisement des tentatives."""
+
 
 class GeminiClient:
     """Client robuste pour interagir avec l'API Google Gemini nativement."""
@@ -65,47 +116,59 @@ class GeminiClient:
         logger.debug(f"DEBUG GEMINI URL: {url.replace(self.api_key, 'REDACTED')}")
         timeout = aiohttp.ClientTimeout(total=120) # Timeout à 120s pour les recherches Deep Pro
         
-        max_retries = 3
-        backoff = 1.0 # secondes
+        # Chaque tentative passe par le gouverneur : sur 429, la pause du modèle (backoff exponentiel) est partagée
+        # et la tentative suivante attend dans governor.slot, sans sleep local. Les appelants à débit adaptatif
+        # (Judge) passent max_retries=1 pour recevoir GeminiRateLimitError dès le premier 429.
+        governor = get_llm_governor()
+        priority = kwargs.get("priority") or DEFAULT_PRIORITY
+        est_tokens = estimate_tokens(prompt) + estimate_tokens(system) + min(kwargs.get("max_tokens") or 1024, 2048)
+        max_retries = kwargs.get("max_retries") or 3
+        backoff = 1.0 # secondes : base de la pause sur 429, attente entre tentatives sur 5xx
+        last_status = None
         
         for attempt in range(max_retries):
             try:
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.post(url, json=payload, ssl=False) as response:
-                        text = await response.text()
+                session = await get_shared_session()
+                async with governor.slot("gemini", model, est_tokens, priority) as ticket, \
+                        session.post(url, json=payload, ssl=False, timeout=timeout) as response:
+                    text = await response.text()
+                    last_status = response.status
+                    
+                    if response.status == 429:
+                        logger.warning(f"⚠️ Gemini Rate Limit (429). Tentative {attempt+1}/{max_retries}...")
+                        # Pause partagée du modèle : les autres appelants attendent aussi au lieu d'aggraver le 429
+                        governor.record_rate_limit("gemini", model, retry_after=backoff * (2 ** attempt))
+                        continue
                         
-                        if response.status == 429:
-                            logger.warning(f"⚠️ Gemini Rate Limit (429). Tentative {attempt+1}/{max_retries}...")
-                            await asyncio.sleep(backoff * (2 ** attempt))
-                            continue
-                            
-                        if response.status in [500, 502, 503, 504]:
-                            logger.warning(f"⚠️ Gemini Server Error ({response.status}). Tentative {attempt+1}/{max_retries}...")
-                            await asyncio.sleep(backoff * (attempt + 1))
-                            continue
-
-                        if response.status != 200:
-                            logger.error(f"❌ Gemini Error {response.status}: {text}")
-                            with open("gemini_error_body.json", "w", encoding="utf-8") as f:
-                                f.write(text)
-                            raise Exception(f"Erreur API Gemini {response.status}: {text[:200]}")
-                            
-                        data = json.loads(text)
-                        # Gemini 'thinking' models return a ThinkingPart before the text part
-                        # We must iterate all parts to find the actual text
-                        candidates = data.get("candidates", [])
-                        if not candidates:
-                            # Safety filter ou réponse vide
-                            logger.warning(f"⚠️ Gemini zéro candidats (Safety filter?) : {text[:300]}")
-                            return ""  # Retourner vide plutôt que crasher
-                        parts = candidates[0].get("content", {}).get("parts", [])
-                        text_response = ""
-                        for part in parts:
-                            if "text" in part and part["text"]:
-                                text_response = part["text"]
-                                break
-                        return text_response
+                    if response.status in [500, 502, 503, 504]:
+                        logger.warning(f"⚠️ Gemini Server Error ({response.status}). Tentative {attempt+1}/{max_retries}...")
+                        await asyncio.sleep(backoff * (attempt + 1))
+                        continue
+
+                    if response.status != 200:
+                        logger.error(f"❌ Gemini Error {response.status}: {text}")
+                        with open("gemini_error_body.json", "w", encoding="utf-8") as f:
+                            f.write(text)
+                        raise Exception(f"Erreur API Gemini {response.status}: {text[:200]}")
                         
+                    data = json.loads(text)
+                    if ticket:
+                        ticket.settle(data.get("usageMetadata", {}).get("totalTokenCount"))
+                    # Gemini 'thinking' models return a ThinkingPart before the text part
+                    # We must iterate all parts to find the actual text
+                    candidates = data.get("candidates", [])
+                    if not candidates:
+                        # Safety filter ou réponse vide
+                        logger.warning(f"⚠️ Gemini zéro candidats (Safety filter?) : {text[:300]}")
+                        return ""  # Retourner vide plutôt que crasher
+                    parts = candidates[0].get("content", {}).get("parts", [])
+                    text_response = ""
+                    for part in parts:
+                        if "text" in part and part["text"]:
+                            text_response = part["text"]
+                            break
+                    return text_response
+                    
             except Exception as e:
                 if attempt == max_retries - 1:
                     import traceback
@@ -117,6 +180,9 @@ class GeminiClient:
                 logger.debug(f"Gemini retryable error (attempt {attempt+1}): {e}")
                 await asyncio.sleep(backoff * (attempt + 1))
 
+        if last_status == 429:
+            raise GeminiRateLimitError(f"Gemini Rate Limit (429) persistant après {max_retries} tentatives")
+        return None
 
 
     async def generate_with_sources(self, prompt: str, system: str = None, **kwargs) -> tuple:
@@ -148,75 +214,82 @@ class GeminiClient:
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={self.api_key}"
         timeout = aiohttp.ClientTimeout(total=180) # 180s pour la fusion Search + JSON (CGI, etc.)
         
+        governor = get_llm_governor()
+        est_tokens = estimate_tokens(prompt) + estimate_tokens(system) + min(kwargs.get("max_tokens") or 1024, 2048)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(url, json=payload, ssl=False) as response:
-                    text = await response.text()
-                    
-                    if response.status != 200:
-                        logger.error(f"❌ Gemini Grounding Error {response.status}: {text[:500]}")
-                        # On dump pour analyse car le grounding est complexe
-                        with open("gemini_grounding_fail.json", "w", encoding="utf-8") as f:
-                            f.write(text)
-                        raise Exception(f"API Error {response.status}")
+            session = await get_shared_session()
+            async with governor.slot("gemini", model, est_tokens, kwargs.get("priority") or DEFAULT_PRIORITY), \
+                    session.post(url, json=payload, ssl=False, timeout=timeout) as response:
+                text = await response.text()
+                
+                if response.status == 429:
+                    governor.record_rate_limit("gemini", model)
+                if response.status != 200:
+                    logger.error(f"❌ Gemini Grounding Error {response.status}: {text[:500]}")
+                    # On dump pour analyse car le grounding est complexe
+                    with open("gemini_grounding_fail.json", "w", encoding="utf-8") as f:
+                        f.write(text)
+                    raise Exception(f"API Error {response.status}")
 
-                    try:
-                        data = json.loads(text)
-                    except Exception as je:
-                        logger.error(f"❌ JSON Parse Error in Grounding: {str(je)[:100]}")
-                        raise je
-                    
-                    # Extraction du texte
-                    text_out = ""
-                    try: 
-                        if "candidates" in data:
-                            text_out = data["candidates"][0]["content"]["parts"][0]["text"]
-                        else:
-                            # Gérer les safety filters ou blocages
-                            logger.warning(f"⚠️ Aucun candidat Gemini (Safety filter ?): {text[:200]}")
-                            return "Aucun résultat trouvé (bloqué ou filtré).", []
-                    except: pass
-
-
-                    # Extraction OSINT des sources
-                    source_urls = []
-                    try:
-                        grounding = data["candidates"][0].get("groundingMetadata", {})
-                        if grounding:
-                            # Debug dump si besoin pour analyse des 404
-                            try:
-                                with open("grounding_metadata_debug.json", "w", encoding="utf-8") as f:
-                                    json.dump(grounding, f, indent=2)
-                            except: pass
-                                
-                        # On ratisse large pour ne rater aucune URL LinkedIn
-                        for chunk in grounding.get("groundingChunks", []):
-                            uri = chunk.get("web", {}).get("uri")
-                            if uri and uri not in source_urls: source_urls.append(uri)
-
-                        logger.debug(f"🔍 Gemini Client extracted {len(source_urls)} source URIs.")
+                try:
+                    data = json.loads(text)
+                except Exception as je:
+                    logger.error(f"❌ JSON Parse Error in Grounding: {str(je)[:100]}")
+                    raise je
+                
+                # Extraction du texte
+                text_out = ""
+                try: 
+                    if "candidates" in data:
+                        text_out = data["candidates"][0]["content"]["parts"][0]["text"]
+                    else:
+                        # Gérer les safety filters ou blocages
+                        logger.warning(f"⚠️ Aucun candidat Gemini (Safety filter ?): {text[:200]}")
+                        return "Aucun résultat trouvé (bloqué ou filtré).", []
+                except: pass
 
 
-                        
-                        for sup in grounding.get("groundingSupport", []):
-                            u = sup.get("segment", {}).get("uri") or sup.get("web", {}).get("uri")
-                            if u and u not in source_urls: source_urls.append(u)
-                    except: pass
+                # Extraction OSINT des sources
+                source_urls = []
+                try:
+                    grounding = data["candidates"][0].get("groundingMetadata", {})
+                    if grounding:
+                        # Debug dump si besoin pour analyse des 404
+                        try:
+                            with open("grounding_metadata_debug.json", "w", encoding="utf-8") as f:
+                                json.dump(grounding, f, indent=2)
+                        except: pass
+                            
+                    # On ratisse large pour ne rater aucune URL LinkedIn
+                    for chunk in grounding.get("groundingChunks", []):
+                        uri = chunk.get("web", {}).get("uri")
+                        if uri and uri not in source_urls: source_urls.append(uri)
+
+                    logger.debug(f"🔍 Gemini Client extracted {len(source_urls)} source URIs.")
+
+
+                    
+                    for sup in grounding.get("groundingSupport", []):
+                        u = sup.get("segment", {}).get("uri") or sup.get("web", {}).get("uri")
+                        if u and u not in source_urls: source_urls.append(u)
+                except: pass
 
-                    return text_out, source_urls
+                return text_out, source_urls
         except Exception as e:
             logger.error(f"Gemini Grounding error ({type(e).__name__}): {e}")
             raise e
 
 
-    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
-        """Simulation mode chat. Supports model, max_tokens, temperature for faster/short replies."""
-        model = kwargs.get("model", self.default_model)
+    @staticmethod
+    def _chat_payload(messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
         contents = [{"role": "user" if m["role"] == "user" else "model", "parts": [{"text": m["content"]}]} for m in messages if m["role"] != "system"]
         system_text = next((m["content"] for m in messages if m["role"] == "system"), None)
         
         payload = {"contents": contents}
-        if system_text:
+        if kwargs.get("cached_content"):
+            # Prompt système déjà dans le contexte mis en cache (create_cached_content)
+            payload["cachedContent"] = kwargs["cached_content"]
+        elif system_text:
             payload["systemInstruction"] = {"parts": [{"text": system_text}]}
         gen_config = {}
         if kwargs.get("max_tokens") is not None:
@@ -227,33 +300,125 @@ class GeminiClient:
             gen_config["responseMimeType"] = "application/json"
         if gen_config:
             payload["generationConfig"] = gen_config
+        return payload
+
+    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Simulation mode chat. Supports model, max_tokens, temperature for faster/short replies."""
+        model = kwargs.get("model", self.default_model)
+        payload = self._chat_payload(messages, kwargs)
 
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={self.api_key}"
         timeout_sec = kwargs.get("timeout") or 45
         timeout = aiohttp.ClientTimeout(total=timeout_sec)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, json=payload) as response:
+        governor = get_llm_governor()
+        est_tokens = sum(estimate_tokens(m["content"]) for m in messages) + min(kwargs.get("max_tokens") or 1024, 2048)
+        session = await get_shared_session()
+        async with governor.slot("gemini", model, est_tokens, kwargs.get("priority") or DEFAULT_PRIORITY) as ticket, \
+                session.post(url, json=payload, timeout=timeout) as response:
+            if response.status == 429:
+                governor.record_rate_limit("gemini", model)
+            if response.status != 200:
+                err_text = await response.text()
+                logger.error(f"Gemini API Error {response.status}: {err_text}")
+                raise Exception(f"Gemini API HTTP {response.status}")
+            data = await response.json()
+            if ticket:
+                ticket.settle(data.get("usageMetadata", {}).get("totalTokenCount"))
+            try:
+                candidates = data.get("candidates", [])
+                if not candidates:
+                    logger.error(f"Erreur de parsing Gemini: zéro candidats - {data}")
+                    raise Exception("Format de réponse Gemini inattendu: pas de candidats")
+                # Thinking models: last part with "text" is the actual reply (first can be thought)
+                parts = candidates[0].get("content", {}).get("parts", [])
+                text_out = ""
+                for part in parts:
+                    if "text" in part and part["text"]:
+                        text_out = part["text"]
+                if text_out:
+                    return text_out
+                raise Exception("Aucun texte dans la réponse Gemini")
+            except KeyError:
+                logger.error(f"Erreur de parsing Gemini: {data}")
+                raise Exception("Format de réponse Gemini inattendu")
+
+    async def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """
+        Mode chat en flux (streamGenerateContent, SSE) : produit les fragments de texte dès leur arrivée.
+        Les parties "thought" des modèles thinking sont ignorées.
+        """
+        model = kwargs.get("model") or self.default_model
+        payload = self._chat_payload(messages, kwargs)
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse&key={self.api_key}"
+        timeout_sec = kwargs.get("timeout") or 45
+        # sock_read : un flux qui se fige est coupé sans attendre le timeout total
+        timeout = aiohttp.ClientTimeout(total=timeout_sec, sock_read=min(timeout_sec, 20))
+        governor = get_llm_governor()
+        est_tokens = sum(estimate_tokens(m["content"]) for m in messages) + min(kwargs.get("max_tokens") or 1024, 2048)
+        session = await get_shared_session()
+        async with governor.slot("gemini", model, est_tokens, kwargs.get("priority") or DEFAULT_PRIORITY) as ticket, \
+                session.post(url, json=payload, timeout=timeout) as response:
+            if response.status == 429:
+                # Pause partagée du modèle, et erreur typée : l'appelant bascule sur un autre fournisseur
+                governor.record_rate_limit("gemini", model)
+                logger.warning("⚠️ Gemini Rate Limit (429) sur le flux de chat")
+                raise GeminiRateLimitError("Gemini Rate Limit (429) sur streamGenerateContent")
+            if response.status != 200:
+                err_text = await response.text()
+                logger.error(f"Gemini API Error {response.status}: {err_text}")
+                raise Exception(f"Gemini API HTTP {response.status}")
+            total_tokens = None
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    data = json.loads(line[5:])
+                except json.JSONDecodeError:
+                    logger.debug(f"Fragment SSE Gemini illisible: {line[:120]}")
+                    continue
+                total_tokens = data.get("usageMetadata", {}).get("totalTokenCount") or total_tokens
+                for candidate in data.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text") and not part.get("thought"):
+                            yield part["text"]
+            if ticket:
+                ticket.settle(total_tokens)
+
+    async def create_cached_content(self, system: str, model: Optional[str] = None, ttl_seconds: int = 1800) -> Optional[str]:
+        """
+        Met un prompt système en cache côté Gemini (cachedContents) ; retourne son nom, ou None si refusé
+        (prompt sous le minimum de tokens du modèle, modèle non éligible...) : l'appelant renvoie alors le système à chaque tour.
+        """
+        model = model or self.default_model
+        url = f"https://generativelanguage.googleapis.com/v1beta/cachedContents?key={self.api_key}"
+        payload = {
+            "model": f"models/{model}",
+            "systemInstruction": {"parts": [{"text": system}]},
+            "ttl": f"{int(ttl_seconds)}s",
+        }
+        try:
+            session = await get_shared_session()
+            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=15)) as response:
                 if response.status != 200:
-                    err_text = await response.text()
-                    logger.error(f"Gemini API Error {response.status}: {err_text}")
-                    raise Exception(f"Gemini API HTTP {response.status}")
+                    logger.debug(f"Contexte Gemini non mis en cache ({response.status}): {(await response.text())[:200]}")
+                    return None
                 data = await response.json()
-                try:
-                    candidates = data.get("candidates", [])
-                    if not candidates:
-                        logger.error(f"Erreur de parsing Gemini: zéro candidats - {data}")
-                        raise Exception("Format de réponse Gemini inattendu: pas de candidats")
-                    # Thinking models: last part with "text" is the actual reply (first can be thought)
-                    parts = candidates[0].get("content", {}).get("parts", [])
-                    text_out = ""
-                    for part in parts:
-                        if "text" in part and part["text"]:
-                            text_out = part["text"]
-                    if text_out:
-                        return text_out
-                    raise Exception("Aucun texte dans la réponse Gemini")
-                except KeyError:
-                    logger.error(f"Erreur de parsing Gemini: {data}")
-                    raise Exception("Format de réponse Gemini inattendu")
-
-    async def close(self): pass
+                logger.debug(f"🧊 Contexte Gemini en cache: {data.get('name')}")
+                return data.get("name")
+        except Exception as e:
+            logger.debug(f"Contexte Gemini non mis en cache: {e}")
+            return None
+
+    async def delete_cached_content(self, name: str):
+        url = f"https://generativelanguage.googleapis.com/v1beta/{name}?key={self.api_key}"
+        try:
+            session = await get_shared_session()
+            async with session.delete(url, timeout=aiohttp.ClientTimeout(total=10)):
+                pass
+        except Exception as e:
+            logger.debug(f"Suppression du contexte Gemini {name} échouée (expirera seul): {e}")
+
+    async def close(self):
+        """Le pool HTTP est partagé par tout le processus : il est fermé par close_shared_session()."""
+        pass
@@ -0,0 +1,250 @@
+"""
+Gouverneur global des appels LLM sortants (un par processus).
+
+Chaque couloir "fournisseur:modèle" a :
+- un seau de requêtes (RPM) et un seau de tokens (TPM) à remplissage continu
+- une limite de requêtes simultanées
+- une file d'attente à priorités : interactive (entretien) > chat > batch (Judge)
+Un 429 met le couloir en pause pour tous les appelants au lieu de laisser chacun réessayer de son côté.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from config.settings import settings
+
+# Approximation suffisante pour Gemini sur du texte FR/EN (pas de tokenizer local)
+CHARS_PER_TOKEN = 4
+
+PRIORITIES = {"interactive": 0, "chat": 1, "batch": 2}
+DEFAULT_PRIORITY = "chat"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens d'un texte."""
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+@dataclass(frozen=True)
+class ModelQuota:
+    rpm: int
+    tpm: int
+    concurrency: int
+
+
+# Quotas par couloir (sous les limites Google du palier payant 1, pour garder de la marge)
+MODEL_QUOTAS = {
+    "gemini:gemini-2.0-flash": ModelQuota(rpm=1800, tpm=3_500_000, concurrency=40),
+    "gemini:gemini-2.5-flash": ModelQuota(rpm=900, tpm=900_000, concurrency=30),
+    "gemini:gemini-2.5-pro": ModelQuota(rpm=140, tpm=1_800_000, concurrency=12),
+    "gemini:gemini-3.1-pro-preview": ModelQuota(rpm=140, tpm=1_800_000, concurrency=12),
+}
+# Valeurs par défaut par fournisseur pour les modèles non listés
+PROVIDER_QUOTAS = {
+    "gemini": ModelQuota(rpm=300, tpm=1_000_000, concurrency=20),
+    "openrouter": ModelQuota(rpm=200, tpm=1_000_000, concurrency=10),
+    "ollama": ModelQuota(rpm=10_000, tpm=100_000_000, concurrency=2),
+}
+
+
+class TokenBucket:
+    """Seau à remplissage continu ; peut passer en négatif (dette) après correction par l'usage réel."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Secondes avant que `amount` soit disponible (0 si disponible tout de suite)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def drain(self):
+        self._refill()
+        self.level = min(self.level, 0.0)
+
+
+class LLMTicket:
+    """Autorisation d'appel délivrée par le gouverneur."""
+
+    def __init__(self, lane: "_Lane", tokens: int, priority: str):
+        self.lane = lane
+        self.tokens = tokens
+        self.priority = priority
+        self._released = False
+
+    def settle(self, actual_tokens: Optional[int]):
+        """Corrige le seau TPM avec l'usage réel renvoyé par le fournisseur (usageMetadata)."""
+        if actual_tokens:
+            self.lane.tokens.consume(actual_tokens - self.tokens)
+            self.tokens = actual_tokens
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.lane.in_flight -= 1
+            self.lane.pump()
+
+
+class _Lane:
+    def __init__(self, name: str, quota: ModelQuota):
+        self.name = name
+        self.quota = quota
+        self.requests = TokenBucket(quota.rpm)
+        self.tokens = TokenBucket(quota.tpm)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._waiters: list = []  # heap de (priorité, ordre d'arrivée, tokens, futur)
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.metrics: Dict[str, Any] = {
+            "granted": 0, "rate_limited": 0, "wait_total": 0.0, "wait_max": 0.0,
+            "granted_by_priority": {p: 0 for p in PRIORITIES},
+        }
+
+    def enqueue(self, priority: str, tokens: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._seq), tokens, future))
+        self.pump()
+        return future
+
+    def pump(self):
+        """Délivre les autorisations dans l'ordre de priorité tant que les quotas le permettent."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                # Appelant annulé (client déconnecté) : on l'oublie
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= self.quota.concurrency:
+                return  # release() relancera la pompe
+            delay = max(
+                self.paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens),
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self.pump)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def queued(self) -> Dict[str, int]:
+        counts = {p: 0 for p in PRIORITIES}
+        names = {v: k for k, v in PRIORITIES.items()}
+        for prio, _, _, future in self._waiters:
+            if not future.done():
+                counts[names[prio]] += 1
+        return counts
+
+
+class LLMGovernor:
+    """Point de passage unique des appels LLM du processus."""
+
+    def __init__(self):
+        self._lanes: Dict[str, _Lane] = {}
+
+    def _lane(self, provider: str, model: str) -> _Lane:
+        name = f"{provider}:{model}"
+        lane = self._lanes.get(name)
+        if lane is None:
+            quota = MODEL_QUOTAS.get(name) or PROVIDER_QUOTAS.get(provider) or PROVIDER_QUOTAS["gemini"]
+            lane = _Lane(name, quota)
+            self._lanes[name] = lane
+        return lane
+
+    async def acquire(self, provider: str, model: str, tokens: int, priority: str = DEFAULT_PRIORITY) -> LLMTicket:
+        """Attend son tour dans la file du couloir puis retourne un ticket (à libérer)."""
+        if priority not in PRIORITIES:
+            priority = DEFAULT_PRIORITY
+        lane = self._lane(provider, model)
+        started = time.monotonic()
+        future = lane.enqueue(priority, tokens)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Autorisation délivrée au moment de l'annulation : on rend le slot
+                lane.in_flight -= 1
+                lane.pump()
+            raise
+        waited = time.monotonic() - started
+        lane.metrics["granted"] += 1
+        lane.metrics["granted_by_priority"][priority] += 1
+        lane.metrics["wait_total"] += waited
+        lane.metrics["wait_max"] = max(lane.metrics["wait_max"], waited)
+        if waited > 5:
+            logger.debug(f"⏳ LLM {lane.name} ({priority}) : {waited:.1f}s d'attente dans la file")
+        return LLMTicket(lane, tokens, priority)
+
+    @asynccontextmanager
+    async def slot(self, provider: str, model: str, tokens: int, priority: str = DEFAULT_PRIORITY):
+        if not settings.llm_governor_enabled:
+            yield None
+            return
+        ticket = await self.acquire(provider, model, tokens, priority)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def record_rate_limit(self, provider: str, model: str, retry_after: Optional[float] = None):
+        """429 reçu : pause du couloir pour tout le monde et vidage du seau de requêtes."""
+        lane = self._lane(provider, model)
+        lane.metrics["rate_limited"] += 1
+        pause = retry_after if retry_after is not None else settings.llm_rate_limit_pause
+        lane.paused_until = max(lane.paused_until, time.monotonic() + pause)
+        lane.requests.drain()
+        logger.warning(f"🚦 {lane.name} en pause {pause:.1f}s (429)")
+
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for name, lane in self._lanes.items():
+            m = lane.metrics
+            result[name] = {
+                "in_flight": lane.in_flight,
+                "queued": lane.queued(),
+                "granted": m["granted"],
+                "granted_by_priority": dict(m["granted_by_priority"]),
+                "rate_limited": m["rate_limited"],
+                "avg_wait": round(m["wait_total"] / m["granted"], 3) if m["granted"] else 0.0,
+                "max_wait": round(m["wait_max"], 3),
+            }
+        return result
+
+
+# Instance globale
+_llm_governor: Optional[LLMGovernor] = None
+
+
+def get_llm_governor() -> LLMGovernor:
+    global _llm_governor
+    if _llm_governor is None:
+        _llm_governor = LLMGovernor()
+    return _llm_governor
@@ -0,0 +1,235 @@
+"""Cache des réponses LLM adressé par contenu (hash de la requête normalisée).
+
+Trois backends interchangeables :
+- "memory" : LRU en RAM borné en octets (par défaut)
+- "sqlite" : fichier local dans storage/ (survit aux redémarrages)
+- "redis"  : partagé entre workers (si settings.redis_enabled et le paquet redis est installé)
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from config.settings import settings
+
+
+class MemoryLRUBackend:
+    """LRU en mémoire, borné par un budget en octets, avec expiration par entrée."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, size = entry
+        if expires_at < time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int):
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.time() + ttl, size)
+        self.current_bytes += size
+        # Éviction des entrées les moins récemment utilisées jusqu'à respecter le budget
+        while self.current_bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    async def delete(self, key: str):
+        self._remove(key)
+
+    async def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self.current_bytes -= entry[2]
+
+
+class SQLiteBackend:
+    """Cache persistant sur disque (SQLite), accès déporté dans un thread."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.path), timeout=5)
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        if row[1] < time.time():
+            self._delete_sync(key)
+            return None
+        return row[0]
+
+    def _set_sync(self, key: str, value: str, ttl: int):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl),
+            )
+            # Purge opportuniste des entrées expirées
+            conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+
+    def _delete_sync(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get_sync, key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await asyncio.to_thread(self._set_sync, key, value, ttl)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete_sync, key)
+
+    async def clear(self):
+        def _clear():
+            with self._connect() as conn:
+                conn.execute("DELETE FROM llm_cache")
+        await asyncio.to_thread(_clear)
+
+
+class RedisBackend:
+    """Cache partagé entre workers via Redis (TTL natif)."""
+
+    def __init__(self, prefix: str = "llmcache:"):
+        import redis.asyncio as aioredis
+        self.prefix = prefix
+        self.client = aioredis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            decode_responses=True,
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self):
+        async for k in self.client.scan_iter(match=f"{self.prefix}*"):
+            await self.client.delete(k)
+
+
+def build_backend(kind: str, namespace: str = "llm"):
+    """Construit un backend de cache ; bascule sur la mémoire si le backend demandé est indisponible."""
+    kind = (kind or "memory").lower()
+    try:
+        if kind == "sqlite":
+            path = settings.llm_cache_sqlite_path
+            if namespace != "llm":
+                path = path.with_name(f"{namespace}_cache.db")
+            return SQLiteBackend(path)
+        if kind == "redis":
+            if not settings.redis_enabled:
+                raise RuntimeError("Redis désactivé (REDIS_ENABLED=false)")
+            return RedisBackend(prefix=f"{namespace}cache:")
+    except Exception as e:
+        logger.warning(f"⚠️ Backend de cache '{kind}' indisponible ({e}), bascule sur la mémoire.")
+    return MemoryLRUBackend(settings.llm_cache_max_bytes)
+
+
+class ResponseCache:
+    """Cache de réponses avec compteurs hit/miss. Les erreurs de backend ne bloquent jamais l'appel LLM."""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(prompt: str, **params: Any) -> str:
+        """Hash SHA-256 de la requête normalisée (prompt + paramètres déterminants)."""
+        normalized_prompt = "\n".join(line.rstrip() for line in (prompt or "").strip().splitlines())
+        clean_params = {k: v for k, v in params.items() if v is not None}
+        if isinstance(clean_params.get("system"), str):
+            clean_params["system"] = clean_params["system"].strip()
+        raw = json.dumps({"prompt": normalized_prompt, **clean_params}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Cache LLM (lecture) indisponible: {e}")
+            return None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        if not value:
+            return
+        try:
+            await self.backend.set(key, value, ttl or self.ttl)
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Cache LLM (écriture) indisponible: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+# Instance globale (partagée par tous les UnifiedLLMClient du processus)
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Retourne le cache global, ou None si désactivé (LLM_CACHE_BACKEND=none)."""
+    global _response_cache
+    if settings.llm_cache_backend.lower() == "none":
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(build_backend(settings.llm_cache_backend), settings.llm_cache_ttl)
+        logger.info(f"🗃️ Cache LLM activé ({_response_cache.stats()['backend']}, TTL {settings.llm_cache_ttl}s)")
+    return _response_cache
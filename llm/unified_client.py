@@ -1,10 +1,13 @@
 """Client Unifié pour la gestion des modèles LLM (Priorité Strict Gemini)."""
 import asyncio
-from typing import Optional, Dict, List, Any
+from typing import AsyncIterator, Optional, Dict, List, Any
 from loguru import logger
 
+from llm.gemini_client import GeminiRateLimitError
 from llm.ollama_client import OllamaClient
 from llm.openrouter_client import OpenRouterClient
+from llm.rate_limiter import DEFAULT_PRIORITY, estimate_tokens, get_llm_governor
+from llm.response_cache import ResponseCache, get_response_cache
 from config.settings import settings
 
 
@@ -28,6 +31,8 @@ class UnifiedLLMClient:
             logger.info("🌐 Client Unifié: OpenRouter activé")
         else:
             logger.info("🏠 Client Unifié: Mode Local uniquement (Ollama)")
+
+        self.response_cache = get_response_cache()
             
     async def initialize(self):
         pass
@@ -39,9 +44,55 @@ class UnifiedLLMClient:
         if self.gemini_client:
             await self.gemini_client.close()
 
-    async def generate(self, prompt: str, **kwargs) -> str:
-        """Génère une réponse. Priorité exclusive à Gemini si configuré."""
+    def _provider_name(self) -> str:
+        if self.gemini_client:
+            return "gemini"
+        if self.openrouter_client:
+            return "openrouter"
+        return "ollama"
+
+    async def generate(self, prompt: str, use_cache: Optional[bool] = None, **kwargs) -> str:
+        """
+        Génère une réponse. Priorité exclusive à Gemini si configuré.
+        
+        Les réponses sont mises en cache par hash de (prompt, system, modèle, température,
+        json_mode, max_tokens). Par défaut seuls les appels déterministes (temperature=0) ou en
+        json_mode sont mis en cache : un appel échantillonné doit pouvoir varier d'une fois à l'autre.
+        use_cache=True force la mise en cache, use_cache=False l'interdit.
+        """
+        if use_cache is None:
+            use_cache = kwargs.get("temperature") == 0 or bool(kwargs.get("json_mode"))
+        cache = self.response_cache
+        # Les requêtes multimodales ou avec outils ne sont jamais mises en cache
+        if not use_cache or kwargs.get("image_data") or kwargs.get("tools"):
+            cache = None
+
+        cache_key = None
+        if cache:
+            cache_key = ResponseCache.make_key(
+                prompt,
+                provider=self._provider_name(),
+                model=kwargs.get("model"),
+                system=kwargs.get("system"),
+                temperature=kwargs.get("temperature"),
+                json_mode=bool(kwargs.get("json_mode")),
+                max_tokens=kwargs.get("max_tokens"),
+            )
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"🗃️ Cache LLM hit ({cache_key[:12]})")
+                return cached
+
+        response = await self._generate_uncached(prompt, **kwargs)
+        if cache and response:
+            await cache.set(cache_key, response)
+        return response
+
+    async def _generate_uncached(self, prompt: str, **kwargs) -> str:
         requested_model = kwargs.pop("model", None)
+        # Option propre à Gemini (nombre de tentatives sur 429) : ne pas la transmettre aux autres clients
+        max_retries = kwargs.pop("max_retries", None)
+        priority = kwargs.pop("priority", None) or DEFAULT_PRIORITY
         # Remove None values so concrete clients use their defaults
         clean_kwargs = {k: v for k, v in kwargs.items() if v is not None}
 
@@ -51,7 +102,13 @@ class UnifiedLLMClient:
                 # Si requested_model est None, on ne le passe pas
                 if requested_model:
                     clean_kwargs["model"] = requested_model
+                if max_retries:
+                    clean_kwargs["max_retries"] = max_retries
+                clean_kwargs["priority"] = priority
                 return await self.gemini_client.generate(prompt, **clean_kwargs)
+            except GeminiRateLimitError:
+                # Propagé tel quel : les appelants à débit adaptatif réduisent leur concurrence
+                raise
             except Exception as e:
                 logger.error(f"❌ échec Critique Gemini (Fallback Impossible): {e}")
                 raise Exception(f"Désolé, une erreur technique sur Gemini empêche de garantir la précision à 100%. Fallback Ollama désactivé. Erreur: {e}")
@@ -60,13 +117,15 @@ class UnifiedLLMClient:
         if self.openrouter_client:
             try:
                 model = requested_model or settings.openrouter_default_model
-                return await self.openrouter_client.generate(prompt, model=model, **kwargs)
+                async with get_llm_governor().slot("openrouter", model, estimate_tokens(prompt), priority):
+                    return await self.openrouter_client.generate(prompt, model=model, **kwargs)
             except Exception as e:
                 logger.warning(f"⚠️ Échec OpenRouter ({e})... Bascule sur Ollama Local.")
         
         try:
             model = settings.ollama_default_model
-            return await self.ollama_client.generate(prompt, model=model, **kwargs)
+            async with get_llm_governor().slot("ollama", model, estimate_tokens(prompt), priority):
+                return await self.ollama_client.generate(prompt, model=model, **kwargs)
         except Exception as e:
             logger.error(f"❌ Échec Critique LLM: {e}")
             raise e
@@ -92,13 +151,35 @@ class UnifiedLLMClient:
                 logger.error(f"❌ Échec Gemini Chat: {e}")
                 raise e
 
+        return await self._chat_without_gemini(messages, **kwargs)
+
+    async def _chat_without_gemini(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        """Chat via OpenRouter puis Ollama local, sous le gouverneur de débit comme generate."""
+        priority = kwargs.pop("priority", None) or DEFAULT_PRIORITY
+        # Option propre à Gemini : Ollama la passerait telle quelle dans "options"
+        kwargs.pop("cached_content", None)
+        requested_model = kwargs.pop("model", None)
+        est_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+
         if self.openrouter_client:
             try:
-                model = kwargs.get("model") or settings.openrouter_default_model
+                model = requested_model or settings.openrouter_default_model
                 # Simplification logic
                 conv = "\n".join([f"{m['role']}: {m['content']}" for m in messages])
-                return await self.openrouter_client.generate(conv, model=model)
+                async with get_llm_governor().slot("openrouter", model, est_tokens, priority):
+                    return await self.openrouter_client.generate(conv, model=model)
             except Exception as e:
-                pass
+                logger.warning(f"⚠️ Échec OpenRouter Chat ({e})... Bascule sur Ollama Local.")
+
+        model = settings.ollama_default_model
+        async with get_llm_governor().slot("ollama", model, est_tokens, priority):
+            return await self.ollama_client.chat(messages, model=model, **kwargs)
 
-        return await self.ollama_client.chat(messages, **kwargs)
+    async def stream_chat(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """Chat en flux (fragments de texte). Sans Gemini : la réponse complète arrive en un seul fragment."""
+        if self.gemini_client:
+            # Pas de bascule (SNIPER 6.0) : GeminiRateLimitError et les autres erreurs remontent à l'appelant
+            async for delta in self.gemini_client.stream_chat(messages, **kwargs):
+                yield delta
+            return
+        yield await self._chat_without_gemini(messages, **kwargs)
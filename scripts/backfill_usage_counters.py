@@ -0,0 +1,50 @@
+import asyncio
+import sys
+import os
+
+# Add the project root to sys.path to import core.database
+sys.path.append(os.getcwd())
+
+from core.database import get_db
+from api.subscription import period_bucket
+
+async def backfill():
+    """
+    Initialise usage_counters (quotas atomiques) depuis l'ancienne collection usage_logs
+    pour le jour, le mois et le total en cours. Idempotent ($max) : à lancer au déploiement.
+    """
+    db = get_db()
+    day_bucket, day_expires = period_bucket("day")
+    month_bucket, month_expires = period_bucket("month")
+    day_str = day_bucket[2:]
+    month_str = month_bucket[2:]
+
+    pipeline = [{"$group": {
+        "_id": {"user_id": "$user_id", "feature": "$feature"},
+        "total": {"$sum": "$count"},
+        "month": {"$sum": {"$cond": [{"$eq": [{"$substrCP": ["$used_at", 0, 7]}, month_str]}, "$count", 0]}},
+        "day": {"$sum": {"$cond": [{"$eq": ["$used_at", day_str]}, "$count", 0]}},
+    }}]
+    written = 0
+    async for row in db.usage_logs.aggregate(pipeline):
+        user_id, feature = row["_id"]["user_id"], row["_id"]["feature"]
+        for bucket, expires_at, count in (
+            (day_bucket, day_expires, row["day"]),
+            (month_bucket, month_expires, row["month"]),
+            ("total", None, row["total"]),
+        ):
+            if not count:
+                continue
+            await db.usage_counters.update_one(
+                {"_id": f"{user_id}:{feature}:{bucket}"},
+                {
+                    "$max": {"count": count},
+                    "$setOnInsert": {"user_id": user_id, "feature": feature, "bucket": bucket, "expires_at": expires_at},
+                },
+                upsert=True,
+            )
+            written += 1
+    print(f"SUCCÈS : {written} compteur(s) de quota initialisé(s) depuis usage_logs.")
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
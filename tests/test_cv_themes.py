@@ -59,5 +59,32 @@ def test_all_themes():
         except Exception as e:
             print(f"  Error: Failed to generate theme {theme_id}: {e}")
 
+def test_theme_bundles_are_shared():
+    """Le bundle d'un thème est construit une seule fois et réutilisé par chaque rendu."""
+    from core import cv_ats_generator, cv_pdf_generator
+
+    generators = [
+        (cv_ats_generator, cv_ats_generator.generate_ats_cv_pdf),
+        (cv_pdf_generator, generate_cv_pdf),
+    ]
+    for module, generate in generators:
+        registry = module.theme_registry
+        for theme_id in module.THEMES:
+            bundle = registry.get(theme_id)
+            pdf_bytes = generate(sample_cv_data, theme_id=theme_id)
+            assert pdf_bytes.startswith(b"%PDF")
+            assert registry.get(theme_id) is bundle
+
+def test_theme_render_benchmark():
+    """Micro-benchmark par thème (build vs lecture du registre vs rendu) : rapport seul, sans seuil de temps."""
+    from benchmarks import theme_bench
+
+    report = theme_bench.run(runs=3, cv_data=sample_cv_data)
+    theme_bench.print_report(report)
+    from core import cv_ats_generator, cv_pdf_generator
+    assert len(report["results"]) == len(cv_ats_generator.THEMES) + len(cv_pdf_generator.THEMES)
+
 if __name__ == "__main__":
     test_all_themes()
+    test_theme_bundles_are_shared()
+    test_theme_render_benchmark()
@@ -0,0 +1,47 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.gazetteer import cities_in, country_of, get_gazetteer, resolve_location
+
+
+def test_resolve_structured_place():
+    place = resolve_location("Montréal, Québec")
+    assert (place.key, place.country, place.zone) == ("montreal", "canada", "americas")
+    # Le qualificatif le plus à droite fixe le pays
+    assert resolve_location("Paris, TX").key == "texas"
+    assert resolve_location("Califormie").name == "California, USA"
+    assert resolve_location("Tokyo") is None
+
+
+def test_country_detection_and_exact_lookup():
+    assert country_of("Yaoundé, Cameroun") == "cameroun"
+    assert country_of("Amsterdam") == "pays-bas"
+    assert country_of("Tokyo") == "france"
+    gazetteer = get_gazetteer()
+    assert gazetteer.lookup("new-york").name == "New York, USA"
+    assert gazetteer.lookup("Paris, France") is None
+
+
+def test_target_covers_cities():
+    montreal = resolve_location("Montreal, QC, Canada")
+    assert montreal.covers(cities_in("laval, qc")[0])
+    assert not montreal.covers(cities_in("toronto, on")[0])
+    quebec = resolve_location("Quebec, QC, Canada")
+    assert quebec.key == "quebec" and not quebec.covers(cities_in("ottawa")[0])
+    assert resolve_location("France").covers(cities_in("Lyon 3e")[0])
+
+
+def test_region_target_excludes_cities_of_other_regions():
+    quebec = resolve_location("Québec")
+    assert quebec.kind == "region"
+    assert quebec.covers(cities_in("Laval, QC")[0])
+    assert not quebec.covers(cities_in("Vancouver, BC")[0])
+    assert not quebec.covers(cities_in("Calgary, AB")[0])
+    idf = resolve_location("Île-de-France")
+    assert idf.covers(cities_in("Paris 15e")[0]) and not idf.covers(cities_in("Lyon")[0])
+    assert resolve_location("Washington DC").key == "washington-dc"
+    assert resolve_location("Washington, D.C.").key == "washington-dc"
+    assert resolve_location("Washington").key == "washington"
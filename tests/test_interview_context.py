@@ -0,0 +1,44 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.interview_context import InterviewContext
+import asyncio
+
+
+class SummaryLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def chat(self, messages, **kwargs):
+        self.calls += 1
+        return f"Résumé {self.calls}"
+
+
+def test_interview_context_stays_bounded():
+    async def run():
+        llm = SummaryLLM()
+        context = InterviewContext("Tu es recruteur.", llm, "model", budget_tokens=100)
+        context.add("assistant", "Bonjour, présentez-vous.")
+        for _ in range(10):
+            context.add("user", "réponse " * 40)
+            context.add("assistant", "question " * 40)
+            context.maybe_compact()
+            if context._summary_task:
+                await context._summary_task
+        return llm, context
+
+    llm, context = asyncio.run(run())
+    messages = context.messages()
+    assert llm.calls > 0
+    assert len(context.turns) == 21
+    assert len(messages) < 10
+    assert messages[0] == {"role": "system", "content": "Tu es recruteur."}
+    assert context.summary in messages[1]["content"]
+    # Les échanges récents repartent toujours du recruteur et restent alternés
+    roles = [m["role"] for m in messages[2:]]
+    assert roles[0] == "assistant"
+    assert all(a != b for a, b in zip(roles, roles[1:]))
+    assert messages[-1] == context.turns[-1]
@@ -0,0 +1,36 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.job_cache import JobOfferCache, MemoryJobCacheBackend
+import asyncio
+
+
+def test_waiter_survives_cancelled_leader():
+    cache = JobOfferCache(MemoryJobCacheBackend(10), stale_window=60)
+    calls = []
+
+    async def hangs():
+        calls.append("leader")
+        await asyncio.sleep(10)
+
+    async def fetch():
+        calls.append("waiter")
+        return [{"id": "1", "title": "Dev"}]
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_fetch("jooble", "python", "Paris", "emploi", hangs))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch("jooble", "python", "Paris", "emploi", fetch))
+        await asyncio.sleep(0)
+        # Client SSE déconnecté : la recherche du meneur est annulée
+        leader.cancel()
+        jobs = await asyncio.wait_for(waiter, timeout=1)
+        assert leader.cancelled()
+        return jobs
+
+    assert asyncio.run(run()) == [{"id": "1", "title": "Dev"}]
+    assert calls == ["leader", "waiter"]
+    assert cache._inflight == {}
@@ -0,0 +1,66 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.job_dedup import JobDedupIndex, canonical_url, tokens
+
+
+DESC = "Nous recherchons un développeur .NET pour rejoindre notre équipe à Montréal. Applications web, C#, Azure."
+
+
+def test_normalization():
+    assert tokens("Développeur .NET (H/F)") == tokens("Developpeur .NET") == ["developpeur", ".net"]
+    assert canonical_url("https://www.indeed.com/viewjob?jk=42&from=serp#top") == "https://indeed.com/viewjob?jk=42"
+
+
+def test_cross_source_duplicates_are_merged():
+    index = JobDedupIndex(title_similarity=0.8, desc_chars=200)
+    fresh = index.add_all([
+        {"title": "Développeur .NET (H/F)", "company": "ACME Inc.", "location": "Montréal, QC",
+         "description": DESC[:60], "source": "LinkedIn"},
+        {"title": "Developpeur .NET", "company": "Acme", "location": "Montreal",
+         "description": DESC, "source": "Indeed", "salary": "80k"},
+        {"title": "Développeur Java", "company": "ACME", "location": "Montréal, QC",
+         "description": "Java Spring Kafka", "source": "Jooble"},
+    ])
+    assert [j["title"] for j in fresh] == ["Développeur .NET (H/F)", "Développeur Java"]
+    merged = fresh[0]
+    assert merged["description"] == DESC
+    assert merged["salary"] == "80k"
+    assert merged["sources"] == ["LinkedIn", "Indeed"]
+
+    # Vague suivante : même offre, URL avec paramètres de suivi
+    index.add_all([{"title": "Dev Python", "company": "Globex", "url": "https://ca.linkedin.com/jobs/view/9?refId=a"}])
+    assert index.add_all([{"title": "Python Developer", "company": "Globex", "url": "https://ca.linkedin.com/jobs/view/9/"}]) == []
+
+
+def test_near_duplicates_same_company_only():
+    index = JobDedupIndex(title_similarity=0.8, desc_chars=200)
+    index.add_all([
+        {"title": "Développeur Full Stack React Node", "company": "Globex", "location": "Paris"},
+        {"title": "Software Engineer II", "company": "Globex", "location": "Paris", "description": DESC},
+        {"title": "Java Developer", "company": "Initech", "location": "Lyon", "description": DESC},
+    ])
+    fresh = index.add_all([
+        {"title": "Développeur Full-Stack React Node.js", "company": "GLOBEX SAS", "location": "Paris, France"},
+        {"title": "Développeur Full Stack React Node", "company": "Umbrella", "location": "Paris"},
+        {"title": "Software Engineer III", "company": "Globex", "location": "Paris", "description": DESC},
+        {"title": "Java Developer - Remote", "company": "Initech", "location": "Lyon", "description": DESC},
+        {"title": "Python Developer", "company": "Initech", "location": "Lyon", "description": DESC},
+    ])
+    assert [j["title"] for j in fresh] == ["Développeur Full Stack React Node", "Software Engineer III", "Python Developer"]
+    assert index.merged == 2
+
+
+def test_fallback_urls_and_unknown_companies_are_not_merged():
+    index = JobDedupIndex(title_similarity=0.8, desc_chars=200)
+    fresh = index.add_all([
+        {"title": "Data Engineer", "company": "Globex", "url": "https://www.indeed.com/jobs?q=data"},
+        {"title": "Data Analyst", "company": "Initech", "url": "https://www.indeed.com/jobs?q=data"},
+        {"title": "Ingénieur Data", "company": "Confidentiel", "url": "https://candidat.francetravail.fr/offres/recherche?motsCles=data"},
+        {"title": "Ingénieur Data Senior", "company": "Confidentiel"},
+        {"title": "Ingénieur Data (H/F)", "company": "Confidentiel"},
+    ])
+    assert [j["title"] for j in fresh] == ["Data Engineer", "Data Analyst", "Ingénieur Data", "Ingénieur Data Senior"]
@@ -0,0 +1,61 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+
+from core.job_record import JobRecord, content_fingerprint, job_dedupe_key, to_dicts
+
+
+RAW = {
+    "id": "indeed_1",
+    "title": "Développeur Python",
+    "company": "ACME",
+    "location": "Montréal, QC",
+    "url": "https://example.com/1",
+    "description": "Backend  Python / FastAPI",
+    "source": "Indeed",
+    "salary": "70k",
+}
+
+
+def test_dict_compatible_access():
+    job = JobRecord.coerce(RAW)
+    assert job.get("title") == "Développeur Python"
+    assert job["salary"] == "70k"
+    assert job.get("posted_date", "n/a") == "n/a"
+    assert "match_score" not in job
+    job["match_score"] = 0
+    assert "match_score" in job and job.get("match_score", 50) == 0
+    assert JobRecord.coerce(job) is job
+    assert to_dicts([job])[0] == {**RAW, "match_score": 0}
+    assert json.loads(json.dumps(job.to_dict()))["salary"] == "70k"
+
+
+def test_normalized_fields_follow_updates():
+    job = JobRecord(RAW)
+    assert job.dedupe_key == job_dedupe_key(RAW) == "développeur python-acme"
+    assert job.location_lc == "montréal, qc"
+    assert job.fingerprint == content_fingerprint(RAW)
+
+    before = job.fingerprint
+    job["description"] = "Description complète enrichie"
+    assert job.fingerprint != before
+    job["company"] = "Globex"
+    assert job.dedupe_key == "développeur python-globex"
+
+
+def test_fingerprint_follows_judge_description_window():
+    from config.settings import settings
+    base = {**RAW, "description": "a" * 40}
+    longer = {**RAW, "description": "a" * 40 + " suite jamais envoyée au Judge"}
+    old = settings.judge_description_chars
+    settings.judge_description_chars = 40
+    try:
+        assert content_fingerprint(base) == content_fingerprint(longer)
+        settings.judge_description_chars = 80
+        assert content_fingerprint(base) != content_fingerprint(longer)
+    finally:
+        settings.judge_description_chars = old
@@ -0,0 +1,97 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import source_health
+from core.source_health import CircuitBreaker, SourceHealthRegistry, _observe_status
+import asyncio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_backoff_and_probe():
+    breaker = CircuitBreaker(failure_threshold=3, backoff=30, max_backoff=100)
+    assert not breaker.record(False, 0) and not breaker.record(False, 0)
+    assert breaker.record(False, 0) and breaker.state(10) == "open"
+    assert breaker.acquire(10) is None
+    # Délai écoulé : un seul appel d'essai, qui échoue → délai doublé
+    assert breaker.acquire(30) is True and breaker.acquire(30) is None
+    assert breaker.record(False, 30, probe=True) and breaker.open_until == 90
+    assert breaker.acquire(90) is True
+    assert breaker.record(False, 90, probe=True) and breaker.open_until == 190
+    assert breaker.acquire(190) is True
+    breaker.record(True, 191, probe=True)
+    assert breaker.state(191) == "closed" and breaker.trips == 0
+
+
+def test_call_classifies_outcomes_and_breaks_hanging_source():
+    clock = FakeClock()
+    health = SourceHealthRegistry(clock=clock)
+    source_health.SOURCE_TIMEOUTS["slow"] = 0.01
+
+    async def ok():
+        _observe_status("api.example.com", 200)
+        return [{"id": "1", "title": "Dev"}, {"id": "x-search"}]
+
+    async def blocked():
+        _observe_status("www.example.com", 403)
+        return [{"id": "example-link"}]
+
+    async def hangs():
+        await asyncio.sleep(10)
+
+    async def run():
+        assert len(await health.call("fast", ok)) == 2
+        assert await health.call("blocked", blocked) == [{"id": "example-link"}]
+        for _ in range(3):
+            assert await health.call("slow", hangs) == []
+        # Circuit ouvert : la source n'est plus appelée
+        assert await health.call("slow", ok) == []
+
+    try:
+        asyncio.run(run())
+    finally:
+        del source_health.SOURCE_TIMEOUTS["slow"]
+    stats = health.stats()
+    assert stats["fast"]["outcomes"] == {"ok": 1} and stats["fast"]["http"] == {"200": 1}
+    assert stats["fast"]["real_jobs"] == 1
+    assert stats["blocked"]["outcomes"] == {"error": 1}
+    assert stats["slow"]["outcomes"] == {"timeout": 3, "skipped": 1}
+    assert stats["slow"]["circuit"] == "open" and stats["slow"]["breaker_trips"] == 1
+    assert health.sources["fast"].pending["calls"] == 1
+
+
+def test_plan_waves_demotes_poor_and_skips_open_circuits():
+    health = SourceHealthRegistry(clock=FakeClock())
+    for _ in range(5):
+        health.source("jooble").record_call(300, "placeholder", [200], 1, 0)
+        health.source("linkedin").record_call(900, "ok", [200], 10, 10)
+    health.source("gov").breaker.record(False, health.clock(), probe=True)
+    wave_1, wave_2, skipped = health.plan_waves(
+        ["jooble", "jsearch", "linkedin", "indeed", "gov"], ("jooble", "jsearch", "gov")
+    )
+    assert wave_1 == ["jsearch", "linkedin"]
+    assert wave_2 == ["jooble", "indeed"]
+    assert skipped == ["gov"]
+
+
+def test_fixed_waves_when_adaptive_planning_disabled():
+    from config.settings import settings
+    health = SourceHealthRegistry(clock=FakeClock())
+    for _ in range(5):
+        health.source("linkedin").record_call(900, "ok", [200], 10, 10)
+    settings.source_adaptive_waves = False
+    try:
+        assert health.plan_waves(["jooble", "linkedin"], ("jooble",)) == (["jooble"], ["linkedin"], [])
+    finally:
+        settings.source_adaptive_waves = True
+    health.reset()
+    assert health.stats() == {}
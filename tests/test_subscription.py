@@ -0,0 +1,78 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api import subscription
+from pymongo.errors import DuplicateKeyError
+import asyncio
+
+
+class FakeCounters:
+    """Collection usage_counters minimale : filtre {_id, count < N} + upsert comme MongoDB."""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one_and_update(self, query, update, upsert=False, **kwargs):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and doc["count"] < query["count"]["$lt"]:
+            doc["count"] += update["$inc"]["count"]
+            return dict(doc)
+        if doc is not None or not upsert:
+            # Compteur plein : l'upsert tente d'insérer un _id existant
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.docs[query["_id"]] = {"_id": query["_id"], "count": update["$inc"]["count"]}
+        return dict(self.docs[query["_id"]])
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    async def bulk_write(self, ops, ordered=True):
+        pass
+
+
+class FakeDb:
+    def __init__(self):
+        self.usage_counters = FakeCounters()
+
+
+def _run_with_tier(tier, coro_factory):
+    db = FakeDb()
+    originals = subscription.get_db, subscription.get_user_tier
+
+    async def fake_tier(user_id):
+        return tier
+
+    subscription.get_db = lambda: db
+    subscription.get_user_tier = fake_tier
+    try:
+        return asyncio.run(coro_factory()), db
+    finally:
+        subscription.get_db, subscription.get_user_tier = originals
+
+
+def test_zero_limit_is_refused_without_creating_a_counter():
+    async def run():
+        first = await subscription.reserve_quota("u1", "headhunter")
+        check = await subscription.check_subscription_limit("u1", "headhunter")
+        return first, check
+
+    (first, check), db = _run_with_tier("FREE", run)
+    assert first["allowed"] is False and first["limit"] == 0
+    assert db.usage_counters.docs == {}
+    assert check["allowed"] is False and check["current"] == 0
+
+
+def test_full_counter_is_refused():
+    async def run():
+        results = [await subscription.reserve_quota("u1", "hr_interview") for _ in range(3)]
+        return results
+
+    results, db = _run_with_tier("FREE", run)
+    # Limite FREE hr_interview : 1 par jour
+    assert results[0] == {"allowed": True, "current": 1, "limit": 1}
+    assert [r["allowed"] for r in results[1:]] == [False, False]
+    assert results[1]["current"] == 1
+    assert [doc["count"] for doc in db.usage_counters.docs.values()] == [1]
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Add project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.voice_stream import SentenceChunker, VoiceStreamer, FakeTTSEngine
+import asyncio
+
+
+def test_sentence_chunker():
+    chunker = SentenceChunker(min_chars=10)
+    sentences = []
+    for delta in ["Bonjour M. Dupont, ravi", " de vous voir. Ok. Parlons de", " votre budget de 3.5 M€ ! Et ", "ensuite ?"]:
+        sentences += chunker.feed(delta)
+    assert sentences == ["Bonjour M. Dupont, ravi de vous voir.", "Ok. Parlons de votre budget de 3.5 M€ !"]
+    assert chunker.flush() == "Et ensuite ?"
+
+
+def test_voice_streamer_first_audio_before_llm_finishes():
+    sent = []
+
+    async def send_json(message):
+        sent.append(message)
+
+    async def send_bytes(frame):
+        sent.append(frame)
+
+    async def deltas():
+        yield "Première question assez longue pour vous. "
+        # Le LLM "réfléchit" : le premier segment audio doit déjà être parti
+        for _ in range(50):
+            if any(isinstance(m, bytes) for m in sent):
+                break
+            await asyncio.sleep(0)
+        yield "Et une seconde phrase pour finir."
+
+    async def run():
+        streamer = VoiceStreamer(send_json, send_bytes, FakeTTSEngine(frame_size=8))
+        return await streamer.speak_stream(deltas())
+
+    text = asyncio.run(run())
+    assert text == "Première question assez longue pour vous. Et une seconde phrase pour finir."
+
+    first_frame = next(i for i, m in enumerate(sent) if isinstance(m, bytes))
+    second_chunk = [i for i, m in enumerate(sent) if isinstance(m, dict) and m["type"] == "chunk"][1]
+    assert first_frame < second_chunk
+
+    types = [m["type"] for m in sent if isinstance(m, dict)]
+    assert types.count("voice_start") == types.count("voice_end") == 2
+    assert types[-1] == "voice_done"
+    audio = b"".join(m for m in sent if isinstance(m, bytes))
+    assert audio == "[fake] Première question assez longue pour vous.[fake] Et une seconde phrase pour finir.".encode("utf-8")
+
+
+def test_voice_streamer_legacy_base64():
+    sent = []
+
+    async def send_json(message):
+        sent.append(message)
+
+    async def send_bytes(frame):
+        raise AssertionError("pas de trame binaire en mode historique")
+
+    streamer = VoiceStreamer(send_json, send_bytes, FakeTTSEngine(), binary=False)
+    asyncio.run(streamer.speak("Bonjour ! Je suis Sophie pour le poste. Pouvez-vous vous présenter ?"))
+    assert [m["type"] for m in sent] == ["voice"]
@@ -7,12 +7,58 @@ import aiohttp
 import re
 from typing import List, Dict, Any, Optional
 from loguru import logger
+from tools.http_client import ToolSession, get_tool_session
+from tools.html_parsing import SourceSelectors, make_soup, run_parse
 from bs4 import BeautifulSoup
 
 
 BASE_URL = "https://www.emploi.cm"
 SEARCH_URL = f"{BASE_URL}/recherche-jobs-cameroun"
 
+# Sélecteurs compilés une fois (appliqués à chaque carte / page de détail)
+SELECTORS = SourceSelectors(
+    "emploi.cm",
+    # Cartes de la page de recherche, par ordre de préférence
+    blocks_card_job=".card.card-job",
+    blocks_card=".card-job",
+    blocks_views_content=".view-content .views-row",
+    blocks_views=".views-row",
+    blocks_article="article.job",
+    blocks_item=".job-item",
+    blocks_result=".search-result",
+    blocks_any="[class*='job']",
+    # Carte d'offre
+    detail_link="h3 a[href*='/offre-emploi-cameroun/']",
+    detail_link_any="a[href*='/offre-emploi-cameroun/']",
+    title="h3 a",
+    title_h2="h2 a",
+    company=".card-job-company, .company-name",
+    company_recruiter="a[href*='/recruteur/']",
+    description=".card-job-description p",
+    description_any=".card-job-description",
+    description_body=".field-name-body .field-item, .description, .job-description, .body",
+    meta_items="ul li",
+    strong="strong",
+    time="time",
+    # Page de détail (Drupal)
+    main_node=".node__content",
+    main_body=".field-name-body",
+    main_field=".content .field",
+    main_article="article .content",
+    main_body_any="[class*='field-name-body']",
+    main_region=".region-content",
+    main="main",
+    text_nodes=".field-item, .field__item, p, li, div",
+    skills=".field-name-field-competences .field-item, .field--name-field-competences a, [class*='tag']",
+)
+BLOCK_SELECTORS = (
+    "blocks_card_job", "blocks_card", "blocks_views_content", "blocks_views",
+    "blocks_article", "blocks_item", "blocks_result", "blocks_any",
+)
+MAIN_SELECTORS = (
+    "main_node", "main_body", "main_field", "main_article", "main_body_any", "main_region", "main",
+)
+
 # User-Agent commun
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -26,16 +72,13 @@ class EmploiCmSearcher:
 
     def __init__(self, timeout: int = 25):
         self.timeout = aiohttp.ClientTimeout(total=timeout)
-        self.session = None
 
-    async def _get_session(self) -> aiohttp.ClientSession:
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession(timeout=self.timeout)
-        return self.session
+    async def _get_session(self) -> ToolSession:
+        return get_tool_session(timeout=self.timeout)
 
     async def close(self):
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Le pool HTTP est partagé (tools.http_client) : rien à fermer ici."""
+        pass
 
     def _is_detail_url(self, url: str) -> bool:
         """Vrai si l'URL pointe vers une page d'offre (détail), pas la liste."""
@@ -46,7 +89,7 @@ class EmploiCmSearcher:
             return False
         return "/offre-emploi-cameroun/" in u or "/node/" in u or "/offre" in u or (BASE_URL in u and u != SEARCH_URL.lower())
 
-    async def _fetch_detail_page(self, session: aiohttp.ClientSession, url: str) -> Optional[Dict[str, Any]]:
+    async def _fetch_detail_page(self, session: ToolSession, url: str) -> Optional[Dict[str, Any]]:
         """Charge la page de détail d'une offre et en extrait le contenu complet."""
         if not self._is_detail_url(url):
             return None
@@ -59,22 +102,21 @@ class EmploiCmSearcher:
         except Exception as e:
             logger.debug(f"Emploi.cm detail fetch error {url}: {e}")
             return None
-        soup = BeautifulSoup(html, "html.parser")
+        return await run_parse(self._parse_detail_page, html)
+
+    def _parse_detail_page(self, html: str) -> Dict[str, Any]:
+        soup = make_soup(html)
         # Zones de contenu typiques Drupal / contenu principal
-        main = (
-            soup.select_one(".node__content")
-            or soup.select_one(".field-name-body")
-            or soup.select_one(".content .field")
-            or soup.select_one("article .content")
-            or soup.select_one("[class*='field-name-body']")
-            or soup.select_one(".region-content")
-            or soup.select_one("main")
-        )
+        main = None
+        for name in MAIN_SELECTORS:
+            main = getattr(SELECTORS, name).select_one(soup)
+            if main:
+                break
         if not main:
             main = soup.find("body")
         text_parts = []
         if main:
-            for node in main.select(".field-item, .field__item, p, li, div"):
+            for node in SELECTORS.text_nodes.select(main):
                 t = (node.get_text(separator=" ", strip=True) or "").strip()
                 if t and len(t) > 2:
                     text_parts.append(t)
@@ -83,7 +125,7 @@ class EmploiCmSearcher:
         full_text = "\n\n".join(t for t in text_parts if t)[:15000]
         # Extraire compétences / mots-clés si présents (liste de tags)
         skills = []
-        for tag in soup.select(".field-name-field-competences .field-item, .field--name-field-competences a, [class*='tag']"):
+        for tag in SELECTORS.skills.select(soup):
             s = (tag.get_text(strip=True) or "").strip()
             if s and len(s) < 80:
                 skills.append(s)
@@ -110,33 +152,7 @@ class EmploiCmSearcher:
                     return []
                 html = await response.text()
 
-            soup = BeautifulSoup(html, "html.parser")
-
-            # Stratégie 1 : structure réelle du site (card.card-job avec data-href, h3, .card-job-description, ul li, time)
-            blocks = (
-                soup.select(".card.card-job")
-                or soup.select(".card-job")
-                or soup.select(".view-content .views-row")
-                or soup.select(".views-row")
-                or soup.select("article.job")
-                or soup.select(".job-item")
-                or soup.select(".search-result")
-                or soup.select("[class*='job']")
-            )
-
-            if not blocks:
-                # Stratégie 2 : blocs délimités par chaque h2/h3 (titre de poste)
-                blocks = self._extract_blocks_by_headings(soup)
-
-            for node in blocks[: max(limit, 60)]:
-                job = self._parse_job_node(node)
-                if job and job.get("title"):
-                    job["source"] = "Emploi.cm"
-                    job["id"] = job.get("id") or f"emploi-cm-{abs(hash(job.get('url', '') + job.get('title', '')))}"
-                    jobs.append(job)
-
-            if not jobs:
-                jobs = self._parse_fallback(html, limit)
+            jobs = await run_parse(self._parse_search_page, html, limit)
 
             # Enrichir avec les détails complets (page de détail) si demandé
             if full_details and jobs:
@@ -147,8 +163,35 @@ class EmploiCmSearcher:
             logger.error(f"Emploi.cm scraper error: {e}")
         return jobs[: limit if limit else 50]
 
+    def _parse_search_page(self, html: str, limit: int) -> List[Dict[str, Any]]:
+        """Offres de la page recherche-jobs-cameroun (un seul parsing de la page)."""
+        soup = make_soup(html)
+
+        # Stratégie 1 : structure réelle du site (card.card-job avec data-href, h3, .card-job-description, ul li, time)
+        blocks = []
+        for name in BLOCK_SELECTORS:
+            blocks = getattr(SELECTORS, name).select(soup)
+            if blocks:
+                break
+
+        if not blocks:
+            # Stratégie 2 : blocs délimités par chaque h2/h3 (titre de poste)
+            blocks = self._extract_blocks_by_headings(soup)
+
+        jobs = []
+        for node in blocks[: max(limit, 60)]:
+            job = self._parse_job_node(node)
+            if job and job.get("title"):
+                job["source"] = "Emploi.cm"
+                job["id"] = job.get("id") or f"emploi-cm-{abs(hash(job.get('url', '') + job.get('title', '')))}"
+                jobs.append(job)
+
+        if not jobs:
+            jobs = self._parse_fallback(soup, limit)
+        return jobs
+
     async def _enrich_with_full_details(
-        self, session: aiohttp.ClientSession, jobs: List[Dict[str, Any]], limit: int
+        self, session: ToolSession, jobs: List[Dict[str, Any]], limit: int
     ) -> List[Dict[str, Any]]:
         """Charge la page de détail pour chaque offre et met à jour description (et skills)."""
         semaphore = asyncio.Semaphore(3)
@@ -188,17 +231,15 @@ class EmploiCmSearcher:
                 parts.append(str(sib))
                 sib = sib.find_next_sibling()
             block_html = "<div>" + "".join(parts) + "</div>"
-            blocks.append(BeautifulSoup(block_html, "html.parser"))
+            blocks.append(make_soup(block_html).find("div"))
         return blocks
 
     def _parse_job_node(self, node) -> Optional[Dict[str, Any]]:
         """Parse un nœud HTML (ex: .card.card-job) selon la structure réelle du site."""
-        if isinstance(node, str):
+        if node is None or isinstance(node, str):
             return None
-        soup = node if isinstance(node, BeautifulSoup) else BeautifulSoup(str(node), "html.parser")
-        root = soup.find() if hasattr(soup, "find") else soup
-        if root is None:
-            root = soup
+        # Le nœud est lu en place (plus de re-parsing de str(node) pour chaque carte)
+        root = (node.find() or node) if isinstance(node, BeautifulSoup) else node
 
         title = ""
         company = "N.C."
@@ -216,35 +257,35 @@ class EmploiCmSearcher:
             if url and not url.startswith("http"):
                 url = f"{BASE_URL}{url}"
         if url == SEARCH_URL:
-            a_detail = root.select_one("h3 a[href*='/offre-emploi-cameroun/']") or root.select_one("a[href*='/offre-emploi-cameroun/']")
+            a_detail = SELECTORS.detail_link.select_one(root) or SELECTORS.detail_link_any.select_one(root)
             if a_detail and a_detail.get("href"):
                 raw = (a_detail["href"] or "").strip()
                 if raw and "recruteur" not in raw:
                     url = raw if raw.startswith("http") else f"{BASE_URL}{raw}"
 
         # 2) Titre : h3 > a (texte du lien)
-        title_el = root.select_one("h3 a") or root.select_one("h2 a")
+        title_el = SELECTORS.title.select_one(root) or SELECTORS.title_h2.select_one(root)
         if title_el:
             title = (title_el.get_text(strip=True) or "").strip()
 
         # 3) Entreprise : .card-job-company ou .company-name (lien recruteur)
-        company_el = root.select_one(".card-job-company, .company-name") or root.select_one("a[href*='/recruteur/']")
+        company_el = SELECTORS.company.select_one(root) or SELECTORS.company_recruiter.select_one(root)
         if company_el:
             company = (company_el.get_text(strip=True) or "").strip() or "N.C."
 
         # 4) Description : .card-job-description p
-        desc_el = root.select_one(".card-job-description p") or root.select_one(".card-job-description")
+        desc_el = SELECTORS.description.select_one(root) or SELECTORS.description_any.select_one(root)
         if desc_el:
             description = desc_el.get_text(separator=" ", strip=True)[:5000]
         if not description:
-            desc_el = root.select_one(".field-name-body .field-item, .description, .job-description, .body")
+            desc_el = SELECTORS.description_body.select_one(root)
             if desc_el:
                 description = desc_el.get_text(separator=" ", strip=True)[:5000]
 
         # 5) Métadonnées : ul li (Niveau d'études, Niveau d'expérience, Contrat, Région, Compétences clés)
-        for li in root.select("ul li"):
+        for li in SELECTORS.meta_items.select(root):
             raw_li = (li.get_text() or "").strip()
-            strong = li.select_one("strong")
+            strong = SELECTORS.strong.select_one(li)
             value = (strong.get_text(strip=True) or "").strip() if strong else raw_li
             if "Région de" in raw_li and value:
                 location = value.replace("&amp;", "&").strip()
@@ -258,7 +299,7 @@ class EmploiCmSearcher:
                 required_skills = [s.strip() for s in re.split(r"\s*[-–]\s*", value) if s.strip()][:30]
 
         # 6) Date : time (datetime ou texte)
-        time_el = root.select_one("time")
+        time_el = SELECTORS.time.select_one(root)
         if time_el:
             posted_date = (time_el.get("datetime") or time_el.get_text(strip=True) or "").strip()
 
@@ -295,11 +336,9 @@ class EmploiCmSearcher:
             "scraped": True,
         }
 
-    def _parse_fallback(self, html: str, limit: int) -> List[Dict[str, Any]]:
-        """Fallback : découper par h3 (titres d'offres) dans le texte extrait du HTML."""
+    def _parse_fallback(self, soup: BeautifulSoup, limit: int) -> List[Dict[str, Any]]:
+        """Fallback : découper par h3 (titres d'offres) dans la page déjà parsée."""
         jobs = []
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(separator="\n", strip=True)
         # Découper par lignes qui ressemblent à un titre (pas trop long, avant "Région" / "N.C.")
         h3s = soup.find_all("h3")
         for h3 in h3s[:limit]:
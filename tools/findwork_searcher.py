@@ -2,6 +2,7 @@
 import aiohttp
 from typing import List, Dict, Any
 from loguru import logger
+from tools.http_client import http_session
 import urllib.parse
 from config.settings import settings
 
@@ -33,7 +34,7 @@ class FindWorkSearcher:
         
         jobs = []
         try:
-            async with aiohttp.ClientSession(headers=headers) as session:
+            async with http_session(headers=headers) as session:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
                     if response.status != 200:
                         logger.error(f"FindWork API Error {response.status}: {await response.text()}")
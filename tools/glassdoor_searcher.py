@@ -1,9 +1,9 @@
 """Outil de recherche d'emploi via l'API Glassdoor (RapidAPI)."""
-import aiohttp
 import asyncio
 from typing import List, Dict, Any
 import urllib.parse
 from loguru import logger
+from tools.http_client import http_session
 from config.settings import settings
 
 class GlassdoorSearcher:
@@ -33,7 +33,7 @@ class GlassdoorSearcher:
         
         logger.info(f"📡 Glassdoor API: Recherche '{query}' à '{location}'")
         
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with http_session(headers=self.headers) as session:
             try:
                 async with session.get(url, timeout=15) as response:
                     if response.status == 200:
@@ -4,13 +4,21 @@ Utilise le endpoint Google Jobs (htl;jobs) qui retourne des fiches structurées.
 import aiohttp
 import asyncio
 import re
-import ssl
 import json
 import urllib.parse
 from typing import List, Dict, Any
 from loguru import logger
+from tools.http_client import http_session
+from tools.html_parsing import SourceSelectors, make_soup, run_parse, strainer
+
+# Résultats de recherche Google classiques (fallback sans JSON-LD)
+SELECTORS = SourceSelectors(
+    "google",
+    results="div.g, div[class*='tF2Cxc']",
+    snippet="div[class*='IsZvec'], div[class*='VwiC3b'], div[class*='yXK7lf']",
+    link="a[href]",
+)
 
-ssl_ctx = ssl._create_unverified_context()
 
 HEADERS = {
     "User-Agent": (
@@ -53,13 +61,13 @@ class GoogleJobsSearcher:
         url = f"https://www.google.com/search?q={q_enc}&ibp=htl;jobs&hl=fr&gl=fr"
 
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15), ssl=ssl_ctx) as resp:
+            async with http_session(headers=self.headers, verify_ssl=False) as session:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
 
-            return self._parse_google_jobs_html(html, location, limit)
+            return await run_parse(self._parse_google_jobs_html, html, location, limit)
 
         except Exception as e:
             logger.debug(f"Google Jobs API attempt failed: {e}")
@@ -74,71 +82,70 @@ class GoogleJobsSearcher:
         url = f"https://www.google.com/search?q={q_enc}&hl=fr&gl=fr&num=20"
 
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15), ssl=ssl_ctx) as resp:
+            async with http_session(headers=self.headers, verify_ssl=False) as session:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
+            return await run_parse(self._parse_google_search_html, html, keywords, location, limit)
 
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
-            jobs = []
+        except Exception as e:
+            logger.debug(f"Google HTML scrape failed: {e}")
+            return []
 
-            # Chercher les blocs JSON-LD avec des offres d'emploi
-            for script in soup.find_all("script", type="application/ld+json"):
-                try:
-                    data = json.loads(script.string or "")
-                    if isinstance(data, list):
-                        for item in data:
-                            job = self._parse_jsonld_job(item, location)
-                            if job:
-                                jobs.append(job)
-                    elif isinstance(data, dict):
-                        job = self._parse_jsonld_job(data, location)
+    def _parse_google_search_html(self, html: str, keywords: str, location: str, limit: int) -> List[Dict[str, Any]]:
+        soup = make_soup(html)
+        jobs = []
+
+        # Chercher les blocs JSON-LD avec des offres d'emploi
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                data = json.loads(script.string or "")
+                if isinstance(data, list):
+                    for item in data:
+                        job = self._parse_jsonld_job(item, location)
                         if job:
                             jobs.append(job)
-                except:
+                elif isinstance(data, dict):
+                    job = self._parse_jsonld_job(data, location)
+                    if job:
+                        jobs.append(job)
+            except:
+                continue
+
+        # Aussi chercher les résultats de recherche normaux
+        if not jobs:
+            for i, div in enumerate(SELECTORS.results.select(soup, limit)):
+                link = SELECTORS.link.select_one(div)
+                title = div.find("h3")
+                snippet = SELECTORS.snippet.select_one(div)
+                if not link or not title:
                     continue
+                href = link.get("href", "")
+                t = title.get_text(strip=True)
+                # Filtrer les résultats non pertinents
+                if not any(w in t.lower() for w in ["emploi", "job", "poste", "recrutement", "offre", keywords.lower()[:10]]):
+                    continue
+                jobs.append({
+                    "id": f"google-{i}",
+                    "title": t,
+                    "company": "Via Google",
+                    "location": "Non spécifié",
+                    "url": href if href.startswith("http") else f"https://www.google.com{href}",
+                    "description": (snippet.get_text(strip=True)[:500] if snippet else "") or f"Poste : {t}. Consultez le lien pour la description complète.",
+                    "source": "Google Search",
+                    "match_score": 0,
+                })
 
-            # Aussi chercher les résultats de recherche normaux
-            if not jobs:
-                results = soup.find_all("div", class_=re.compile(r"^g$|tF2Cxc"))
-                for i, div in enumerate(results[:limit]):
-                    link = div.find("a", href=True)
-                    title = div.find("h3")
-                    snippet = div.find("div", class_=re.compile(r"IsZvec|VwiC3b|yXK7lf"))
-                    if not link or not title:
-                        continue
-                    href = link.get("href", "")
-                    t = title.get_text(strip=True)
-                    # Filtrer les résultats non pertinents
-                    if not any(w in t.lower() for w in ["emploi", "job", "poste", "recrutement", "offre", keywords.lower()[:10]]):
-                        continue
-                    jobs.append({
-                        "id": f"google-{i}",
-                        "title": t,
-                        "company": "Via Google",
-                        "location": "Non spécifié",
-                        "url": href if href.startswith("http") else f"https://www.google.com{href}",
-                        "description": (snippet.get_text(strip=True)[:500] if snippet else "") or f"Poste : {t}. Consultez le lien pour la description complète.",
-                        "source": "Google Search",
-                        "match_score": 0,
-                    })
-
-            return jobs[:limit]
-
-        except Exception as e:
-            logger.debug(f"Google HTML scrape failed: {e}")
-            return []
+        return jobs[:limit]
 
     def _parse_google_jobs_html(self, html: str, location: str, limit: int) -> List[Dict[str, Any]]:
         """Parse les blocs d'emploi intégrés dans la page Google Jobs."""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
+            # Google Jobs structure : blocs avec data dans les scripts (seuls les <script> sont construits)
+            soup = make_soup(html, parse_only=strainer("script"))
             jobs = []
 
-            # Google Jobs structure : blocs avec data dans les scripts
             for script in soup.find_all("script"):
                 text = script.string or ""
                 if "JobPosting" not in text and "htichips" not in text:
@@ -6,9 +6,27 @@ import asyncio
 import urllib.parse
 from typing import List, Dict, Any
 from loguru import logger
-import ssl
+from core.gazetteer import country_of
+from tools.http_client import http_session
+from tools.html_parsing import SourceSelectors, make_soup, run_parse, strainer
 
-ssl_context = ssl._create_unverified_context()
+# Sélecteurs des pages HTML (France Travail, Place de l'Emploi Public, Guichet Emplois), compilés une fois
+SELECTORS = SourceSelectors(
+    "gov",
+    ft_cards="li.result",
+    ft_cards_alt="article.result",
+    ft_title="h2[class*='title' i], h3[class*='title' i], p[class*='title' i]",
+    ft_company="[class*='company' i]",
+    ft_location="[class*='location' i]",
+    ft_snippet="p.description",
+    ft_snippet_any="p[class*='snippet'], p[class*='description'], p[class*='text']",
+    pep_cards="article.offre, .offre-card",
+    pep_description="[class*='descriptif'], [class*='description'], [class*='snippet']",
+    jb_link="a.resultJobItem",
+    jb_title=".noctitle",
+    jb_business=".business",
+    jb_location=".location",
+)
 
 
 class GovSearcher:
@@ -31,6 +49,9 @@ class GovSearcher:
         "belgique": [
             {"name": "FOREM (Wallonie)", "handler": "_search_forem"},
         ],
+        "pays-bas": [
+            {"name": "EURES (Europe)", "handler": "_search_eures"},
+        ],
     }
 
     def __init__(self):
@@ -68,27 +89,8 @@ class GovSearcher:
         return all_jobs[:limit]
 
     def _detect_country(self, location: str) -> str:
-        """Détecte le pays cible à partir de la chaîne de localisation."""
-        loc = location.lower().strip()
-        # Nettoyage des fautes courantes
-        loc = loc.replace("califormie", "california").replace("californie", "california")
-        loc = loc.replace("etats-unis", "usa").replace("etats unis", "usa")
-        
-        if any(w in loc for w in ["france", "paris", "lyon", "marseille", "bordeaux", "nantes", "lille", "toulouse", "strasbourg", "nice", "rennes", "montpellier", "grenoble"]): return "france"
-        if any(w in loc for w in ["usa", "united states", "america", "new york", "california", "texas", "washington", "chicago", "florida", "boston", "seattle", "los angeles", "san francisco", "silicon valley"]): return "usa"
-        if any(w in loc for w in ["canada", "quebec", "montreal", "toronto", "vancouver", "ottawa", "calgary", "edmonton"]): return "canada"
-        if any(w in loc for w in ["europe", "eu", "european union", "schengen"]): return "europe"
-        if any(w in loc for w in ["belgique", "belgium", "bruxelles", "brussels", "liège", "namur", "wallonie", "gand", "anvers"]): return "belgique"
-        if any(w in loc for w in ["suisse", "switzerland", "genève", "zurich", "berne", "lausanne", "bale"]): return "suisse"
-        if any(w in loc for w in ["uk", "united kingdom", "london", "england", "scotland", "wales", "manchester", "birmingham"]): return "uk"
-        if any(w in loc for w in ["allemagne", "germany", "berlin", "munich", "hamburg", "frankfurt", "cologne"]): return "allemagne"
-        if any(w in loc for w in ["maroc", "morocco", "casablanca", "rabat", "marrakech", "fes"]): return "maroc"
-        if any(w in loc for w in ["espagne", "spain", "madrid", "barcelona", "valence", "seville"]): return "espagne"
-        if any(w in loc for w in ["italie", "italy", "rome", "milan", "naples", "turin"]): return "italie"
-        if any(w in loc for w in ["portugal", "lisbonne", "porto", "lisbon"]): return "portugal"
-        if any(w in loc for w in ["pays-bas", "netherlands", "amsterdam", "rotterdam", "hollande"]): return "europe"
-        # Par défaut
-        return "france"
+        """Détecte le pays cible à partir de la chaîne de localisation (gazetteer partagé, France par défaut)."""
+        return country_of(location)
 
     # ──────────────────────────────────────────────────────────────────────────────
     # FRANCE
@@ -109,12 +111,12 @@ class GovSearcher:
             "Accept-Language": "fr-FR,fr;q=0.9",
         }
         try:
-            async with aiohttp.ClientSession(headers=headers_html) as session:
+            async with http_session(headers=headers_html) as session:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
-                    return self._parse_france_travail_html(html, location, limit, keywords)
+            return await run_parse(self._parse_france_travail_html, html, location, limit, keywords)
         except Exception as e:
             logger.debug(f"France Travail HTML scrape failed: {e}")
             # Fallback ultime : retourner un lien de recherche direct
@@ -131,20 +133,19 @@ class GovSearcher:
 
     def _parse_france_travail_html(self, html: str, location: str, limit: int, keywords: str) -> List[Dict[str, Any]]:
         """Parse les résultats HTML de France Travail."""
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         jobs = []
         # Les offres France Travail sont dans des articles avec data-*
-        cards = soup.find_all("li", class_="result", limit=limit)
+        cards = SELECTORS.ft_cards.select(soup, limit)
         if not cards:
             # Autre sélecteur possible
-            cards = soup.select("article.result", limit)[:limit]
+            cards = SELECTORS.ft_cards_alt.select(soup, limit)
         
         for i, card in enumerate(cards):
-            title_tag = card.find(["h2", "h3", "p"], class_=lambda c: c and "title" in c.lower() if c else False)
-            company_tag = card.find(class_=lambda c: c and "company" in c.lower() if c else False)
-            loc_tag = card.find(class_=lambda c: c and "location" in c.lower() if c else False)
-            snippet_tag = card.find("p", class_="description") or card.find("p", class_=re.compile("snippet|description|text"))
+            title_tag = SELECTORS.ft_title.select_one(card)
+            company_tag = SELECTORS.ft_company.select_one(card)
+            loc_tag = SELECTORS.ft_location.select_one(card)
+            snippet_tag = SELECTORS.ft_snippet.select_one(card) or SELECTORS.ft_snippet_any.select_one(card)
             
             link_tag = card.find("a")
             href = link_tag.get("href", "") if link_tag else ""
@@ -174,7 +175,7 @@ class GovSearcher:
         url = "https://place-emploi-public.gouv.fr/api/offres/recherche"
         params = {"motCle": keywords, "page": 0, "taille": limit}
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
+            async with http_session(headers=self.headers) as session:
                 async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
@@ -194,35 +195,12 @@ class GovSearcher:
         url = f"https://place-emploi-public.gouv.fr/offre-emploi/?motCle={kw_enc}"
         try:
             headers_html = {"User-Agent": "Mozilla/5.0", "Accept-Language": "fr-FR,fr;q=0.9"}
-            async with aiohttp.ClientSession(headers=headers_html) as session:
+            async with http_session(headers=headers_html) as session:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html, "html.parser")
-                    jobs = []
-                    cards = soup.select("article.offre, .offre-card", )[:limit]
-                    for i, card in enumerate(cards):
-                        title_tag = card.find(["h2", "h3"])
-                        link_tag = card.find("a")
-                        desc_tag = card.find(class_=re.compile("descriptif|description|snippet"))
-                        
-                        href = link_tag.get("href", "") if link_tag else ""
-                        if href and not href.startswith("http"):
-                            href = f"https://place-emploi-public.gouv.fr{href}"
-                            
-                        jobs.append({
-                            "id": f"pep-{i}",
-                            "title": title_tag.get_text(strip=True) if title_tag else f"Offre Fonction Publique #{i+1}",
-                            "company": "Fonction Publique",
-                            "location": "Non spécifié",
-                            "url": href or url,
-                            "description": desc_tag.get_text(strip=True)[:400] if desc_tag else "",
-                            "source": "Place Emploi Public",
-                            "match_score": 0,
-                        })
-                    return jobs
+            return await run_parse(self._parse_place_emploi_public_html, html, url, limit)
         except Exception as e:
             logger.debug(f"Place Emploi Public HTML failed: {e}")
             kw_enc = urllib.parse.quote_plus(keywords)
@@ -237,6 +215,30 @@ class GovSearcher:
                 "match_score": 0,
             }]
 
+    def _parse_place_emploi_public_html(self, html: str, url: str, limit: int) -> List[Dict[str, Any]]:
+        soup = make_soup(html)
+        jobs = []
+        for i, card in enumerate(SELECTORS.pep_cards.select(soup, limit)):
+            title_tag = card.find(["h2", "h3"])
+            link_tag = card.find("a")
+            desc_tag = SELECTORS.pep_description.select_one(card)
+            
+            href = link_tag.get("href", "") if link_tag else ""
+            if href and not href.startswith("http"):
+                href = f"https://place-emploi-public.gouv.fr{href}"
+                
+            jobs.append({
+                "id": f"pep-{i}",
+                "title": title_tag.get_text(strip=True) if title_tag else f"Offre Fonction Publique #{i+1}",
+                "company": "Fonction Publique",
+                "location": "Non spécifié",
+                "url": href or url,
+                "description": desc_tag.get_text(strip=True)[:400] if desc_tag else "",
+                "source": "Place Emploi Public",
+                "match_score": 0,
+            })
+        return jobs
+
     def _parse_place_emploi_public(self, data: dict, limit: int) -> List[Dict[str, Any]]:
         """Parse la réponse de l'API Place de l'Emploi Public."""
         jobs = []
@@ -275,7 +277,7 @@ class GovSearcher:
             "ResultsPerPage": limit,
         }
         try:
-            async with aiohttp.ClientSession(headers=headers) as session:
+            async with http_session(headers=headers) as session:
                 async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
@@ -321,12 +323,12 @@ class GovSearcher:
         }
         try:
             headers = {**self.headers, "Accept": "text/html,application/xhtml+xml", "Accept-Language": "fr-CA,fr;q=0.9"}
-            async with aiohttp.ClientSession(headers=headers) as session:
+            async with http_session(headers=headers) as session:
                 async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
-                    return self._parse_jobbank_html(html, location, limit)
+            return await run_parse(self._parse_jobbank_html, html, location, limit)
         except Exception as e:
             logger.debug(f"JobBank Canada failed: {e}")
             return []
@@ -334,17 +336,17 @@ class GovSearcher:
     def _parse_jobbank_html(self, html: str, location: str, limit: int) -> List[Dict[str, Any]]:
         """Parse le HTML du Guichet Emplois Canada."""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
+            # Seuls les <article> (résultats) sont construits
+            soup = make_soup(html, parse_only=strainer("article"))
             articles = soup.find_all("article", limit=limit)
             jobs = []
             for i, art in enumerate(articles):
-                link = art.find("a", class_="resultJobItem")
+                link = SELECTORS.jb_link.select_one(art)
                 if not link:
                     continue
-                title_tag = art.find(class_="noctitle")
-                company_tag = art.find(class_="business")
-                loc_tag = art.find(class_="location")
+                title_tag = SELECTORS.jb_title.select_one(art)
+                company_tag = SELECTORS.jb_business.select_one(art)
+                loc_tag = SELECTORS.jb_location.select_one(art)
                 href = link.get("href", "")
                 jobs.append({
                     "id": f"jb-ca-{i}",
@@ -378,7 +380,7 @@ class GovSearcher:
             "pageSize": limit,
         }
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
+            async with http_session(headers=self.headers) as session:
                 async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
@@ -416,7 +418,7 @@ class GovSearcher:
         url = "https://www.leforem.be/api/offres_emploi"
         params = {"keywords": keywords, "location": "Non spécifié", "limit": limit}
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
+            async with http_session(headers=self.headers) as session:
                 async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status not in (200, 201):
                         raise Exception(f"HTTP {resp.status}")
@@ -0,0 +1,150 @@
+"""
+Couche de parsing HTML partagée par les scrapers (Indeed, LinkedIn, Emploi.cm, France Travail, Google...).
+
+- un seul parseur pour tout le projet : lxml (C) si installé, sinon html.parser (pur Python, nettement plus lent)
+- sélecteurs CSS compilés une fois par source (soupsieve) au lieu d'être ré-analysés à chaque carte
+- SoupStrainer possible pour ne construire que les nœuds utiles (cartes <li>, <article>, <script>)
+- pages volumineuses parsées dans un pool de threads : l'event loop continue de servir les autres requêtes
+
+Usage :
+
+    SELECTORS = SourceSelectors("indeed", cards="div[class*='job_seen_beacon']", title="h2[class*='jobTitle']")
+
+    def _parse(self, html):
+        soup = make_soup(html)
+        for card in SELECTORS.cards.select(soup):
+            title = SELECTORS.title.select_one(card)
+
+    jobs = await run_parse(self._parse, html)
+"""
+import asyncio
+import functools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from loguru import logger
+
+from config.settings import settings
+
+T = TypeVar("T")
+
+_parser_name: Optional[str] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def parser_name() -> str:
+    """Nom du tree builder BeautifulSoup retenu (résolu une fois)."""
+    global _parser_name
+    if _parser_name is None:
+        wanted = (settings.html_parser_backend or "auto").lower()
+        if wanted in ("auto", "lxml"):
+            try:
+                import lxml  # noqa: F401
+                _parser_name = "lxml"
+            except ImportError:
+                if wanted == "lxml":
+                    logger.warning("⚠️ lxml non installé : parsing HTML avec html.parser (plus lent)")
+                _parser_name = "html.parser"
+        else:
+            _parser_name = "html.parser"
+        logger.debug(f"🧩 Parseur HTML : {_parser_name}")
+    return _parser_name
+
+
+def make_soup(html: str, parse_only: Any = None, parser: Optional[str] = None):
+    """BeautifulSoup avec le parseur configuré ; `parse_only` (SoupStrainer) limite l'arbre construit."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, parser or parser_name(), parse_only=parse_only)
+
+
+def strainer(*args, **kwargs):
+    """SoupStrainer (import paresseux de bs4)."""
+    from bs4 import SoupStrainer
+    return SoupStrainer(*args, **kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def compiled(css: str):
+    """Sélecteur CSS compilé (soupsieve), mis en cache par texte de sélecteur."""
+    import soupsieve
+    return soupsieve.compile(css)
+
+
+_LAST_IDENTIFIER = re.compile(r"[\w-]+(?=[^\w-]*$)")
+
+
+def present_selectors(html: str, selectors: Sequence[str]) -> List[str]:
+    """
+    Sélecteurs qui peuvent correspondre à la page : leur dernier identifiant (classe, id, attribut, balise)
+    doit apparaître tel quel dans le HTML brut (recherche de sous-chaîne en C, avant tout parcours de l'arbre).
+    """
+    kept = []
+    for css in selectors:
+        match = _LAST_IDENTIFIER.search(css)
+        if match is None or match.group(0) in html:
+            kept.append(css)
+    return kept
+
+
+def first_matches(root, selectors: Sequence[str]) -> List[Any]:
+    """
+    Équivalent de `[compiled(css).select_one(root) for css in selectors]` en un seul parcours de l'arbre
+    (une liste de sélecteurs de repli essayés dans l'ordre coûte sinon un parcours complet par sélecteur).
+    """
+    if not selectors:
+        return []
+    found: List[Any] = [None] * len(selectors)
+    missing = len(selectors)
+    for el in compiled(", ".join(selectors)).select(root):
+        for i, css in enumerate(selectors):
+            if found[i] is None and compiled(css).match(el):
+                found[i] = el
+                missing -= 1
+        if not missing:
+            break
+    return found
+
+
+class SourceSelectors:
+    """Sélecteurs CSS d'une source, compilés au premier usage puis réutilisés (attribut -> soupsieve.SoupSieve)."""
+
+    def __init__(self, source: str, **selectors: str):
+        self.source = source
+        self._css = selectors
+        self._compiled: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str):
+        css = self.__dict__.get("_css", {}).get(name)
+        if css is None:
+            raise AttributeError(name)
+        selector = self._compiled.get(name)
+        if selector is None:
+            selector = self._compiled[name] = compiled(css)
+        return selector
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, settings.html_parse_workers), thread_name_prefix="html-parse")
+    return _executor
+
+
+async def run_parse(func: Callable[..., T], html: str, *args, **kwargs) -> T:
+    """
+    Exécute `func(html, *args)` : directement pour une petite page, dans le pool de threads au-delà de
+    settings.html_parse_offload_bytes (l'event loop garde la main pendant le parsing d'une grosse page).
+    """
+    if not html or len(html) < settings.html_parse_offload_bytes:
+        return func(html, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, html, *args, **kwargs))
+
+
+def shutdown_parse_pool():
+    """Arrête le pool de parsing (arrêt de l'application)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
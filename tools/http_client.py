@@ -0,0 +1,198 @@
+"""
+Registre HTTP partagé par tous les outils de scraping / APIs d'emploi.
+
+- un seul pool aiohttp keep-alive par event loop (cache DNS, limites globales)
+- un sémaphore par hôte (LinkedIn, Indeed... tolèrent mal les rafales)
+- contextes SSL créés une fois (vérifié / non vérifié) au lieu d'un par module
+- timeout par défaut configurable
+
+Usage (remplace `aiohttp.ClientSession(headers=...)`, la session partagée n'est jamais fermée ici) :
+
+    async with http_session(headers=self.headers) as session:
+        async with session.get(url, timeout=15) as resp:
+            ...
+"""
+import asyncio
+import ssl
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from loguru import logger
+
+from config.settings import settings
+
+# Contextes SSL partagés (la création d'un contexte charge tout le magasin de certificats)
+VERIFIED_SSL_CONTEXT = ssl.create_default_context()
+UNVERIFIED_SSL_CONTEXT = ssl._create_unverified_context()
+
+# Requêtes simultanées max par hôte (les autres hôtes utilisent settings.http_per_host_limit)
+HOST_LIMITS = {
+    "www.linkedin.com": 4,
+    "linkedin.com": 4,
+    "ca.indeed.com": 3,
+    "fr.indeed.com": 3,
+    "www.indeed.com": 3,
+    "www.google.com": 3,
+    "www.glassdoor.com": 3,
+    "www.glassdoor.fr": 3,
+}
+
+
+class _Registry:
+    """État du registre, recréé si l'event loop change (scripts asyncio.run successifs)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.http_pool_size,
+                limit_per_host=settings.http_per_host_limit,
+                ttl_dns_cache=settings.http_dns_cache_ttl,
+                keepalive_timeout=settings.http_keepalive_timeout,
+                enable_cleanup_closed=True,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+            logger.debug("🔌 Pool HTTP des outils créé")
+        return self.session
+
+    def host_semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self.host_semaphores.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(HOST_LIMITS.get(host, settings.http_per_host_limit))
+            self.host_semaphores[host] = sem
+        return sem
+
+
+_registry: Optional[_Registry] = None
+
+# Gestionnaire de rejeu (benchmarks) : (méthode, url, kwargs) -> réponse factice, aucun appel réseau
+ReplayHandler = Callable[[str, str, Dict[str, Any]], Awaitable[Any]]
+_replay_handler: Optional[ReplayHandler] = None
+
+
+def install_replay(handler: ReplayHandler):
+    """Redirige toutes les requêtes des outils vers `handler` (sémaphores par hôte conservés)."""
+    global _replay_handler
+    _replay_handler = handler
+
+
+def remove_replay():
+    global _replay_handler
+    _replay_handler = None
+
+
+# Observateur des réponses (télémétrie par source) : (hôte, statut HTTP ou nom de l'exception)
+StatusObserver = Callable[[str, Any], None]
+_status_observer: Optional[StatusObserver] = None
+
+
+def install_status_observer(observer: Optional[StatusObserver]):
+    global _status_observer
+    _status_observer = observer
+
+
+def _observe(host: str, status: Any):
+    if _status_observer is not None:
+        try:
+            _status_observer(host, status)
+        except Exception as e:
+            logger.debug(f"Observateur HTTP en erreur: {e}")
+
+
+def _get_registry() -> _Registry:
+    global _registry
+    loop = asyncio.get_running_loop()
+    if _registry is None or _registry.loop is not loop:
+        _registry = _Registry(loop)
+    return _registry
+
+
+def _to_timeout(timeout: Any) -> aiohttp.ClientTimeout:
+    if isinstance(timeout, aiohttp.ClientTimeout):
+        return timeout
+    return aiohttp.ClientTimeout(total=timeout or settings.http_default_timeout)
+
+
+class _LimitedRequest:
+    """Requête exécutée sous le sémaphore de son hôte (libéré à la fermeture de la réponse)."""
+
+    def __init__(self, registry: _Registry, method: str, url: str, kwargs: Dict[str, Any]):
+        self.registry = registry
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._ctx = None
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        host = urlsplit(self.url).hostname or ""
+        self._sem = self.registry.host_semaphore(host)
+        await self._sem.acquire()
+        try:
+            if _replay_handler is not None:
+                resp = await _replay_handler(self.method, self.url, self.kwargs)
+            else:
+                self._ctx = self.registry.get_session().request(self.method, self.url, **self.kwargs)
+                resp = await self._ctx.__aenter__()
+        except BaseException as e:
+            self._sem.release()
+            if not isinstance(e, asyncio.CancelledError):
+                _observe(host, type(e).__name__)
+            raise
+        _observe(host, getattr(resp, "status", None))
+        return resp
+
+    async def __aexit__(self, exc_type, exc, tb):
+        try:
+            if self._ctx is not None:
+                await self._ctx.__aexit__(exc_type, exc, tb)
+        finally:
+            self._sem.release()
+
+
+class ToolSession:
+    """Vue légère sur le pool partagé avec en-têtes, SSL et timeout par défaut d'un outil."""
+
+    def __init__(self, registry: _Registry, headers: Optional[Dict[str, str]], timeout: Any, verify_ssl: bool):
+        self.registry = registry
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.ssl_context = VERIFIED_SSL_CONTEXT if verify_ssl else UNVERIFIED_SSL_CONTEXT
+
+    def request(self, method: str, url: str, **kwargs) -> _LimitedRequest:
+        kwargs["headers"] = {**self.headers, **(kwargs.get("headers") or {})}
+        kwargs["timeout"] = _to_timeout(kwargs.get("timeout", self.timeout))
+        kwargs.setdefault("ssl", self.ssl_context)
+        return _LimitedRequest(self.registry, method, url, kwargs)
+
+    def get(self, url: str, **kwargs) -> _LimitedRequest:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> _LimitedRequest:
+        return self.request("POST", url, **kwargs)
+
+
+def get_tool_session(headers: Optional[Dict[str, str]] = None, timeout: Any = None, verify_ssl: bool = True) -> ToolSession:
+    """Session d'outil adossée au pool partagé (à appeler depuis une coroutine)."""
+    return ToolSession(_get_registry(), headers, timeout, verify_ssl)
+
+
+@asynccontextmanager
+async def http_session(headers: Optional[Dict[str, str]] = None, timeout: Any = None, verify_ssl: bool = True):
+    """Variante `async with` de get_tool_session (aucune connexion n'est fermée en sortie)."""
+    yield get_tool_session(headers, timeout, verify_ssl)
+
+
+async def close_http_clients():
+    """Ferme le pool HTTP des outils (à appeler à l'arrêt de l'application)."""
+    global _registry
+    if _registry is not None and _registry.session is not None and not _registry.session.closed:
+        await _registry.session.close()
+        logger.info("🔌 Pool HTTP des outils fermé")
+    _registry = None
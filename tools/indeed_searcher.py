@@ -4,12 +4,13 @@ Retourne de vraies offres avec descriptions courtes.
 import aiohttp
 import asyncio
 import re
-import ssl
 import urllib.parse
 from typing import List, Dict, Any
 from loguru import logger
+from core.gazetteer import country_of
+from tools.http_client import http_session
+from tools.html_parsing import SourceSelectors, make_soup, run_parse
 
-ssl_ctx = ssl._create_unverified_context()
 
 # Mapping pays -> domaine Indeed
 INDEED_DOMAINS = {
@@ -24,6 +25,23 @@ INDEED_DOMAINS = {
     "usa":       ("www.indeed.com", "en"),
 }
 
+# Sélecteurs Indeed (layout 2024 - plusieurs variantes), essayés dans l'ordre
+SELECTORS = SourceSelectors(
+    "indeed",
+    cards="div[class*='job_seen_beacon']",
+    cards_alt="div[class*='resultContent']",
+    cards_li="li[class*='css-'][class*='resultado']",
+    title="h2[class*='jobTitle']",
+    title_span="span[title]",
+    title_h2="h2",
+    company="span[class*='companyName']",
+    company_any="[class*='company']",
+    location="[class*='companyLocation']",
+    snippet="div[class*='job-snippet'], div[class*='jobSnippet'], div[class*='underShelf']",
+    snippet_ul="ul[class*='css-'][class*='snippet']",
+    link="a[href]",
+)
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -43,18 +61,7 @@ class IndeedMultiSearcher:
         self.headers = HEADERS
 
     def _detect_country(self, location: str) -> str:
-        loc = location.lower()
-        loc = loc.replace("califormie", "california").replace("californie", "california")
-        if any(w in loc for w in ["france", "paris", "lyon", "marseille", "bordeaux", "nantes", "lille", "toulouse", "strasbourg", "nice", "rennes"]): return "france"
-        if any(w in loc for w in ["usa", "united states", "california", "new york", "texas", "chicago", "florida", "seattle", "boston", "silicon valley"]): return "usa"
-        if any(w in loc for w in ["canada", "montreal", "toronto", "vancouver", "quebec", "ottawa"]): return "canada"
-        if any(w in loc for w in ["belgique", "belgium", "bruxelles"]): return "belgique"
-        if any(w in loc for w in ["suisse", "switzerland", "genève", "zurich", "lausanne"]): return "suisse"
-        if any(w in loc for w in ["uk", "united kingdom", "london", "england"]): return "uk"
-        if any(w in loc for w in ["allemagne", "germany", "berlin", "munich"]): return "allemagne"
-        if any(w in loc for w in ["espagne", "spain", "madrid", "barcelona"]): return "espagne"
-        if any(w in loc for w in ["italie", "italy", "rome", "milan"]): return "italie"
-        return "france"
+        return country_of(location)
 
     async def search_jobs(self, keywords: str, location: str, limit: int = 10) -> List[Dict[str, Any]]:
         # Nettoyage du mot-clé (enlever les guillemets et opérateurs)
@@ -71,12 +78,12 @@ class IndeedMultiSearcher:
             url = f"https://{domain}/jobs?q={kw_enc}&l={loc_enc}&sort=date"
 
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15), ssl=ssl_ctx) as resp:
+            async with http_session(headers=self.headers, verify_ssl=False) as session:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
-            return self._parse(html, location, domain, limit)
+            return await run_parse(self._parse, html, location, domain, limit)
 
         except Exception as e:
             logger.debug(f"Indeed {domain} failed: {e}")
@@ -85,33 +92,25 @@ class IndeedMultiSearcher:
 
     def _parse(self, html: str, location: str, domain: str, limit: int) -> List[Dict[str, Any]]:
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
+            soup = make_soup(html)
             jobs = []
 
-            # Sélecteurs Indeed (layout 2024 - plusieurs variantes)
             cards = (
-                soup.find_all("div", class_=re.compile(r"job_seen_beacon")) or
-                soup.find_all("div", class_=re.compile(r"resultContent")) or
-                soup.find_all("li", class_=re.compile(r"css-.*resultado"))
+                SELECTORS.cards.select(soup, limit) or
+                SELECTORS.cards_alt.select(soup, limit) or
+                SELECTORS.cards_li.select(soup, limit)
             )
 
-            for i, card in enumerate(cards[:limit]):
+            for i, card in enumerate(cards):
                 title_el = (
-                    card.find("h2", class_=re.compile(r"jobTitle")) or
-                    card.find("span", attrs={"title": True}) or
-                    card.find("h2")
-                )
-                company_el = (
-                    card.find("span", class_=re.compile(r"companyName")) or
-                    card.find(class_=re.compile(r"company"))
-                )
-                loc_el = card.find(class_=re.compile(r"companyLocation"))
-                snippet_el = (
-                    card.find("div", class_=re.compile(r"job-snippet|jobSnippet|underShelf")) or
-                    card.find("ul", class_=re.compile(r"css-.*snippet"))
+                    SELECTORS.title.select_one(card) or
+                    SELECTORS.title_span.select_one(card) or
+                    SELECTORS.title_h2.select_one(card)
                 )
-                link_el = card.find("a", href=True)
+                company_el = SELECTORS.company.select_one(card) or SELECTORS.company_any.select_one(card)
+                loc_el = SELECTORS.location.select_one(card)
+                snippet_el = SELECTORS.snippet.select_one(card) or SELECTORS.snippet_ul.select_one(card)
+                link_el = SELECTORS.link.select_one(card)
 
                 title = title_el.get_text(strip=True) if title_el else ""
                 # Indeed double parfois le titre comme "nouveau" -> nettoyer
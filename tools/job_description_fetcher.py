@@ -42,6 +42,38 @@ DESCRIPTION_SELECTORS = [
 CONTENT_FALLBACK = ["article", "main", ".content", ".main-content", "[role='main']"]
 
 
+def extract_description(html: str) -> Optional[str]:
+    """Description d'une page d'offre déjà téléchargée (sélecteurs dédiés, puis zone de contenu principale)."""
+    from tools.html_parsing import first_matches, make_soup, present_selectors
+
+    soup = make_soup(html)
+    # Retirer scripts/styles pour éviter du bruit
+    for tag in soup(["script", "style", "nav", "footer", "header", "noscript", "iframe"]):
+        tag.decompose()
+
+    text = ""
+    # 1) Essayer les sélecteurs dédiés description (premier élément de chaque sélecteur, par ordre de préférence)
+    for el in first_matches(soup, present_selectors(html, DESCRIPTION_SELECTORS)):
+        if el:
+            for t in el.find_all(["button", "script", "style", "a"]):
+                t.decompose()
+            raw = el.get_text(separator=" ", strip=True)
+            if len(raw) > 80:
+                text = re.sub(r"\s+", " ", raw)[:3500]
+                break
+    # 2) Fallback: première zone article/main avec assez de texte
+    if not text or len(text) < 100:
+        for el in first_matches(soup, present_selectors(html, CONTENT_FALLBACK)):
+            if el:
+                raw = el.get_text(separator=" ", strip=True)
+                if 150 < len(raw) < 15000:
+                    text = re.sub(r"\s+", " ", raw)[:3500]
+                    break
+    if text and len(text) >= 80:
+        return text
+    return None
+
+
 async def fetch_description_from_url(url: str, source_hint: str = "") -> Optional[str]:
     """
     Récupère la description d'une offre depuis l'URL.
@@ -52,52 +84,20 @@ async def fetch_description_from_url(url: str, source_hint: str = "") -> Optiona
         return None
     try:
         import aiohttp
-        from bs4 import BeautifulSoup
+        from tools.http_client import http_session
+        from tools.html_parsing import run_parse
 
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml",
             "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
         }
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=12), ssl=False) as resp:
+        async with http_session(headers=headers, verify_ssl=False) as session:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=12)) as resp:
                 if resp.status != 200:
                     return None
                 html = await resp.text()
-        soup = BeautifulSoup(html, "html.parser")
-        # Retirer scripts/styles pour éviter du bruit
-        for tag in soup(["script", "style", "nav", "footer", "header", "noscript", "iframe"]):
-            tag.decompose()
-
-        text = ""
-        # 1) Essayer les sélecteurs dédiés description
-        for selector in DESCRIPTION_SELECTORS:
-            try:
-                el = soup.select_one(selector)
-                if el:
-                    for t in el.find_all(["button", "script", "style", "a"]):
-                        t.decompose()
-                    raw = el.get_text(separator=" ", strip=True)
-                    if len(raw) > 80:
-                        text = re.sub(r"\s+", " ", raw)[:3500]
-                        break
-            except Exception:
-                continue
-        # 2) Fallback: première zone article/main avec assez de texte
-        if not text or len(text) < 100:
-            for sel in CONTENT_FALLBACK:
-                try:
-                    el = soup.select_one(sel)
-                    if el:
-                        raw = el.get_text(separator=" ", strip=True)
-                        if 150 < len(raw) < 15000:
-                            text = re.sub(r"\s+", " ", raw)[:3500]
-                            break
-                except Exception:
-                    continue
-        if text and len(text) >= 80:
-            return text
-        return None
+        return await run_parse(extract_description, html)
     except asyncio.CancelledError:
         raise
     except Exception as e:
@@ -1,10 +1,10 @@
 """
 Module pour la recherche d'emploi via l'API Jooble.
 """
-import aiohttp
 import json
 from typing import List, Dict, Any
 from loguru import logger
+from tools.http_client import http_session
 from datetime import datetime
 
 class JoobleSearcher:
@@ -34,7 +34,7 @@ class JoobleSearcher:
         
         try:
             logger.info(f"📡 Jooble API Request: {kw} @ {loc}")
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.post(url, json=payload) as response:
                     if response.status == 200:
                         try:
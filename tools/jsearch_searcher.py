@@ -1,11 +1,11 @@
 """
 Module pour la recherche d'emploi via l'API JSearch (RapidAPI).
 """
-import aiohttp
 import json
 import os
 from typing import List, Dict, Any
 from loguru import logger
+from tools.http_client import http_session
 from datetime import datetime
 
 class JSearchSearcher:
@@ -52,7 +52,7 @@ class JSearchSearcher:
         
         try:
             logger.info(f"📡 JSearch API Request: {params['query']}")
-            async with aiohttp.ClientSession() as session:
+            async with http_session() as session:
                 async with session.get(self.BASE_URL, headers=headers, params=params) as response:
                     if response.status == 200:
                         try:
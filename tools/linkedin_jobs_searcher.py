@@ -3,13 +3,26 @@ Cible directement l'API publique de LinkedIn Jobs pour retrouver des offres.
 """
 import aiohttp
 import asyncio
-import re
 import urllib.parse
 from typing import List, Dict, Any
 from loguru import logger
-import ssl
+from tools.http_client import http_session
+from tools.html_parsing import SourceSelectors, make_soup, run_parse, strainer
 
-ssl_context = ssl._create_unverified_context()
+# Sélecteurs des job cards LinkedIn (layout 2024), essayés dans l'ordre
+SELECTORS = SourceSelectors(
+    "linkedin",
+    title_h3="h3[class*='title' i]",
+    title_a="a[class*='title' i]",
+    company="[class*='company' i]",
+    company_h4="h4",
+    link="a[href*='/jobs/view/']",
+    link_any="a[href*='linkedin.com/jobs']",
+    location="[class*='location' i]",
+    snippet="p[class*='snippet'], p[class*='description']",
+    snippet_any="[class*='job-search-card__snippet']",
+    description="[class*='description__text'], [class*='show-more-less-html__markup']",
+)
 
 
 class LinkedInJobsSearcher:
@@ -51,12 +64,12 @@ class LinkedInJobsSearcher:
         url = f"https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?keywords={kw_enc}&location={loc_enc}&start=0&count={limit}&sortBy=R"
         
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
+            async with http_session(headers=self.headers) as session:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=12)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
-                    return self._parse_linkedin_job_cards(html, location)
+            return await run_parse(self._parse_linkedin_job_cards, html, location)
         except Exception as e:
             logger.debug(f"LinkedIn JSON API failed: {e}")
             return []
@@ -68,12 +81,12 @@ class LinkedInJobsSearcher:
         url = f"https://www.linkedin.com/jobs/search/?keywords={kw_enc}&location={loc_enc}&sortBy=R&f_TPR=r86400"
         
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
+            async with http_session(headers=self.headers) as session:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=12)) as resp:
                     if resp.status != 200:
                         raise Exception(f"HTTP {resp.status}")
                     html = await resp.text()
-                    return self._parse_linkedin_job_cards(html, location, limit)
+            return await run_parse(self._parse_linkedin_job_cards, html, location, limit)
         except Exception as e:
             logger.debug(f"LinkedIn HTML scrape failed: {e}")
             return []
@@ -81,11 +94,10 @@ class LinkedInJobsSearcher:
     def _parse_linkedin_job_cards(self, html: str, location: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Parse les job cards LinkedIn depuis le HTML."""
         try:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
+            # Seuls les <li> (cartes) sont construits, le reste de la page est ignoré au parsing
+            soup = make_soup(html, parse_only=strainer("li"))
             jobs = []
             
-            # Sélecteurs LinkedIn Jobs (layout 2024)
             cards = soup.find_all("li")
             
             for i, card in enumerate(cards):
@@ -93,18 +105,15 @@ class LinkedInJobsSearcher:
                     break
                 
                 # Titre du poste
-                title_tag = card.find("h3", class_=lambda c: c and "title" in str(c).lower()) or \
-                            card.find("a", class_=lambda c: c and "title" in str(c).lower()) or \
+                title_tag = SELECTORS.title_h3.select_one(card) or \
+                            SELECTORS.title_a.select_one(card) or \
                             card.find("h3") or card.find("h2")
                 
                 # Entreprise
-                company_tag = card.find(class_=lambda c: c and "company" in str(c).lower() if c else False) or \
-                              card.find("h4")
+                company_tag = SELECTORS.company.select_one(card) or card.find("h4")
                 
                 # Lien direct vers l'offre
-                link_tag = card.find("a", href=lambda h: h and "/jobs/view/" in str(h))
-                if not link_tag:
-                    link_tag = card.find("a", href=lambda h: h and "linkedin.com/jobs" in str(h))
+                link_tag = SELECTORS.link.select_one(card) or SELECTORS.link_any.select_one(card)
                 
                 if not title_tag:
                     continue
@@ -124,12 +133,11 @@ class LinkedInJobsSearcher:
                     continue
                 
                 # Localisation
-                loc_tag = card.find(class_=lambda c: c and "location" in str(c).lower() if c else False)
+                loc_tag = SELECTORS.location.select_one(card)
                 job_location = loc_tag.get_text(strip=True) if loc_tag else "Non spécifié"
                 
                 # Description courte (Snippet)
-                snippet_tag = card.find("p", class_=re.compile("snippet|description")) or \
-                              card.find(class_=re.compile("job-search-card__snippet"))
+                snippet_tag = SELECTORS.snippet.select_one(card) or SELECTORS.snippet_any.select_one(card)
                 snippet = (snippet_tag.get_text(strip=True) if snippet_tag else "").strip()
                 if len(snippet) < 50:
                     snippet = f"Poste : {title}. Entreprise : {company}. Consultez le lien pour la description complète."
@@ -157,24 +165,27 @@ class LinkedInJobsSearcher:
         if not url or "linkedin.com" not in url:
             return ""
         try:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10), ssl=ssl_context) as resp:
+            async with http_session(headers=self.headers, verify_ssl=False) as session:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
                     if resp.status != 200:
                         return ""
                     html = await resp.text()
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html, "html.parser")
-                    # Sélecteurs pour la description LinkedIn publique
-                    desc_tag = soup.find(class_=re.compile("description__text|show-more-less-html__markup"))
-                    if desc_tag:
-                        # Nettoyer le HTML
-                        for tag in desc_tag.find_all(["button", "script", "style"]):
-                            tag.decompose()
-                        return desc_tag.get_text(separator=" ", strip=True)[:2000]
+            return await run_parse(self._parse_full_description, html)
         except Exception as e:
             logger.debug(f"LinkedIn detail fetch failed: {e}")
         return ""
 
+    def _parse_full_description(self, html: str) -> str:
+        soup = make_soup(html)
+        # Sélecteurs pour la description LinkedIn publique
+        desc_tag = SELECTORS.description.select_one(soup)
+        if not desc_tag:
+            return ""
+        # Nettoyer le HTML
+        for tag in desc_tag.find_all(["button", "script", "style"]):
+            tag.decompose()
+        return desc_tag.get_text(separator=" ", strip=True)[:2000]
+
     def _generate_linkedin_search_links(self, keywords: str, location: str) -> List[Dict[str, Any]]:
 
         """Génère un lien de recherche LinkedIn direct (fallback garanti)."""
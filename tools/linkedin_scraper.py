@@ -6,7 +6,7 @@ import re
 import urllib.request
 import urllib.parse
 import ssl
-from bs4 import BeautifulSoup
+from tools.html_parsing import make_soup
 from typing import List, Dict, Any
 from loguru import logger
 import asyncio
@@ -59,7 +59,7 @@ class LinkedInScraper:
                 req = urllib.request.Request(f"https://lite.duckduckgo.com/lite/?q={encoded}", headers=self.headers)
                 loop = asyncio.get_event_loop()
                 html = await asyncio.wait_for(loop.run_in_executor(None, lambda: urllib.request.urlopen(req, context=ssl_context, timeout=8).read().decode()), timeout=10)
-                soup = BeautifulSoup(html, "html.parser")
+                soup = make_soup(html)
                 seen = set()
                 for a in soup.find_all("a", href=True):
                     if len(profiles) >= limit:
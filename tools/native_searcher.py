@@ -35,8 +35,8 @@ class NativeWebSearcher:
                 html = response.read().decode('utf-8')
                 
                 try:
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html, 'html.parser')
+                    from tools.html_parsing import make_soup
+                    soup = make_soup(html)
                     print(f"Page Title: {soup.title.string if soup.title else 'No Title'}")
                     
                     # Stratégie 1: Sélecteurs DDG connus
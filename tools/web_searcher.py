@@ -4,8 +4,9 @@ import asyncio
 from typing import List, Dict, Any
 import re
 from loguru import logger
+from tools.http_client import http_session
 from bs4 import BeautifulSoup
-import ssl
+from tools.html_parsing import make_soup
 import urllib.parse
 
 # Mots-clés prioritaires pour emails RH / recrutement
@@ -65,11 +66,11 @@ class JobWebSearcher:
         async with self.semaphore:
             try:
                 # SSL False pour éviter les erreurs de certificat sur certains sites
-                async with aiohttp.ClientSession(headers=self.headers) as session:
+                async with http_session(headers=self.headers) as session:
                     async with session.get(url, timeout=10) as response:
                         if response.status == 200:
                             html = await response.text()
-                            soup = BeautifulSoup(html, 'html.parser')
+                            soup = make_soup(html)
                             return self._scrape_generic_details(soup, job)
             except Exception:
                 pass
@@ -96,12 +97,12 @@ class JobWebSearcher:
         query_string = urllib.parse.urlencode(params)
         url = f"{base_url}?{query_string}"
         
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with http_session(headers=self.headers) as session:
             try:
                 async with session.get(url, timeout=10) as response:
                     if response.status == 200:
                         html = await response.text()
-                        soup = BeautifulSoup(html, 'html.parser')
+                        soup = make_soup(html)
                         articles = soup.find_all('article')
                         jobs = []
                         for i, article in enumerate(articles[:max_results]):
@@ -172,13 +173,13 @@ class JobWebSearcher:
                 return {"company_name": company_name, "site_url": "", "emails": [], "phone": ""}
 
             async with self.semaphore:
-                async with aiohttp.ClientSession(headers=self.headers) as session:
+                async with http_session(headers=self.headers) as session:
                     try:
                         async with session.get(site_url, timeout=aiohttp.ClientTimeout(total=8)) as resp:
                             if resp.status != 200:
                                 return {"company_name": company_name, "site_url": site_url, "emails": [], "phone": ""}
                             html = await resp.text()
-                            soup = BeautifulSoup(html, "html.parser")
+                            soup = make_soup(html)
                             text = soup.get_text(separator=" ", strip=True)
                             all_emails = re.findall(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+", text)
                             seen = set()